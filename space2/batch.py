@@ -0,0 +1,116 @@
+import argparse
+import json
+import sys
+import time
+from services.batch_service import BatchService, find_manifests
+from services.packing_engine import ENGINE_NAMES
+from services.visualization_options import CAMERA_VIEWS, EXPORT_FORMATS
+from utils.logger import configure_logging, setup_logger
+
+logger = setup_logger(__name__)
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Headless batch packing of many Bins.tsv/Container.tsv manifest pairs.'
+    )
+    parser.add_argument(
+        'manifests',
+        nargs='+',
+        help='Directories (searched recursively) or glob patterns of manifest directories'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=ENGINE_NAMES,
+        default='extreme_point',
+        help='Packing engine to use (default: extreme_point)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--output',
+        default='-',
+        help='JSON Lines output file (default: stdout)'
+    )
+    parser.add_argument(
+        '--positions',
+        action='store_true',
+        help='Include every placement in the result records'
+    )
+    parser.add_argument(
+        '--results',
+        default=None,
+        help='Also write every placement to this binary result file (memory-mappable)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='Reuse packing results of repeated manifests from this cache directory'
+    )
+    parser.add_argument(
+        '--export-dir',
+        default=None,
+        help='Also render every packed manifest off-screen into this directory'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=EXPORT_FORMATS,
+        default=None,
+        help='Export formats (default: all)'
+    )
+    parser.add_argument(
+        '--views',
+        nargs='+',
+        choices=list(CAMERA_VIEWS),
+        default=None,
+        help='Camera views of exported PNGs (default: iso)'
+    )
+    return parser.parse_args()
+
+def main() -> int:
+    """Batch entry point. Returns a non-zero exit code if any manifest failed."""
+    configure_logging()
+    args = parse_args()
+    manifests = find_manifests(args.manifests)
+    if not manifests:
+        logger.error(f"No manifests found in: {', '.join(args.manifests)}")
+        return 2
+
+    batch_service = BatchService(
+        engine=args.engine,
+        max_workers=args.workers,
+        include_positions=args.positions,
+        cache_dir=args.cache_dir,
+        export_dir=args.export_dir,
+        export_formats=args.formats,
+        export_views=args.views,
+        results_file=args.results
+    )
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    failures = 0
+    started = time.perf_counter()
+    try:
+        for record in batch_service.run(manifests):
+            if record['status'] != 'ok':
+                failures += 1
+                logger.error(f"{record['manifest']}: {record['error']}")
+            # One line per manifest, flushed so consumers can stream results
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    logger.info(
+        f'Packed {len(manifests) - failures}/{len(manifests)} manifests '
+        f'in {time.perf_counter() - started:.2f}s ({failures} failed)'
+    )
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
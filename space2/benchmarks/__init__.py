@@ -0,0 +1,8 @@
+"""
+Benchmark suite for loading, packing, gravity, summaries and rendering.
+
+Run from the space2 directory:
+
+    python -m benchmarks run --output baseline.json
+    python -m benchmarks compare baseline.json current.json
+"""
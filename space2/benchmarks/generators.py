@@ -0,0 +1,118 @@
+import csv
+import os
+from typing import Callable, Dict, List
+import numpy as np
+
+BinRows = List[Dict[str, str]]
+
+# Standard container used by every benchmark case (roughly a 40ft container, in inches)
+CONTAINER_ROW = {'ID': 'Benchmark', 'Width': '480', 'Height': '96', 'Depth': '96', 'MaxWeight': '60000'}
+
+COLORS = ['peru', 'tan', 'bisque', 'burlywood', 'wheat', 'sienna', 'khaki', 'salmon']
+
+
+def split_quantity(total: int, weights: np.ndarray) -> np.ndarray:
+    """
+    Split a unit count over types in proportion to weights (every type gets at least one).
+
+    Args:
+        total: Number of units
+        weights: Relative share per type
+
+    Returns:
+        np.ndarray: Quantity per type, summing to total
+    """
+    count = min(len(weights), total)
+    shares = weights[:count] / weights[:count].sum()
+    quantity = np.maximum(1, np.floor(shares * total)).astype(np.int64)
+    quantity[0] += total - quantity.sum()
+    return quantity
+
+
+def make_rows(dims: np.ndarray, weights: np.ndarray, quantity: np.ndarray, prefix: str = 'Type') -> BinRows:
+    """
+    Build Bins.tsv rows.
+
+    Args:
+        dims: (types, 3) width, height, depth
+        weights: Weight per type
+        quantity: Quantity per type
+        prefix: Type name prefix
+
+    Returns:
+        BinRows: Raw Bins.tsv rows, as read by utils.manifest_loader.iter_rows
+    """
+    return [
+        {
+            'Type': f'{prefix}{index}',
+            'Width': str(int(dims[index, 0])),
+            'Height': str(int(dims[index, 1])),
+            'Depth': str(int(dims[index, 2])),
+            'Weight': str(int(weights[index])),
+            'Quantity': str(int(quantity[index])),
+            'Color': COLORS[index % len(COLORS)],
+        }
+        for index in range(len(quantity))
+    ]
+
+
+def uniform(items: int, seed: int = 0) -> BinRows:
+    """Five box types with uniformly distributed sizes and equal quantities."""
+    rng = np.random.default_rng(seed)
+    dims = rng.integers(8, 31, size=(5, 3))
+    weights = rng.integers(10, 101, size=5)
+    return make_rows(dims, weights, split_quantity(items, np.ones(5)))
+
+
+def heavy_tailed(items: int, seed: int = 0) -> BinRows:
+    """Ten box types with log-normal sizes and Zipf-distributed quantities."""
+    rng = np.random.default_rng(seed)
+    dims = np.clip(np.round(rng.lognormal(mean=2.7, sigma=0.6, size=(10, 3))), 2, 90)
+    weights = np.maximum(1, np.round(dims.prod(axis=1) / 100))
+    return make_rows(dims, weights, split_quantity(items, 1.0 / np.arange(1, 11)))
+
+
+def many_types(items: int, seed: int = 0) -> BinRows:
+    """Up to a thousand distinct box types with small quantities."""
+    rng = np.random.default_rng(seed)
+    types = min(items, 1000)
+    dims = rng.integers(5, 41, size=(types, 3))
+    weights = rng.integers(1, 101, size=types)
+    return make_rows(dims, weights, split_quantity(items, np.ones(types)))
+
+
+def huge_quantity(items: int, seed: int = 0) -> BinRows:
+    """Two box types, almost every unit in a single manifest row."""
+    rng = np.random.default_rng(seed)
+    dims = rng.integers(10, 25, size=(2, 3))
+    weights = rng.integers(10, 51, size=2)
+    return make_rows(dims, weights, split_quantity(items, np.array([0.99, 0.01])))
+
+
+GENERATORS: Dict[str, Callable[[int, int], BinRows]] = {
+    'uniform': uniform,
+    'heavy_tailed': heavy_tailed,
+    'many_types': many_types,
+    'huge_quantity': huge_quantity,
+}
+
+
+def write_tsv(filepath: str, rows: List[Dict[str, str]]) -> None:
+    """Write rows to a TSV file with a header."""
+    with open(filepath, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]), delimiter='\t')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_manifest(directory: str, bins: BinRows) -> None:
+    """
+    Write a Bins.tsv/Container.tsv manifest pair.
+
+    Args:
+        directory: Manifest directory (created if needed)
+        bins: Bins.tsv rows
+    """
+    os.makedirs(directory, exist_ok=True)
+    write_tsv(os.path.join(directory, 'Bins.tsv'), bins)
+    write_tsv(os.path.join(directory, 'Container.tsv'), [CONTAINER_ROW])
@@ -0,0 +1,392 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from benchmarks.generators import GENERATORS, write_manifest
+from models.container import Container
+from services.packing_engine import ENGINE_NAMES
+from services.packing_service import PackingService
+from utils import manifest_loader
+from utils.logger import configure_logging
+
+BENCHMARK_FORMAT_VERSION = 1
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+# py3dbp needs about 30s for 300 bins; larger cases are recorded as skipped
+ENGINE_MAX_ITEMS = {'py3dbp': 300}
+
+# Entry point whose cold start is measured by the startup command
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+PHASES = [
+    'load_bins',
+    'load_item_table',
+    'pack_bins',
+    'apply_gravity',
+    'get_packing_summary',
+    'visualize_packing',
+]
+
+
+@contextlib.contextmanager
+def working_directory(path: str) -> Iterator[None]:
+    """Temporarily change the working directory (the services read Bins.tsv from it)."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def timed(func: Callable, *args: Any) -> Tuple[Any, float]:
+    """
+    Call a function and measure its wall time.
+
+    Returns:
+        Tuple[Any, float]: (result, seconds)
+    """
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def render_off_screen(container: Container) -> None:
+    """Visualize a packed container in an off-screen plotter and render one frame."""
+    import pyvista as pv
+    from services.visualization_service import VisualizationService
+
+    plotter = pv.Plotter(off_screen=True)
+    try:
+        VisualizationService().visualize_packing(container, plotter)
+        plotter.render()
+    finally:
+        plotter.close()
+
+
+def run_pipeline(engine: str, render: bool) -> Tuple[Dict[str, float], Container]:
+    """
+    Run every benchmarked phase once on the manifest in the working directory.
+
+    Args:
+        engine: Packing engine name
+        render: Whether to time visualize_packing
+
+    Returns:
+        Tuple[Dict[str, float], Container]: (seconds per phase, packed container)
+    """
+    timings: Dict[str, float] = {}
+    # Parsed manifests are cached, so each load starts cold to time the parsing
+    manifest_loader.clear_cache()
+    _, timings['load_bins'] = timed(PackingService.load_bins)
+    manifest_loader.clear_cache()
+    _, timings['load_item_table'] = timed(PackingService.load_item_table)
+    container, timings['pack_bins'] = timed(PackingService(engine).pack_bins, Container.from_data())
+    # pack_bins already settles the boxes; a second pass would only time a no-op
+    timings['apply_gravity'] = container.metrics.phases['gravity'].wall
+    _, timings['get_packing_summary'] = timed(container.get_packing_summary)
+    if render:
+        _, timings['visualize_packing'] = timed(render_off_screen, container)
+    return timings, container
+
+
+def run_case(generator: str, items: int, engine: str, seed: int = 0, repeat: int = 1, render: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark one synthetic manifest.
+
+    Each phase reports its fastest time over the repeats.
+
+    Args:
+        generator: Name of the manifest generator (key of GENERATORS)
+        items: Number of units in the manifest
+        engine: Packing engine name
+        seed: Random seed of the generator
+        repeat: Number of times the pipeline is run
+        render: Whether to time visualize_packing
+
+    Returns:
+        Dict[str, Any]: JSON-serializable result record
+    """
+    record: Dict[str, Any] = {
+        'case': f'{generator}/{items}/{engine}',
+        'generator': generator,
+        'items': items,
+        'engine': engine,
+        'seed': seed,
+        'status': 'ok',
+    }
+    if items > ENGINE_MAX_ITEMS.get(engine, items):
+        record['status'] = 'skipped'
+        return record
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            write_manifest(directory, GENERATORS[generator](items, seed))
+            runs = []
+            with working_directory(directory), contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(repeat):
+                    timings, container = run_pipeline(engine, render)
+                    runs.append(timings)
+        record.update({
+            'packed': len(container.items),
+            'unfitted': len(container.unfitted_items),
+            'volume_utilization': round(container.get_volume_utilization(), 3),
+            'timings': {phase: round(min(run[phase] for run in runs), 6) for phase in runs[0]},
+        })
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def parse_import_times(stderr: str) -> Tuple[Dict[str, float], float]:
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        Tuple[Dict[str, float], float]: (cumulative import seconds per module,
+            total seconds of the top-level imports)
+    """
+    modules = {}
+    total = 0.0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        seconds = int(cumulative) / 1e6
+        # Nested imports are indented below the single separating space
+        if not name[1:].startswith(' '):
+            total += seconds
+        modules[name.strip()] = seconds
+    return modules, total
+
+
+def measure_startup(engine: str = 'extreme_point', items: int = 10, repeat: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """
+    Measure the cold start of a packing-only main.py run in fresh interpreters.
+
+    Args:
+        engine: Packing engine name
+        items: Number of units in the (uniform) manifest
+        repeat: Number of timed runs
+        seed: Random seed of the generator
+
+    Returns:
+        Dict[str, Any]: Wall time of the whole run (min and median), total import
+            time and whether PyVista or py3dbp were imported
+    """
+    command = [sys.executable, MAIN_SCRIPT, '--pack-only', '--engine', engine]
+    with tempfile.TemporaryDirectory() as directory:
+        write_manifest(directory, GENERATORS['uniform'](items, seed))
+        walls = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run(command, cwd=directory, check=True, capture_output=True)
+            walls.append(time.perf_counter() - started)
+        traced = subprocess.run(
+            [sys.executable, '-X', 'importtime'] + command[1:], cwd=directory, check=True, capture_output=True, text=True
+        )
+    modules, import_seconds = parse_import_times(traced.stderr)
+    return {
+        'engine': engine,
+        'items': items,
+        'wall_min': round(min(walls), 4),
+        'wall_median': round(statistics.median(walls), 4),
+        'import_seconds': round(import_seconds, 4),
+        'modules_imported': len(modules),
+        'pyvista_imported': 'pyvista' in modules,
+        'py3dbp_imported': 'py3dbp' in modules,
+    }
+
+
+def get_environment() -> Dict[str, str]:
+    """Describe the machine and library versions the benchmark ran with."""
+    from importlib import metadata
+
+    environment = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'numpy': np.__version__,
+    }
+    for package in ('py3dbp', 'pyvista', 'vtk'):
+        try:
+            environment[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            environment[package] = 'not installed'
+    return environment
+
+
+def run_suite(
+    generators: Sequence[str],
+    sizes: Sequence[int],
+    engines: Sequence[str],
+    seed: int = 0,
+    repeat: int = 1,
+    render: bool = True
+) -> Dict[str, Any]:
+    """
+    Benchmark every generator/size/engine combination.
+
+    Returns:
+        Dict[str, Any]: Baseline document (environment and one record per case)
+    """
+    results = []
+    for generator in generators:
+        for items in sizes:
+            for engine in engines:
+                record = run_case(generator, items, engine, seed, repeat, render)
+                results.append(record)
+                print(format_record(record), file=sys.stderr, flush=True)
+    return {
+        'version': BENCHMARK_FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': get_environment(),
+        'settings': {'seed': seed, 'repeat': repeat, 'render': render},
+        'results': results,
+    }
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    """Format a result record as one progress line."""
+    if record['status'] != 'ok':
+        return f"{record['case']:<36} {record['status']} {record.get('error', '')}".rstrip()
+    timings = ' '.join(f'{phase}={seconds:.3f}s' for phase, seconds in record['timings'].items())
+    return (
+        f"{record['case']:<36} packed={record['packed']} unfitted={record['unfitted']} "
+        f"utilization={record['volume_utilization']:.1f}% {timings}"
+    )
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.25,
+    min_seconds: float = 0.005,
+    utilization_tolerance: float = 0.5
+) -> List[str]:
+    """
+    Compare two benchmark documents.
+
+    A phase regresses when it is more than `threshold` (relative) and more than
+    `min_seconds` (absolute, to ignore timer noise) slower than the baseline.
+    A case also regresses when its volume utilization drops by more than
+    `utilization_tolerance` percentage points, or when it fails where the
+    baseline succeeded.
+
+    Args:
+        baseline: Baseline document
+        current: Document to check
+        threshold: Allowed relative slowdown per phase
+        min_seconds: Slowdowns below this many seconds are ignored
+        utilization_tolerance: Allowed utilization drop in percentage points
+
+    Returns:
+        List[str]: One message per regression
+    """
+    previous = {record['case']: record for record in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        before = previous.get(record['case'])
+        if before is None or before['status'] != 'ok':
+            continue
+        if record['status'] != 'ok':
+            regressions.append(f"{record['case']}: {record['status']} {record.get('error', '')}".rstrip())
+            continue
+        for phase, seconds in record['timings'].items():
+            if phase not in before['timings']:
+                continue
+            old = before['timings'][phase]
+            if seconds > old * (1 + threshold) and seconds - old > min_seconds:
+                regressions.append(
+                    f"{record['case']}: {phase} {old:.4f}s -> {seconds:.4f}s (+{(seconds / old - 1) * 100 if old else float('inf'):.0f}%)"
+                )
+        if record['volume_utilization'] < before['volume_utilization'] - utilization_tolerance:
+            regressions.append(
+                f"{record['case']}: volume utilization "
+                f"{before['volume_utilization']:.1f}% -> {record['volume_utilization']:.1f}%"
+            )
+    return regressions
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Packing benchmark suite.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the benchmarks and write a JSON baseline')
+    run.add_argument('--generators', nargs='+', choices=list(GENERATORS), default=list(GENERATORS))
+    run.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='Numbers of units per manifest')
+    run.add_argument(
+        '--engines',
+        nargs='+',
+        choices=ENGINE_NAMES,
+        default=['extreme_point'],
+        help=f'Packing engines (py3dbp is skipped above {ENGINE_MAX_ITEMS["py3dbp"]} units)'
+    )
+    run.add_argument('--repeat', type=int, default=1, help='Runs per case; the fastest time is kept')
+    run.add_argument('--seed', type=int, default=0, help='Random seed of the manifest generators')
+    run.add_argument('--no-render', action='store_true', help='Skip the off-screen visualize_packing phase')
+    run.add_argument('--output', default='-', help='JSON output file (default: stdout)')
+    run.add_argument('--verbose', action='store_true', help='Keep application logging enabled')
+
+    startup = commands.add_parser('startup', help='Measure the cold start of a packing-only main.py run')
+    startup.add_argument('--engine', choices=ENGINE_NAMES, default='extreme_point')
+    startup.add_argument('--items', type=int, default=10, help='Number of units in the manifest (default: 10)')
+    startup.add_argument('--repeat', type=int, default=5, help='Timed runs (default: 5)')
+
+    check = commands.add_parser('compare', help='Flag regressions against a baseline')
+    check.add_argument('baseline', help='Baseline JSON file')
+    check.add_argument('current', help='JSON file to check')
+    check.add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown (default: 0.25)')
+    check.add_argument('--min-seconds', type=float, default=0.005, help='Ignore slowdowns below this (default: 0.005)')
+    check.add_argument(
+        '--utilization-tolerance',
+        type=float,
+        default=0.5,
+        help='Allowed volume utilization drop in percentage points (default: 0.5)'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Benchmark entry point. compare returns 1 if any regression was found."""
+    args = parse_args(argv)
+    if args.command == 'startup':
+        print(json.dumps(measure_startup(args.engine, args.items, args.repeat), indent=2))
+        return 0
+    if args.command == 'run':
+        configure_logging()
+        if not args.verbose:
+            # Console logging would otherwise dominate the small cases
+            logging.disable(logging.INFO)
+        document = run_suite(args.generators, args.sizes, args.engines, args.seed, args.repeat, not args.no_render)
+        text = json.dumps(document, indent=2)
+        if args.output == '-':
+            print(text)
+        else:
+            with open(args.output, 'w') as file:
+                file.write(text + '\n')
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = compare(baseline, current, args.threshold, args.min_seconds, args.utilization_tolerance)
+    for message in regressions:
+        print(f'REGRESSION {message}')
+    print(f'{len(regressions)} regressions in {len(current["results"])} cases')
+    return 1 if regressions else 0
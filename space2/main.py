@@ -1,30 +1,328 @@
+import argparse
+import os
+from typing import TYPE_CHECKING, List
 from models.container import Container
-from services.packing_service import PackingService
-from services.visualization_service import VisualizationService
-from utils.logger import setup_logger
+from services.multi_container_service import MultiContainerService
+from services.cache_service import PackingCache
+from services.packing_engine import ENGINE_NAMES
+from services.packing_service import PackingProgress, PackingService
+from services.result_format import write_results
+from services.search_service import SearchProgress, SearchService
+from services.validation_service import DEFAULT_MIN_SUPPORT, validate_container
+from services.visualization_options import CAMERA_VIEWS, EXPORT_FORMATS
+from utils.cancellation import CancellationToken
+from utils.logger import configure_logging, setup_logger
+from utils.metrics import Metrics
+
+if TYPE_CHECKING:
+    from services.visualization_service import VisualizationService
 
 logger = setup_logger(__name__)
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Pack bins into a container and visualize the result.')
+    parser.add_argument(
+        '--bins',
+        default='Bins.tsv',
+        help='Bins manifest (.tsv, .csv or .parquet; default: Bins.tsv)'
+    )
+    parser.add_argument(
+        '--container',
+        default='Container.tsv',
+        help='Container manifest (.tsv, .csv or .parquet; default: Container.tsv)'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=ENGINE_NAMES,
+        default='py3dbp',
+        help='Packing engine to use (default: py3dbp; extreme_point_grid packs in exact integer grid units)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='Reuse packing results of repeated manifests from this cache directory'
+    )
+    parser.add_argument(
+        '--layers',
+        action='store_true',
+        help='Stack large groups of identical bins as whole layers before running the engine'
+    )
+    parser.add_argument(
+        '--deadline',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='Stop packing after this many seconds and keep the bins placed so far (extreme-point engines)'
+    )
+    parser.add_argument(
+        '--progress',
+        action='store_true',
+        help='Print progress (bins placed, utilization, elapsed time) while packing'
+    )
+    parser.add_argument(
+        '--multi',
+        action='store_true',
+        help='Pack into as few containers as needed, choosing among all rows of Container.tsv'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes for --multi and --search (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--search',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='Search for a better packing for this many seconds (extreme-point engines only)'
+    )
+    parser.add_argument(
+        '--search-attempts',
+        type=int,
+        default=None,
+        help='Stop the search after this many packing attempts'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Random seed of the search (default: 0)'
+    )
+    parser.add_argument(
+        '--results',
+        default=None,
+        help='Write the packed containers to this binary result file (memory-mappable)'
+    )
+    parser.add_argument(
+        '--validate',
+        action='store_true',
+        help='Check the packed containers for overlaps, out-of-bounds bins and unsupported bins'
+    )
+    parser.add_argument(
+        '--min-support',
+        type=float,
+        default=DEFAULT_MIN_SUPPORT,
+        help=f'Share of its base a bin must rest on for --validate (default: {DEFAULT_MIN_SUPPORT})'
+    )
+    parser.add_argument(
+        '--pack-only',
+        action='store_true',
+        help='Pack and print the summary without visualizing (PyVista is never imported)'
+    )
+    parser.add_argument(
+        '--lod',
+        action='store_true',
+        help='Level-of-detail rendering for large loads: opaque instanced boxes, hidden boxes culled, '
+             'number keys toggle bin types'
+    )
+    parser.add_argument(
+        '--export-dir',
+        default=None,
+        help='Headless mode: render to files in this directory instead of opening a window'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=EXPORT_FORMATS,
+        default=list(EXPORT_FORMATS),
+        help='Export formats for --export-dir (default: all)'
+    )
+    parser.add_argument(
+        '--views',
+        nargs='+',
+        choices=list(CAMERA_VIEWS),
+        default=['iso'],
+        help='Camera views of exported PNGs (default: iso)'
+    )
+    parser.add_argument(
+        '--metrics',
+        default=None,
+        help='Write per-phase timings, counters and memory in Prometheus text format to this file'
+    )
+    parser.add_argument(
+        '--profile',
+        default=None,
+        help='Profile the run with cProfile and write the statistics to this file'
+    )
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help='Trace Python allocations with tracemalloc and report the peak and top allocation sites'
+    )
+    args = parser.parse_args()
+    if (args.search is not None or args.search_attempts is not None) and args.engine == 'py3dbp':
+        parser.error('--search needs --engine extreme_point or extreme_point_grid')
+    if (args.search is not None or args.search_attempts is not None) and args.multi:
+        parser.error('--search packs a single container and cannot be combined with --multi')
+    if (args.search is not None or args.search_attempts is not None) and (args.layers or args.cache_dir):
+        parser.error('--search runs its own packing attempts and cannot be combined with --layers or --cache-dir')
+    if args.deadline is not None and args.deadline <= 0:
+        parser.error('--deadline must be a positive number of seconds')
+    if (args.deadline is not None or args.progress) and (args.multi or args.search is not None or args.search_attempts is not None):
+        parser.error('--deadline and --progress apply to a single packing run, not --multi or --search')
+    if not 0 <= args.min_support <= 1:
+        parser.error('--min-support must be between 0 and 1')
+    if args.pack_only and args.lod:
+        parser.error('--pack-only skips visualization and cannot be combined with --lod')
+    if args.pack_only and args.export_dir:
+        parser.error('--pack-only skips visualization and cannot be combined with --export-dir')
+    return args
+
+def get_visualization_service(args: argparse.Namespace, metrics: Metrics) -> 'VisualizationService':
+    """Create the visualization service, importing PyVista only now."""
+    with metrics.phase('load_visualization'):
+        from services.visualization_service import VisualizationService
+        return VisualizationService(bins_file=args.bins, metrics=metrics, lod=args.lod)
+
+def save_results(args: argparse.Namespace, metrics: Metrics, containers: List[Container]) -> None:
+    """Write the packed containers to the binary result file, if one was requested."""
+    if not args.results:
+        return
+    with metrics.phase('write_results', sum(len(c.items) + len(c.unfitted_items) for c in containers)):
+        write_results(args.results, containers)
+    logger.info(f"Results written to '{args.results}'")
+
+def validate_containers(args: argparse.Namespace, metrics: Metrics, containers: List[Container]) -> None:
+    """Print the validation summary of each packed container, if validation was requested."""
+    if not args.validate:
+        return
+    for container in containers:
+        report = validate_container(container, args.min_support, metrics)
+        print(report.get_summary())
+        if not report.valid:
+            logger.warning(f'Container {container.name} failed validation')
+
+def show_container(
+    visualization_service: 'VisualizationService',
+    container: Container,
+    args: argparse.Namespace,
+    export_subdir: str = ''
+) -> None:
+    """Show a packed container, or export it off-screen in headless mode."""
+    if args.export_dir:
+        output_dir = os.path.join(args.export_dir, export_subdir) if export_subdir else args.export_dir
+        visualization_service.export_packing(container, output_dir, args.formats, args.views)
+    else:
+        visualization_service.show_interactive_plot(container)
+
+def run_multi(args: argparse.Namespace, metrics: Metrics) -> None:
+    """Pack bins into several containers and visualize each of them."""
+    logger.info(f'Loading container types from {args.container}')
+    with metrics.phase('load_container'):
+        container_types = Container.all_from_data(args.container)
+    for container_type in container_types:
+        print(f"Container type: {container_type.name}")
+        print(f"  Dimensions: {container_type.width} x {container_type.height} x {container_type.depth}")
+        print(f"  Max Weight: {container_type.max_weight}")
+    
+    multi_service = MultiContainerService(engine=args.engine, max_workers=args.workers)
+    with metrics.phase('load_bins') as timing:
+        table = PackingService.load_item_table(args.bins)
+        timing.items += len(table)
+    with metrics.phase('multi_pack'):
+        result = multi_service.pack(container_types, table)
+    print(result.get_packing_summary())
+    validate_containers(args, metrics, result.containers)
+    save_results(args, metrics, result.containers)
+    if args.pack_only:
+        return
+    
+    visualization_service = get_visualization_service(args, metrics)
+    for number, container in enumerate(result.containers, start=1):
+        show_container(visualization_service, container, args, f'container_{number:02d}')
+
+def run_search(args: argparse.Namespace, metrics: Metrics, container: Container) -> Container:
+    """Search for the best packing within the budget, printing each improvement."""
+    def report(progress: SearchProgress) -> None:
+        print(
+            f"Search: {progress.utilization:.1f}% utilization after {progress.attempts} attempts "
+            f"({progress.elapsed:.1f}s, {progress.description})",
+            flush=True
+        )
+    
+    search_service = SearchService(
+        engine=args.engine,
+        max_workers=args.workers,
+        time_limit=args.search,
+        max_attempts=args.search_attempts,
+        seed=args.seed,
+        on_progress=report,
+        metrics=metrics
+    )
+    with metrics.phase('load_bins') as timing:
+        table = PackingService.load_item_table(args.bins)
+        timing.items += len(table)
+    result = search_service.search(container, table)
+    print(result.get_summary())
+    print(result.container.get_packing_summary(include_positions=False))
+    return result.container
+
+def report_progress(progress: PackingProgress) -> None:
+    """Print a progress event of a packing run."""
+    state = 'stopped at deadline' if progress.cancelled else 'done' if progress.done else 'packing'
+    print(
+        f"Progress: {progress.placed} placed, {progress.handled}/{progress.total} handled, "
+        f"{progress.utilization:.1f}% utilization ({progress.elapsed:.1f}s, {state})",
+        flush=True
+    )
+
+def run_single(args: argparse.Namespace, metrics: Metrics) -> None:
+    """Pack bins into the container of Container.tsv and visualize it."""
+    # Create container from data
+    logger.info(f'Loading container from {args.container}')
+    with metrics.phase('load_container'):
+        container = Container.from_data(args.container)
+    
+    # Log container details
+    logger.info(f'Loaded container:')
+    print(f"Container: {container.name}")
+    print(f"  Dimensions: {container.width} x {container.height} x {container.depth}")
+    print(f"  Max Weight: {container.max_weight}")
+    
+    # Pack bins into container
+    if args.search is not None or args.search_attempts is not None:
+        packed_container = run_search(args, metrics, container)
+    else:
+        cache = PackingCache(args.cache_dir) if args.cache_dir else None
+        packing_service = PackingService(engine=args.engine, cache=cache, metrics=metrics, layers=args.layers)
+        cancel = CancellationToken.with_timeout(args.deadline)
+        for progress in packing_service.iter_pack_bins(container, args.bins, cancel, interval=1.0 if args.progress else None):
+            if args.progress or progress.cancelled:
+                report_progress(progress)
+        packed_container = container
+    validate_containers(args, metrics, [packed_container])
+    save_results(args, metrics, [packed_container])
+    
+    # Show 3D visualization
+    if args.pack_only:
+        return
+    visualization_service = get_visualization_service(args, metrics)
+    show_container(visualization_service, packed_container, args)
+
+def report_metrics(args: argparse.Namespace, metrics: Metrics) -> None:
+    """Log the run's metrics and write the Prometheus dump if requested."""
+    logger.info(metrics.format_summary())
+    if args.metrics:
+        with open(args.metrics, 'w') as file:
+            file.write(metrics.to_prometheus())
+        logger.info(f"Metrics written to '{args.metrics}'")
+    if args.profile:
+        logger.info(f"Profile written to '{args.profile}'")
+
 def main():
     """Main entry point for the bin packing application."""
+    configure_logging()
+    args = parse_args()
+    metrics = Metrics()
     try:
-        # Create container from data
-        logger.info('Loading container from Container.tsv')
-        container = Container.from_data()
-        
-        # Log container details
-        logger.info(f'Loaded container:')
-        print(f"Container: {container.name}")
-        print(f"  Dimensions: {container.width} x {container.height} x {container.depth}")
-        print(f"  Max Weight: {container.max_weight}")
-        
-        # Pack bins into container
-        packing_service = PackingService()
-        packed_container = packing_service.pack_bins(container)
-        
-        # Show 3D visualization
-        visualization_service = VisualizationService()
-        visualization_service.show_interactive_plot(packed_container)
+        with metrics.profiling(args.profile, args.trace_memory):
+            if args.multi:
+                run_multi(args, metrics)
+            else:
+                run_single(args, metrics)
+        report_metrics(args, metrics)
         
     except Exception as e:
         logger.error(f"Error in main: {e}")
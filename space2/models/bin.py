@@ -1,5 +1,8 @@
-from typing import List, Optional
-from py3dbp import Item as Py3dbpItem
+from typing import TYPE_CHECKING, List, Optional
+from models.rotation import get_rotated_size
+
+if TYPE_CHECKING:
+    from py3dbp import Item as Py3dbpItem
 
 class PackingBin:
     """
@@ -13,7 +16,8 @@ class PackingBin:
         depth: float,
         weight: float,
         position: Optional[List[float]] = None,
-        rotation_type: int = 0
+        rotation_type: int = 0,
+        upright: bool = False
     ):
         self.name = name
         self.width = width
@@ -22,9 +26,11 @@ class PackingBin:
         self.weight = weight
         self.position = position or [0.0, 0.0, 0.0]
         self.rotation_type = rotation_type
+        # "This side up": only rotations keeping the depth vertical are allowed
+        self.upright = upright
 
     @classmethod
-    def from_py3dbp_item(cls, item: Py3dbpItem) -> 'PackingBin':
+    def from_py3dbp_item(cls, item: 'Py3dbpItem') -> 'PackingBin':
         """
         Create a PackingBin instance from a py3dbp Item.
         
@@ -48,13 +54,15 @@ class PackingBin:
             rotation_type=item.rotation_type
         )
 
-    def to_py3dbp_item(self) -> Py3dbpItem:
+    def to_py3dbp_item(self) -> 'Py3dbpItem':
         """
         Convert to py3dbp Item format for packing algorithm.
         
         Returns:
             Py3dbpItem: Bin in py3dbp format
         """
+        # Imported on demand: only the py3dbp engine needs it
+        from py3dbp import Item as Py3dbpItem
         return Py3dbpItem(
             self.name,
             self.width,
@@ -73,6 +81,15 @@ class PackingBin:
         """
         return self.name.split('_')[0]
 
+    def get_size(self) -> List[float]:
+        """
+        Get the extent of this bin along X, Y and Z in its rotation.
+        
+        Returns:
+            List[float]: Effective (x, y, z) size
+        """
+        return get_rotated_size((self.width, self.height, self.depth), self.rotation_type)
+
     def overlaps_xy(self, other: 'PackingBin') -> bool:
         """
         Check if this bin overlaps with another bin in the X-Y plane.
@@ -83,13 +100,15 @@ class PackingBin:
         Returns:
             bool: True if bins overlap in X-Y plane
         """
+        size = self.get_size()
+        other_size = other.get_size()
         x_overlap = (
-            self.position[0] < other.position[0] + other.width and
-            self.position[0] + self.width > other.position[0]
+            self.position[0] < other.position[0] + other_size[0] and
+            self.position[0] + size[0] > other.position[0]
         )
         y_overlap = (
-            self.position[1] < other.position[1] + other.height and
-            self.position[1] + self.height > other.position[1]
+            self.position[1] < other.position[1] + other_size[1] and
+            self.position[1] + size[1] > other.position[1]
         )
         return x_overlap and y_overlap
 
@@ -100,7 +119,7 @@ class PackingBin:
         Returns:
             float: Z-coordinate of the top surface
         """
-        return self.position[2] + self.depth
+        return self.position[2] + self.get_size()[2]
 
     def get_volume(self) -> float:
         """
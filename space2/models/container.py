@@ -1,45 +1,132 @@
-from typing import List, Optional
-from py3dbp import Bin as Py3dbpBin
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+import numpy as np
 from models.bin import PackingBin
-from utils.file_loader import load_container_data
+from models.container_stats import ContainerStats
+from models.item_table import ItemList, ItemTable
+from models.load_limits import LoadLimits, LoadTracker
+from utils.manifest_loader import (
+    ContainerRecord,
+    ManifestSource,
+    load_container_records,
+    parse_container_row,
+)
+
+if TYPE_CHECKING:
+    from py3dbp import Bin as Py3dbpBin
 
 class Container:
     """
     Represents a container that can hold multiple bins.
     """
-    def __init__(self, name: str, width: float, height: float, depth: float, max_weight: float):
+    def __init__(
+        self,
+        name: str,
+        width: float,
+        height: float,
+        depth: float,
+        max_weight: float,
+        cost: Optional[float] = None,
+        load_limits: Optional[LoadLimits] = None
+    ):
         self.name = name
         self.width = width
         self.height = height
         self.depth = depth
         self.max_weight = max_weight
-        self.items: List[PackingBin] = []
-        self.unfitted_items: List[PackingBin] = []
+        # Relative cost of using this container; defaults to its volume
+        self.cost = cost if cost is not None else width * height * depth
+        # Weight distribution limits enforced while packing (extreme-point engines)
+        self.load_limits = load_limits
+        self.items: Union[List[PackingBin], ItemList] = []
+        self.unfitted_items: Union[List[PackingBin], ItemList] = []
+        self.table: Optional[ItemTable] = None
+        # Free-space state kept by the incremental packing API (see PackingService.add_items)
+        self.packing_state: Optional[Any] = None
+        # Instrumentation of the run that produced this packing (utils.metrics.Metrics)
+        self.metrics: Optional[Any] = None
+        # Weight distribution tracked while packing, if the engine tracked it
+        self.load_tracker: Optional[LoadTracker] = None
+        # Running aggregates of the items (see get_stats); None until queried or after a change
+        self._stats: Optional[ContainerStats] = None
 
     @classmethod
-    def from_data(cls) -> 'Container':
+    def from_data(cls, filepath: ManifestSource = 'Container.tsv') -> 'Container':
         """
         Create a Container instance from Container.tsv data.
         
+        Args:
+            filepath: Path to the container TSV file (or another manifest source)
+            
+        Returns:
+            Container: New Container instance
+        """
+        return cls.from_record(load_container_records(filepath)[0])
+
+    @classmethod
+    def from_row(cls, data: Dict[str, str]) -> 'Container':
+        """
+        Create a Container instance from one Container.tsv row.
+        
+        Args:
+            data: Row with ID, Width, Height, Depth, MaxWeight and optional Cost
+            
+        Returns:
+            Container: New Container instance
+        """
+        return cls.from_record(parse_container_row(data))
+
+    @classmethod
+    def from_record(cls, record: ContainerRecord) -> 'Container':
+        """
+        Create a Container instance from a typed Container.tsv record.
+        
+        Args:
+            record: Container record
+            
         Returns:
             Container: New Container instance
         """
-        data = load_container_data()
         return cls(
-            name=data['ID'],
-            width=float(data['Width']),
-            height=float(data['Height']),
-            depth=float(data['Depth']),
-            max_weight=float(data['MaxWeight'])
+            name=record.id,
+            width=record.width,
+            height=record.height,
+            depth=record.depth,
+            max_weight=record.max_weight,
+            cost=record.cost,
+            load_limits=LoadLimits.from_record(record)
         )
 
-    def to_py3dbp_bin(self) -> Py3dbpBin:
+    @classmethod
+    def all_from_data(cls, filepath: ManifestSource = 'Container.tsv') -> List['Container']:
+        """
+        Create one Container per row of Container.tsv (the available container types).
+        
+        Args:
+            filepath: Path to the container TSV file (or another manifest source)
+            
+        Returns:
+            List[Container]: Empty containers, one per type
+        """
+        return [cls.from_record(record) for record in load_container_records(filepath)]
+
+    def copy_empty(self) -> 'Container':
+        """
+        Create an empty container of the same type.
+        
+        Returns:
+            Container: New empty Container instance
+        """
+        return Container(self.name, self.width, self.height, self.depth, self.max_weight, self.cost, self.load_limits)
+
+    def to_py3dbp_bin(self) -> 'Py3dbpBin':
         """
         Convert to py3dbp Bin format for packing algorithm.
         
         Returns:
             Py3dbpBin: Container in py3dbp format
         """
+        # Imported on demand: only the py3dbp engine needs it
+        from py3dbp import Bin as Py3dbpBin
         return Py3dbpBin(
             self.name,
             self.width,
@@ -48,13 +135,93 @@ class Container:
             self.max_weight
         )
 
+    def set_table(
+        self,
+        table: ItemTable,
+        fitted: Any,
+        unfitted: Any,
+        load_tracker: Optional[LoadTracker] = None
+    ) -> None:
+        """
+        Use an ItemTable as the storage for this container's items.
+        
+        Args:
+            table: Table holding every unit, with positions filled in for fitted ones
+            fitted: Row indices of fitted units, in placement order
+            unfitted: Row indices of units that couldn't be fitted
+            load_tracker: Tracker of the fitted units kept while packing; rebuilt from
+                the table when not given and the load needs tracking
+        """
+        self.table = table
+        self.items = ItemList(table, fitted)
+        self.unfitted_items = ItemList(table, unfitted)
+        self.packing_state = None
+        self._stats = None
+        if load_tracker is not None:
+            self.load_tracker = load_tracker
+        else:
+            self.rebuild_load_tracker()
+
+    def needs_load_tracking(self) -> bool:
+        """Whether the container has load limits or holds units with a MaxLoad."""
+        if self.load_limits is not None:
+            return True
+        return self.table is not None and bool(np.isfinite(self.table.max_load).any())
+
+    def rebuild_load_tracker(self) -> None:
+        """
+        Rebuild load_tracker from the fitted units of the table (after they were moved or removed).
+
+        The tracker is dropped when the load needs no tracking.
+        """
+        if not isinstance(self.items, ItemList) or not self.needs_load_tracking():
+            self.load_tracker = None
+            return
+        rows = self.items.indices
+        self.load_tracker = LoadTracker.from_boxes(
+            self.width,
+            self.height,
+            self.depth,
+            self.max_weight,
+            self.load_limits,
+            self.table.position[rows],
+            self.table.size[rows],
+            self.table.weight[rows],
+            self.table.max_load[rows]
+        )
+
     def add_fitted_item(self, item: PackingBin) -> None:
         """Add a successfully fitted item to the container."""
         self.items.append(item)
+        if self._stats is not None:
+            self._stats.add(item, True)
 
     def add_unfitted_item(self, item: PackingBin) -> None:
         """Add an item that couldn't be fitted to the unfitted items list."""
         self.unfitted_items.append(item)
+        if self._stats is not None:
+            self._stats.add(item, False)
+
+    def get_stats(self) -> ContainerStats:
+        """
+        Get the running aggregates of the items (volumes, weights, counts per type, height).
+
+        They are computed once after the items change and kept up to date by
+        add_fitted_item/add_unfitted_item, so repeated queries are O(1).
+        
+        Returns:
+            ContainerStats: Aggregates (don't modify)
+        """
+        if self._stats is None:
+            if isinstance(self.items, ItemList) and isinstance(self.unfitted_items, ItemList):
+                self._stats = ContainerStats.from_table(self.table, self.items.indices, self.unfitted_items.indices)
+            else:
+                self._stats = ContainerStats.from_items(self.items, self.unfitted_items)
+        return self._stats
+
+    def invalidate_stats(self) -> None:
+        """Drop the cached aggregates after items were moved or removed outside add_*_item."""
+        self._stats = None
 
     def get_volume(self) -> float:
         """
@@ -72,7 +239,7 @@ class Container:
         Returns:
             float: Total volume of packed bins in cubic feet
         """
-        return sum(item.get_volume() for item in self.items)
+        return self.get_stats().packed_volume
 
     def get_unpacked_volume(self) -> float:
         """
@@ -81,7 +248,7 @@ class Container:
         Returns:
             float: Total volume of unpacked bins in cubic feet
         """
-        return sum(item.get_volume() for item in self.unfitted_items)
+        return self.get_stats().unpacked_volume
 
     def get_volume_utilization(self) -> float:
         """
@@ -116,6 +283,9 @@ class Container:
             f"Volume Utilization: {self.get_volume_utilization():.1f}%"
         ]
         
+        if self.load_tracker is not None:
+            summary.extend(self.load_tracker.get_summary())
+        
         if include_positions:
             summary.append("\nBin positions:")
             for item in self.items:
@@ -126,7 +296,10 @@ class Container:
         
         if self.unfitted_items:
             summary.append("\nUnfitted bins:")
-            for item in self.unfitted_items:
-                summary.append(f"{item.name}")
+            if isinstance(self.unfitted_items, ItemList):
+                summary.extend(self.unfitted_items.get_names())
+            else:
+                for item in self.unfitted_items:
+                    summary.append(f"{item.name}")
         
         return "\n".join(summary)
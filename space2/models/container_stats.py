@@ -0,0 +1,111 @@
+from typing import Any, Dict, Iterable
+import numpy as np
+from models.item_table import ItemTable
+
+
+class ContainerStats:
+    """
+    Running aggregates of a container's fitted and unfitted items.
+
+    Built once from the item table (vectorized), then updated per added
+    item, so every query is O(1). The container drops it whenever items
+    move or are removed, and it is rebuilt on the next query.
+    """
+    __slots__ = (
+        'packed_count', 'unfitted_count', 'packed_volume', 'unpacked_volume',
+        'packed_weight', 'unpacked_weight', 'packed_by_type', 'unfitted_by_type', 'height'
+    )
+
+    def __init__(self):
+        self.packed_count = 0
+        self.unfitted_count = 0
+        self.packed_volume = 0.0
+        self.unpacked_volume = 0.0
+        self.packed_weight = 0.0
+        self.unpacked_weight = 0.0
+        self.packed_by_type: Dict[str, int] = {}
+        self.unfitted_by_type: Dict[str, int] = {}
+        # Top of the highest fitted item (Z extent of the load)
+        self.height = 0.0
+
+    @classmethod
+    def from_table(cls, table: ItemTable, fitted: np.ndarray, unfitted: np.ndarray) -> 'ContainerStats':
+        """
+        Compute the aggregates of table rows.
+
+        Args:
+            table: Item table
+            fitted: Row indices of fitted units
+            unfitted: Row indices of unfitted units
+
+        Returns:
+            ContainerStats: Aggregates
+        """
+        stats = cls()
+        volumes = table.get_volumes()
+        type_count = len(table.type_names)
+        stats.packed_count = len(fitted)
+        stats.unfitted_count = len(unfitted)
+        stats.packed_volume = float(volumes[fitted].sum())
+        stats.unpacked_volume = float(volumes[unfitted].sum())
+        stats.packed_weight = float(table.weight[fitted].sum())
+        stats.unpacked_weight = float(table.weight[unfitted].sum())
+        for counts, rows in ((stats.packed_by_type, fitted), (stats.unfitted_by_type, unfitted)):
+            for type_id, count in enumerate(np.bincount(table.type_id[rows], minlength=type_count).tolist()):
+                if count:
+                    counts[table.type_names[type_id]] = count
+        if len(fitted):
+            stats.height = float((table.position[fitted, 2] + table.get_sizes(fitted)[:, 2]).max())
+        return stats
+
+    @classmethod
+    def from_items(cls, fitted: Iterable[Any], unfitted: Iterable[Any]) -> 'ContainerStats':
+        """
+        Compute the aggregates of item objects (PackingBin or ItemView).
+
+        Args:
+            fitted: Fitted items
+            unfitted: Unfitted items
+
+        Returns:
+            ContainerStats: Aggregates
+        """
+        stats = cls()
+        for item in fitted:
+            stats.add(item, True)
+        for item in unfitted:
+            stats.add(item, False)
+        return stats
+
+    def add(self, item: Any, fitted: bool) -> None:
+        """
+        Account for one more item.
+
+        Args:
+            item: PackingBin or ItemView
+            fitted: Whether the item was fitted
+        """
+        volume = item.width * item.height * item.depth
+        if fitted:
+            self.packed_count += 1
+            self.packed_volume += volume
+            self.packed_weight += item.weight
+            self.packed_by_type[item.bin_type] = self.packed_by_type.get(item.bin_type, 0) + 1
+            self.height = max(self.height, float(item.position[2]) + item.get_size()[2])
+        else:
+            self.unfitted_count += 1
+            self.unpacked_volume += volume
+            self.unpacked_weight += item.weight
+            self.unfitted_by_type[item.bin_type] = self.unfitted_by_type.get(item.bin_type, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the aggregates as a JSON-serializable dict.
+
+        Returns:
+            Dict[str, Any]: Aggregates
+        """
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values['packed_by_type'] = dict(self.packed_by_type)
+        values['unfitted_by_type'] = dict(self.unfitted_by_type)
+        return values
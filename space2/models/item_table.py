@@ -0,0 +1,487 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from models.rotation import ALL_ROTATIONS, ROTATIONS, OrientationTable
+from utils.manifest_loader import BinRecord, parse_bin_row
+
+
+class ItemTable:
+    """
+    Array-backed (struct-of-arrays) storage for the units to be packed.
+
+    One row per unit: a manifest row with Quantity=50000 costs 50000 array
+    rows, not 50000 Python objects. Names such as "Large_3" are built on
+    demand from the type id and the unit's ordinal within its manifest row.
+    """
+    def __init__(
+        self,
+        type_names: Sequence[str],
+        type_id: Sequence[int],
+        dims: Any,
+        weight: Sequence[float],
+        ordinal: Optional[Sequence[int]] = None,
+        max_load: Optional[Sequence[float]] = None,
+        upright: Optional[Sequence[bool]] = None
+    ):
+        self.type_names = list(type_names)
+        self.type_id = np.asarray(type_id, dtype=np.int32)
+        self.dims = np.asarray(dims, dtype=np.float64).reshape(-1, 3)  # width, height, depth
+        self.weight = np.asarray(weight, dtype=np.float64)
+        count = len(self.type_id)
+        self.ordinal = (
+            np.asarray(ordinal, dtype=np.int64) if ordinal is not None
+            else np.arange(1, count + 1, dtype=np.int64)
+        )
+        # Weight each unit can carry on top of it (inf: unlimited)
+        self.max_load = (
+            np.asarray(max_load, dtype=np.float64) if max_load is not None
+            else np.full(count, np.inf)
+        )
+        # "This side up": only rotations keeping the depth vertical are allowed
+        self.upright = (
+            np.asarray(upright, dtype=bool) if upright is not None
+            else np.zeros(count, dtype=bool)
+        )
+        self.position = np.zeros((count, 3), dtype=np.float64)
+        self.rotation = np.zeros(count, dtype=np.int8)
+        # Effective extent along X, Y and Z in the unit's rotation (kept by set_rotation)
+        self.size = self.dims.copy()
+        self.fitted = np.zeros(count, dtype=bool)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, str]]) -> 'ItemTable':
+        """
+        Create an ItemTable from raw Bins.tsv rows, expanding quantities without per-unit objects.
+
+        Args:
+            rows: Rows with Type, Width, Height, Depth, Weight and Quantity
+
+        Returns:
+            ItemTable: One table row per unit
+        """
+        return cls.from_records(parse_bin_row(row, line=line) for line, row in enumerate(rows, start=2))
+
+    @classmethod
+    def from_records(cls, records: Iterable[BinRecord]) -> 'ItemTable':
+        """
+        Create an ItemTable from typed Bins.tsv records, expanding quantities without per-unit objects.
+
+        Records may be streamed: only one small entry per manifest row is kept
+        until the unit arrays are built.
+
+        Args:
+            records: Bin records (e.g. from utils.manifest_loader)
+
+        Returns:
+            ItemTable: One table row per unit
+        """
+        type_ids: Dict[str, int] = {}
+        row_types: List[int] = []
+        quantities: List[int] = []
+        dims: List[Tuple[float, float, float]] = []
+        weights: List[float] = []
+        max_loads: List[float] = []
+        uprights: List[bool] = []
+        for record in records:
+            row_types.append(type_ids.setdefault(record.type, len(type_ids)))
+            quantities.append(record.quantity)
+            dims.append((record.width, record.height, record.depth))
+            weights.append(record.weight)
+            max_loads.append(np.inf if record.max_load is None else record.max_load)
+            uprights.append(record.upright)
+        row_type = np.array(row_types, dtype=np.int32)
+        quantity = np.array(quantities, dtype=np.int64)
+        row_dims = np.array(dims, dtype=np.float64).reshape(-1, 3)
+        row_weight = np.array(weights, dtype=np.float64)
+        row_max_load = np.array(max_loads, dtype=np.float64)
+        row_upright = np.array(uprights, dtype=bool)
+
+        # Units are numbered 1..Quantity within each row, as in PackingService.load_bins
+        row_start = np.cumsum(quantity) - quantity
+        ordinal = np.arange(quantity.sum(), dtype=np.int64) - np.repeat(row_start, quantity) + 1
+
+        return cls(
+            type_names=list(type_ids),
+            type_id=np.repeat(row_type, quantity),
+            dims=np.repeat(row_dims, quantity, axis=0),
+            weight=np.repeat(row_weight, quantity),
+            ordinal=ordinal,
+            max_load=np.repeat(row_max_load, quantity),
+            upright=np.repeat(row_upright, quantity)
+        )
+
+    @classmethod
+    def from_bins(cls, bins: Sequence) -> 'ItemTable':
+        """
+        Create an ItemTable from PackingBin-like objects, keeping their positions.
+
+        Args:
+            bins: Objects with name, width, height, depth, weight, position, rotation_type
+                and optionally upright
+
+        Returns:
+            ItemTable: One table row per bin
+        """
+        type_ids: Dict[str, int] = {}
+        ordinals = []
+        for index, item in enumerate(bins):
+            suffix = item.name.rsplit('_', 1)[-1]
+            ordinals.append(int(suffix) if suffix.isdigit() else index + 1)
+        table = cls(
+            type_names=[],
+            type_id=[type_ids.setdefault(item.bin_type, len(type_ids)) for item in bins],
+            dims=[[item.width, item.height, item.depth] for item in bins],
+            weight=[item.weight for item in bins],
+            ordinal=ordinals,
+            upright=[getattr(item, 'upright', False) for item in bins]
+        )
+        table.type_names = list(type_ids)
+        if len(bins):
+            table.position[:] = [list(item.position) for item in bins]
+            table.set_rotation(slice(None), [item.rotation_type for item in bins])
+        return table
+
+    def __len__(self) -> int:
+        return len(self.type_id)
+
+    def take(self, indices: Any) -> 'ItemTable':
+        """
+        Create a new table with the given rows, in the given order.
+
+        Args:
+            indices: Row indices (or boolean mask)
+
+        Returns:
+            ItemTable: New table
+        """
+        table = ItemTable(
+            self.type_names,
+            self.type_id[indices],
+            self.dims[indices],
+            self.weight[indices],
+            self.ordinal[indices],
+            self.max_load[indices],
+            self.upright[indices]
+        )
+        table.position[:] = self.position[indices]
+        table.rotation[:] = self.rotation[indices]
+        table.size[:] = self.size[indices]
+        table.fitted[:] = self.fitted[indices]
+        return table
+
+    def append(self, other: 'ItemTable') -> np.ndarray:
+        """
+        Append the rows of another table (types are matched by name).
+
+        Args:
+            other: Table with the rows to add
+
+        Returns:
+            np.ndarray: Row indices of the appended rows in this table
+        """
+        for name in other.type_names:
+            if name not in self.type_names:
+                self.type_names.append(name)
+        type_map = np.array([self.type_names.index(name) for name in other.type_names], dtype=np.int32)
+
+        start = len(self)
+        self.type_id = np.concatenate([self.type_id, type_map[other.type_id] if len(other) else other.type_id])
+        self.dims = np.concatenate([self.dims, other.dims])
+        self.weight = np.concatenate([self.weight, other.weight])
+        self.ordinal = np.concatenate([self.ordinal, other.ordinal])
+        self.max_load = np.concatenate([self.max_load, other.max_load])
+        self.upright = np.concatenate([self.upright, other.upright])
+        self.position = np.concatenate([self.position, other.position])
+        self.rotation = np.concatenate([self.rotation, other.rotation])
+        self.size = np.concatenate([self.size, other.size])
+        self.fitted = np.concatenate([self.fitted, other.fitted])
+        return np.arange(start, len(self), dtype=np.int64)
+
+    def find_rows(self, names: Sequence[str], within: Optional[Any] = None) -> np.ndarray:
+        """
+        Find the rows of units by name (e.g., "Large_3").
+
+        Args:
+            names: Unit names
+            within: Optional row indices to search (defaults to every row)
+
+        Returns:
+            np.ndarray: Row index per name (-1 when not found)
+        """
+        candidates = np.arange(len(self)) if within is None else np.asarray(within, dtype=np.int64)
+        type_id = self.type_id[candidates]
+        ordinal = self.ordinal[candidates]
+        rows = np.full(len(names), -1, dtype=np.int64)
+        for i, name in enumerate(names):
+            bin_type, _, number = name.rpartition('_')
+            if bin_type not in self.type_names or not number.isdigit():
+                continue
+            matches = np.flatnonzero((type_id == self.type_names.index(bin_type)) & (ordinal == int(number)))
+            if len(matches):
+                rows[i] = candidates[matches[0]]
+        return rows
+
+    def canonicalize(self) -> 'ItemTable':
+        """
+        Create a copy in a canonical row order.
+
+        Rows are ordered by type name, dimensions, weight and ordinal, and type
+        ids follow the sorted type names, so two manifests listing the same
+        units in a different row order produce identical tables.
+
+        Returns:
+            ItemTable: Canonically ordered table
+        """
+        names = sorted(self.type_names)
+        rank = np.array([names.index(name) for name in self.type_names], dtype=np.int32)
+        type_id = rank[self.type_id] if len(self) else self.type_id
+        order = np.lexsort((
+            self.ordinal,
+            self.upright,
+            self.max_load,
+            self.weight,
+            self.dims[:, 2],
+            self.dims[:, 1],
+            self.dims[:, 0],
+            type_id
+        ))
+        table = self.take(order)
+        table.type_names = names
+        table.type_id = type_id[order]
+        return table
+
+    def get_volumes(self) -> np.ndarray:
+        """
+        Calculate the volume of every unit.
+
+        Returns:
+            np.ndarray: Volume per row
+        """
+        return self.dims.prod(axis=1)
+
+    def set_rotation(self, indices: Any, rotation: Any) -> None:
+        """
+        Set the rotation of units and store the effective size it gives them.
+
+        Args:
+            indices: Row indices (or a slice/mask)
+            rotation: Rotation type per row (or one for all)
+        """
+        rows = np.atleast_1d(np.arange(len(self))[indices])
+        self.rotation[rows] = rotation
+        self.size[rows] = np.take_along_axis(self.dims[rows], ROTATIONS[self.rotation[rows]], axis=1)
+
+    def get_sizes(self, indices: Any = slice(None)) -> np.ndarray:
+        """
+        Get the dimensions of units as placed (after their rotation).
+
+        Args:
+            indices: Row indices (defaults to every row)
+
+        Returns:
+            np.ndarray: (n, 3) extent along X, Y and Z
+        """
+        return self.size[indices]
+
+    def get_orientations(self, preference: Sequence[int] = ALL_ROTATIONS) -> OrientationTable:
+        """
+        Precompute the allowed orientations of every distinct shape (dims and upright flag).
+
+        Args:
+            preference: Rotation types in order of preference
+
+        Returns:
+            OrientationTable: Orientations, with the shape id of every row
+        """
+        return OrientationTable(self.dims, self.upright, preference)
+
+    def get_names(self, indices: Any) -> List[str]:
+        """
+        Get the display names of several units at once.
+
+        Args:
+            indices: Row indices
+
+        Returns:
+            List[str]: Unit names
+        """
+        type_names = self.type_names
+        return [
+            f"{type_names[type_id]}_{ordinal}"
+            for type_id, ordinal in zip(self.type_id[indices].tolist(), self.ordinal[indices].tolist())
+        ]
+
+    def get_name(self, index: int) -> str:
+        """
+        Get the display name of a unit (e.g., "Small_1").
+
+        Args:
+            index: Row index
+
+        Returns:
+            str: Unit name
+        """
+        return f"{self.type_names[self.type_id[index]]}_{self.ordinal[index]}"
+
+    def view(self, index: int) -> 'ItemView':
+        """
+        Get a PackingBin-like view of one row.
+
+        Args:
+            index: Row index
+
+        Returns:
+            ItemView: View backed by this table
+        """
+        return ItemView(self, index)
+
+
+class ItemView:
+    """
+    Lightweight PackingBin-compatible view of one ItemTable row.
+
+    Reads and writes (e.g. item.position[2] = 0) go straight to the table arrays.
+    """
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: ItemTable, index: int):
+        self.table = table
+        self.index = int(index)
+
+    @property
+    def name(self) -> str:
+        return self.table.get_name(self.index)
+
+    @property
+    def bin_type(self) -> str:
+        return self.table.type_names[self.table.type_id[self.index]]
+
+    @property
+    def width(self) -> float:
+        return float(self.table.dims[self.index, 0])
+
+    @property
+    def height(self) -> float:
+        return float(self.table.dims[self.index, 1])
+
+    @property
+    def depth(self) -> float:
+        return float(self.table.dims[self.index, 2])
+
+    @property
+    def weight(self) -> float:
+        return float(self.table.weight[self.index])
+
+    @property
+    def max_load(self) -> float:
+        return float(self.table.max_load[self.index])
+
+    @property
+    def upright(self) -> bool:
+        return bool(self.table.upright[self.index])
+
+    @property
+    def position(self) -> np.ndarray:
+        return self.table.position[self.index]
+
+    @position.setter
+    def position(self, value: Sequence[float]) -> None:
+        self.table.position[self.index] = value
+
+    @property
+    def rotation_type(self) -> int:
+        return int(self.table.rotation[self.index])
+
+    @rotation_type.setter
+    def rotation_type(self, value: int) -> None:
+        self.table.set_rotation(self.index, value)
+
+    def get_size(self) -> List[float]:
+        """Get the extent of this item along X, Y and Z in its rotation."""
+        return self.table.size[self.index].tolist()
+
+    def overlaps_xy(self, other) -> bool:
+        """Check if this item overlaps with another item in the X-Y plane."""
+        size = self.get_size()
+        other_size = other.get_size()
+        return (
+            self.position[0] < other.position[0] + other_size[0] and
+            self.position[0] + size[0] > other.position[0] and
+            self.position[1] < other.position[1] + other_size[1] and
+            self.position[1] + size[1] > other.position[1]
+        )
+
+    def get_top_surface_height(self) -> float:
+        """Get the Z-coordinate of the top surface of this item."""
+        return float(self.position[2]) + self.get_size()[2]
+
+    def get_volume(self) -> float:
+        """Calculate the volume of this item."""
+        return self.width * self.height * self.depth
+
+    def __repr__(self) -> str:
+        return f"ItemView({self.name!r}, index={self.index})"
+
+
+class ItemList:
+    """
+    List-like sequence of ItemTable rows, stored as an index array.
+
+    Used for Container.items / Container.unfitted_items when packing from an
+    ItemTable; items are materialized as ItemView objects only when accessed.
+    """
+    def __init__(self, table: ItemTable, indices: Optional[Any] = None):
+        self.table = table
+        self.indices = indices if indices is not None else []
+
+    @property
+    def indices(self) -> np.ndarray:
+        """Row indices, with any rows appended since the last access merged in."""
+        if self._pending:
+            self._indices = np.concatenate([self._indices, np.asarray(self._pending, dtype=np.int64)])
+            self._pending = []
+        return self._indices
+
+    @indices.setter
+    def indices(self, value: Any) -> None:
+        self._indices = np.asarray(value, dtype=np.int64)
+        self._pending: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._indices) + len(self._pending)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[ItemView, 'ItemList']:
+        if isinstance(key, slice):
+            return ItemList(self.table, self.indices[key])
+        return ItemView(self.table, self.indices[key])
+
+    def __iter__(self) -> Iterator[ItemView]:
+        table = self.table
+        for index in self.indices.tolist():
+            yield ItemView(table, index)
+
+    def append(self, item: ItemView) -> None:
+        """Append a view of a row of the same table."""
+        if not isinstance(item, ItemView) or item.table is not self.table:
+            raise TypeError("Only views of this list's ItemTable can be appended")
+        # Buffered so repeated appends don't copy the index array each time
+        self._pending.append(item.index)
+
+    def sort(self, key: Optional[Callable[[ItemView], Any]] = None, reverse: bool = False) -> None:
+        """Sort in place (stable), like list.sort."""
+        items = list(self)
+        keys = [key(item) for item in items] if key else [item.index for item in items]
+        order = sorted(range(len(items)), key=keys.__getitem__, reverse=reverse)
+        self.indices = self.indices[order]
+
+    def get_names(self) -> List[str]:
+        """Get the names of all listed items."""
+        return self.table.get_names(self.indices)
+
+    def get_total_volume(self) -> float:
+        """
+        Calculate the total volume of the listed items.
+
+        Returns:
+            float: Total volume
+        """
+        return float(self.table.get_volumes()[self.indices].sum())
@@ -0,0 +1,448 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from models.spatial_index import SURFACE_EPSILON, SpatialIndex
+
+# Names of the constraints a placement can violate
+MOMENT_OFFSET = 'moment_offset'
+CENTER_OF_GRAVITY = 'center_of_gravity'
+AXLE_LOAD = 'axle_load'
+FLOOR_LOAD = 'floor_load'
+STACKED_WEIGHT = 'stacked_weight'
+
+
+class LoadLimits:
+    """
+    Weight distribution limits of a container (the optional load limit columns of Container.tsv).
+
+    X runs along the container width (the length of a truck or trailer),
+    Y along its height and Z is vertical, as everywhere else.
+    """
+    def __init__(
+        self,
+        max_moment_offset: Optional[float] = None,
+        max_cog_offset: Optional[float] = None,
+        cog_min_weight: Optional[float] = None,
+        floor_cell_size: Optional[float] = None,
+        max_floor_load: Optional[float] = None,
+        front_axle: Optional[float] = None,
+        rear_axle: Optional[float] = None,
+        max_axle_load: Optional[float] = None
+    ):
+        """
+        Args:
+            max_moment_offset: Bound on the load's X/Y moment about the container
+                center: the moment the rated payload (max_weight) would have at this
+                offset, as a fraction of the container size. This is not a bound on
+                the center of gravity itself: a load of a fraction f of the payload
+                may have its center of gravity up to max_moment_offset / f off
+                center, so partial loads can be built up from a corner.
+            max_cog_offset: Maximum X/Y offset of the load's center of gravity from
+                the container center, as a fraction of the container size
+            cog_min_weight: Load weight from which max_cog_offset applies (a light
+                partial load can't be centered while it is built up from a corner)
+            floor_cell_size: Side of the square floor cells loads are tracked in
+            max_floor_load: Maximum weight resting on one floor cell
+            front_axle: X position of the front axle
+            rear_axle: X position of the rear axle
+            max_axle_load: Maximum load on either axle
+        """
+        if (max_cog_offset is None) != (cog_min_weight is None):
+            raise ValueError("MaxCogOffset and CogMinWeight must be given together")
+        if (floor_cell_size is None) != (max_floor_load is None):
+            raise ValueError("FloorCellSize and MaxFloorLoad must be given together")
+        axles = (front_axle, rear_axle, max_axle_load)
+        if any(value is not None for value in axles) and any(value is None for value in axles):
+            raise ValueError("FrontAxle, RearAxle and MaxAxleLoad must be given together")
+        if front_axle is not None and front_axle == rear_axle:
+            raise ValueError("FrontAxle and RearAxle must differ")
+        self.max_moment_offset = max_moment_offset
+        self.max_cog_offset = max_cog_offset
+        self.cog_min_weight = cog_min_weight
+        self.floor_cell_size = floor_cell_size
+        self.max_floor_load = max_floor_load
+        self.front_axle = front_axle
+        self.rear_axle = rear_axle
+        self.max_axle_load = max_axle_load
+
+    @classmethod
+    def from_record(cls, record) -> Optional['LoadLimits']:
+        """
+        Create limits from a ContainerRecord.
+
+        Args:
+            record: Container record (utils.manifest_loader.ContainerRecord)
+
+        Returns:
+            Optional[LoadLimits]: Limits, or None when the record sets none
+        """
+        limits = cls(
+            max_moment_offset=record.max_moment_offset,
+            max_cog_offset=record.max_cog_offset,
+            cog_min_weight=record.cog_min_weight,
+            floor_cell_size=record.floor_cell_size,
+            max_floor_load=record.max_floor_load,
+            front_axle=record.front_axle,
+            rear_axle=record.rear_axle,
+            max_axle_load=record.max_axle_load
+        )
+        return limits if limits.to_dict() else None
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Get the limits that are set.
+
+        Returns:
+            Dict[str, float]: Limit name to value
+        """
+        return {name: value for name, value in vars(self).items() if value is not None}
+
+
+class LoadTracker:
+    """
+    Incrementally tracked weight distribution of the boxes placed so far.
+
+    Keeps the running total weight and moment (center of gravity and axle
+    loads), the load on each floor cell, and the weight each box carries
+    through the support relation, so checking a placement never rescans the
+    placed boxes:
+
+    - load moment, center of gravity and axle loads: O(1) from the running moment
+    - floor cells: O(cells under the footprint); a box's weight is projected
+      straight down onto the floor cells below it
+    - stacked weight: supporters are found through a SpatialIndex (as in
+      PackingService.settle_heights). Each box keeps the weight it carries and
+      its remaining capacity (the weight that can still be set on it without
+      overloading it or any box below it), so a check only looks at the new
+      box's direct supporters. add() passes the new weight down the support
+      cone and lowers the capacities it affects.
+    """
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        depth: float,
+        max_weight: float,
+        limits: Optional[LoadLimits] = None,
+        cell_size: float = 1.0
+    ):
+        """
+        Args:
+            width, height, depth: Container size
+            max_weight: Rated payload of the container
+            limits: Limits to enforce (stacked weight is always checked)
+            cell_size: Cell size of the support index (e.g. a typical footprint side)
+        """
+        self.size = np.array([width, height, depth], dtype=np.float64)
+        self.max_weight = max_weight
+        self.limits = limits or LoadLimits()
+        self.total_weight = 0.0
+        self.moment = np.zeros(3, dtype=np.float64)
+        floor_cell = self.limits.floor_cell_size or max(width, height)
+        self.floor_cell = floor_cell
+        self.floor_load = np.zeros((max(math.ceil(width / floor_cell), 1), max(math.ceil(height / floor_cell), 1)))
+        self.index = SpatialIndex(cell_size)
+        # Per placed box (index ids follow insertion order)
+        self.bottoms: List[float] = []
+        self.carried: List[float] = []
+        self.max_loads: List[float] = []
+        self.capacity: List[float] = []
+        # Top face area covered by the boxes resting on each box
+        self.covered: List[float] = []
+        # (box id, share of the weight) pairs below and above each box
+        self.supports: List[List[Tuple[int, float]]] = []
+        self.supported: List[List[Tuple[int, float]]] = []
+
+    @classmethod
+    def from_boxes(
+        cls,
+        width: float,
+        height: float,
+        depth: float,
+        max_weight: float,
+        limits: Optional[LoadLimits],
+        lo: np.ndarray,
+        size: np.ndarray,
+        weights: np.ndarray,
+        max_loads: np.ndarray
+    ) -> 'LoadTracker':
+        """
+        Build a tracker of boxes that are already placed (e.g. restored from a cache).
+
+        Boxes are added bottom-up, so each one finds its supports already tracked.
+
+        Args:
+            width, height, depth: Container size
+            max_weight: Rated payload of the container
+            limits: Limits to enforce
+            lo: (n, 3) lower corners of resting boxes
+            size: (n, 3) effective box dimensions
+            weights: (n,) box weights
+            max_loads: (n,) weight each box can carry on top of it
+
+        Returns:
+            LoadTracker: Tracker holding every box
+        """
+        cell_size = SpatialIndex.for_footprints(size[:, 0].tolist(), size[:, 1].tolist()).cell_size
+        tracker = cls(width, height, depth, max_weight, limits, cell_size)
+        for box in np.argsort(lo[:, 2], kind='stable').tolist():
+            tracker.add(lo[box], size[box], float(weights[box]), float(max_loads[box]))
+        return tracker
+
+    def __len__(self) -> int:
+        return len(self.carried)
+
+    def rest(self, lo: Sequence[float], size: Sequence[float]) -> Tuple[float, List[Tuple[int, float]]]:
+        """
+        Find where a free box comes to rest and how its weight splits over its supports.
+
+        Args:
+            lo: Lower corner of a box that doesn't intersect any placed box
+            size: Effective box dimensions
+
+        Returns:
+            Tuple[float, List[Tuple[int, float]]]: (resting Z, (supporting box id, share by
+                contact area) pairs; empty on the floor)
+        """
+        x0, y0, x1, y1 = lo[0], lo[1], lo[0] + size[0], lo[1] + size[1]
+        boxes = self.index.boxes
+        # Boxes overlapping a free footprint are either entirely below or entirely above it
+        below = [
+            box_id for box_id in self.index.query_xy(x0, y0, x1, y1)
+            if boxes[box_id][5] <= lo[2] + SURFACE_EPSILON
+        ]
+        z = max((boxes[box_id][5] for box_id in below), default=0.0)
+        if z <= SURFACE_EPSILON:
+            return 0.0, []
+        areas = []
+        for box_id in below:
+            box = boxes[box_id]
+            if box[5] >= z - SURFACE_EPSILON:
+                areas.append((box_id, (min(x1, box[3]) - max(x0, box[0])) * (min(y1, box[4]) - max(y0, box[1]))))
+        total = sum(area for _, area in areas)
+        return z, [(box_id, area / total) for box_id, area in areas]
+
+    def _stacked_increments(self, shares: List[Tuple[int, float]], weight: float) -> Dict[int, float]:
+        """
+        Pass a new weight down the support relation.
+
+        Boxes are visited top-down (highest bottom first), each once, so a box
+        reached over several paths forwards the sum of what it received.
+
+        Returns:
+            Dict[int, float]: Added carried weight per box
+        """
+        added: Dict[int, float] = {}
+        heap: List[Tuple[float, int]] = []
+        for box_id, share in shares:
+            added[box_id] = added.get(box_id, 0.0) + weight * share
+            heapq.heappush(heap, (-self.bottoms[box_id], box_id))
+        visited = set()
+        while heap:
+            _, box_id = heapq.heappop(heap)
+            if box_id in visited:
+                continue
+            visited.add(box_id)
+            for below, share in self.supports[box_id]:
+                if below not in added:
+                    heapq.heappush(heap, (-self.bottoms[below], below))
+                added[below] = added.get(below, 0.0) + added[box_id] * share
+        return added
+
+    def _capacity(self, shares: List[Tuple[int, float]]) -> float:
+        """
+        Get the weight that can be set on a box resting on the given supports.
+
+        A weight w passes w * share to each supporter. Demanding that the shares
+        sum to at most the whole capacity, sum(w * share / capacity) <= 1, is
+        exact for a single supporter and stays safe when several supporters
+        pass their loads on to the same box further down.
+        """
+        demand = 0.0
+        for box_id, share in shares:
+            capacity = self.capacity[box_id]
+            if capacity <= 0:
+                return 0.0
+            demand += share / capacity
+        return 1 / demand if demand > 0 else math.inf
+
+    def _floor_increments(self, lo: Sequence[float], size: Sequence[float], weight: float) -> Tuple[slice, slice, np.ndarray]:
+        """Split a box's weight over the floor cells under its footprint, by area."""
+        cell = self.floor_cell
+        x0, y0, x1, y1 = lo[0], lo[1], lo[0] + size[0], lo[1] + size[1]
+        nx, ny = self.floor_load.shape
+        ix0, iy0 = min(int(x0 // cell), nx - 1), min(int(y0 // cell), ny - 1)
+        ix1, iy1 = min(max(math.ceil(x1 / cell), ix0 + 1), nx), min(max(math.ceil(y1 / cell), iy0 + 1), ny)
+        edges_x = np.arange(ix0, ix1 + 1) * cell
+        edges_y = np.arange(iy0, iy1 + 1) * cell
+        overlap_x = np.clip(np.minimum(edges_x[1:], x1) - np.maximum(edges_x[:-1], x0), 0, None)
+        overlap_y = np.clip(np.minimum(edges_y[1:], y1) - np.maximum(edges_y[:-1], y0), 0, None)
+        return slice(ix0, ix1), slice(iy0, iy1), weight * np.outer(overlap_x, overlap_y) / (size[0] * size[1])
+
+    def get_axle_loads(self, total_weight: float, moment_x: float) -> Tuple[float, float]:
+        """
+        Split a load between the axles by the lever rule.
+
+        Args:
+            total_weight: Load weight
+            moment_x: Sum of weight times X of each box's center
+
+        Returns:
+            Tuple[float, float]: (front axle load, rear axle load)
+        """
+        front, rear = self.limits.front_axle, self.limits.rear_axle
+        rear_load = (moment_x - total_weight * front) / (rear - front)
+        return total_weight - rear_load, rear_load
+
+    def check(self, lo: Sequence[float], size: Sequence[float], weight: float) -> Optional[str]:
+        """
+        Check whether placing a box keeps every limit.
+
+        The box is checked where it comes to rest below lo (see rest).
+
+        Args:
+            lo: Lower corner of a free box position
+            size: Effective (rotated) box dimensions
+            weight: Box weight
+
+        Returns:
+            Optional[str]: Name of the first violated constraint, or None
+        """
+        limits = self.limits
+        total = self.total_weight + weight
+        # Z doesn't matter for these checks; the box's center height is only tracked
+        center = np.asarray(lo, dtype=np.float64) + np.asarray(size, dtype=np.float64) / 2
+        moment = self.moment + weight * center
+
+        if limits.max_moment_offset is not None:
+            # Moment about the center, against the rated payload's moment at the allowed offset
+            offset = np.abs(moment[:2] - total * self.size[:2] / 2)
+            if np.any(offset > limits.max_moment_offset * self.size[:2] * self.max_weight + SURFACE_EPSILON):
+                return MOMENT_OFFSET
+
+        if limits.max_cog_offset is not None and total >= limits.cog_min_weight:
+            offset = np.abs(moment[:2] / total - self.size[:2] / 2)
+            if np.any(offset > limits.max_cog_offset * self.size[:2] + SURFACE_EPSILON):
+                return CENTER_OF_GRAVITY
+
+        if limits.max_axle_load is not None:
+            if max(self.get_axle_loads(total, moment[0])) > limits.max_axle_load + SURFACE_EPSILON:
+                return AXLE_LOAD
+
+        if limits.max_floor_load is not None:
+            cells_x, cells_y, load = self._floor_increments(lo, size, weight)
+            if np.any(self.floor_load[cells_x, cells_y] + load > limits.max_floor_load + SURFACE_EPSILON):
+                return FLOOR_LOAD
+
+        _, shares = self.rest(lo, size)
+        if weight > self._capacity(shares) + SURFACE_EPSILON:
+            return STACKED_WEIGHT
+        return None
+
+    def add(self, lo: Sequence[float], size: Sequence[float], weight: float, max_load: float = math.inf) -> int:
+        """
+        Record a placed box where it comes to rest below lo.
+
+        Args:
+            lo: Lower corner of a free box position
+            size: Effective (rotated) box dimensions
+            weight: Box weight
+            max_load: Weight the box can carry on top of it
+
+        Returns:
+            int: Id of the box in the tracker
+        """
+        lo = [float(value) for value in lo]
+        size = [float(value) for value in size]
+        lo[2], shares = self.rest(lo, size)
+        added = self._stacked_increments(shares, weight)
+        for box_id, load in added.items():
+            self.carried[box_id] += load
+        cells_x, cells_y, load = self._floor_increments(lo, size, weight)
+        self.floor_load[cells_x, cells_y] += load
+        self.total_weight += weight
+        self.moment += weight * (np.array(lo) + np.array(size) / 2)
+
+        box_id = self.index.insert(lo, [lo[0] + size[0], lo[1] + size[1], lo[2] + size[2]])
+        self.bottoms.append(lo[2])
+        self.carried.append(0.0)
+        self.max_loads.append(max_load)
+        self.supports.append(shares)
+        self.supported.append([])
+        self.covered.append(0.0)
+        boxes = self.index.boxes
+        for below, share in shares:
+            self.supported[below].append((box_id, share))
+            box = boxes[below]
+            self.covered[below] += (
+                (min(lo[0] + size[0], box[3]) - max(lo[0], box[0])) * (min(lo[1] + size[1], box[4]) - max(lo[1], box[1]))
+            )
+            # A box covered all over can't be the highest box under a free footprint
+            # again, so rest() no longer needs to see it (keeps tall stacks cheap)
+            if self.covered[below] >= (box[3] - box[0]) * (box[4] - box[1]) - SURFACE_EPSILON:
+                self.index.remove(below)
+        self.capacity.append(min(max_load, self._capacity(shares)))
+        self._lower_capacities(added)
+        return box_id
+
+    def _lower_capacities(self, changed: Dict[int, float]) -> None:
+        """
+        Recompute the capacities of boxes that carry more weight, and of the boxes above them.
+
+        Boxes are updated bottom-up (lowest bottom first), so each one sees the
+        final capacities of its supporters; propagation stops at boxes whose
+        capacity didn't change.
+        """
+        heap = [(self.bottoms[box_id], box_id) for box_id in changed]
+        heapq.heapify(heap)
+        queued = set(changed)
+        while heap:
+            _, box_id = heapq.heappop(heap)
+            queued.discard(box_id)
+            capacity = min(self.max_loads[box_id] - self.carried[box_id], self._capacity(self.supports[box_id]))
+            if capacity >= self.capacity[box_id] and box_id not in changed:
+                continue
+            self.capacity[box_id] = capacity
+            for above, _ in self.supported[box_id]:
+                if above not in queued:
+                    queued.add(above)
+                    heapq.heappush(heap, (self.bottoms[above], above))
+
+    def get_center_of_gravity(self) -> np.ndarray:
+        """
+        Get the center of gravity of the placed boxes.
+
+        Returns:
+            np.ndarray: (x, y, z), or the container floor center when empty
+        """
+        if self.total_weight <= 0:
+            return np.array([self.size[0] / 2, self.size[1] / 2, 0.0])
+        return self.moment / self.total_weight
+
+    def get_summary(self) -> List[str]:
+        """
+        Get summary lines of the tracked load distribution.
+
+        Returns:
+            List[str]: Summary lines
+        """
+        x, y, z = self.get_center_of_gravity().tolist()
+        lines = [
+            "\nLoad Distribution:",
+            f"Center of Gravity: ({x:.1f}, {y:.1f}, {z:.1f}); "
+            f"container center ({self.size[0] / 2:g}, {self.size[1] / 2:g})",
+        ]
+        if self.limits.max_cog_offset is not None:
+            lines.append(
+                f"Max Center of Gravity Offset: {self.limits.max_cog_offset:g} of the container size "
+                f"from a load of {self.limits.cog_min_weight:g}"
+            )
+        if self.limits.max_axle_load is not None:
+            front, rear = self.get_axle_loads(self.total_weight, self.moment[0])
+            lines.append(f"Axle Loads: front {front:.1f}, rear {rear:.1f} (max {self.limits.max_axle_load:g})")
+        if self.limits.max_floor_load is not None:
+            lines.append(f"Max Floor Cell Load: {self.floor_load.max():.1f} (max {self.limits.max_floor_load:g})")
+        if self.carried:
+            lines.append(f"Max Stacked Weight: {max(self.carried):.1f}")
+        return lines
@@ -0,0 +1,98 @@
+from typing import Any, List, Sequence, Tuple
+import numpy as np
+
+# Axis permutations in the same order as py3dbp.constants.RotationType,
+# so rotation_type values mean the same thing for every engine
+ROTATIONS = np.array([
+    [0, 1, 2],  # RT_WHD
+    [1, 0, 2],  # RT_HWD
+    [1, 2, 0],  # RT_HDW
+    [2, 1, 0],  # RT_DHW
+    [2, 0, 1],  # RT_DWH
+    [0, 2, 1],  # RT_WDH
+])
+ALL_ROTATIONS = tuple(range(len(ROTATIONS)))
+# Rotations that keep a unit's depth vertical ("this side up")
+UPRIGHT_ROTATIONS = tuple(rotation for rotation in ALL_ROTATIONS if ROTATIONS[rotation][2] == 2)
+
+
+def get_rotated_size(dims: Sequence[float], rotation_type: int) -> List[float]:
+    """
+    Get the extent of a box along X, Y and Z in a rotation.
+
+    Args:
+        dims: Box (width, height, depth)
+        rotation_type: Rotation type
+
+    Returns:
+        List[float]: Effective (x, y, z) size
+    """
+    return [dims[axis] for axis in ROTATIONS[rotation_type].tolist()]
+
+
+def get_orientations(
+    dims: Sequence[float],
+    upright: bool = False,
+    preference: Sequence[int] = ALL_ROTATIONS
+) -> Tuple[Tuple[int, ...], np.ndarray]:
+    """
+    Get the distinct allowed orientations of a box.
+
+    Rotations that give the same effective size as an earlier one (e.g. every
+    rotation of a cube) are dropped, so packers never try a placement twice.
+
+    Args:
+        dims: Box (width, height, depth)
+        upright: Whether the box must keep its depth vertical
+        preference: Rotation types in order of preference
+
+    Returns:
+        Tuple[Tuple[int, ...], np.ndarray]: (rotation types, (R, 3) effective sizes)
+    """
+    dims = np.asarray(dims)
+    rotations: List[int] = []
+    seen = set()
+    for rotation in preference:
+        if upright and rotation not in UPRIGHT_ROTATIONS:
+            continue
+        size = tuple(dims[ROTATIONS[rotation]].tolist())
+        if size not in seen:
+            seen.add(size)
+            rotations.append(rotation)
+    return tuple(rotations), dims[ROTATIONS[list(rotations)]].reshape(-1, 3)
+
+
+class OrientationTable:
+    """
+    Allowed orientations of every distinct shape of a set of units, computed once.
+
+    A shape is a distinct (dims, upright) pair, so units of different types
+    with the same dimensions and flags share their orientations (and any
+    per-shape search state of the packer).
+    """
+    def __init__(self, dims: Any, upright: Any, preference: Sequence[int] = ALL_ROTATIONS):
+        """
+        Args:
+            dims: (n, 3) unit dimensions (width, height, depth)
+            upright: (n,) "this side up" flag per unit
+            preference: Rotation types in order of preference
+        """
+        dims = np.asarray(dims, dtype=np.float64).reshape(-1, 3)
+        upright = np.asarray(upright, dtype=bool).reshape(-1)
+        keys = np.concatenate([dims, upright[:, None]], axis=1)
+        if len(keys):
+            unique, shape_ids = np.unique(keys, axis=0, return_inverse=True)
+        else:
+            unique, shape_ids = np.zeros((0, 4)), np.zeros(0, dtype=np.int64)
+        self.shape_ids = shape_ids.reshape(-1).astype(np.int64)
+        self.dims = unique[:, :3]
+        self.upright = unique[:, 3].astype(bool)
+        self.rotations: List[Tuple[int, ...]] = []
+        self.sizes: List[np.ndarray] = []
+        for shape_dims, shape_upright in zip(self.dims, self.upright.tolist()):
+            rotations, sizes = get_orientations(shape_dims, shape_upright, preference)
+            self.rotations.append(rotations)
+            self.sizes.append(sizes)
+
+    def __len__(self) -> int:
+        return len(self.dims)
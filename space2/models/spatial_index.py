@@ -0,0 +1,203 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Tolerance used when matching surfaces (e.g. a box top against a box bottom)
+SURFACE_EPSILON = 1e-6
+
+Box = Tuple[float, float, float, float, float, float]
+
+
+class SpatialIndex:
+    """
+    Uniform grid (bucket hash) over the X-Y footprints of placed boxes.
+
+    Each box is stored in every grid cell its footprint touches, so footprint
+    queries only look at boxes in nearby cells instead of every placed box.
+    Each cell also remembers the highest top surface stored in it, which lets
+    max-height queries skip cells that cannot beat the best height found so far.
+    """
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}")
+        self.cell_size = cell_size
+        self.boxes: Dict[int, Box] = {}
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.cell_max_top: Dict[Tuple[int, int], float] = defaultdict(float)
+        self._next_id = 0
+        # Number of box-vs-rectangle overlap tests done by queries
+        self.checks = 0
+
+    @classmethod
+    def for_items(cls, items: Sequence) -> 'SpatialIndex':
+        """
+        Create an empty index with a cell size suited to a set of bins.
+
+        Args:
+            items: PackingBin-like objects with get_size() (effective, rotated size)
+
+        Returns:
+            SpatialIndex: Empty index
+        """
+        sizes = [item.get_size() for item in items]
+        return cls.for_footprints([size[0] for size in sizes], [size[1] for size in sizes])
+
+    @classmethod
+    def for_footprints(cls, widths: Sequence[float], heights: Sequence[float]) -> 'SpatialIndex':
+        """
+        Create an empty index with a cell size suited to a set of box footprints.
+
+        The cell size is the median footprint side, so a typical box covers
+        about four cells.
+
+        Args:
+            widths: Footprint sizes along X
+            heights: Footprint sizes along Y
+
+        Returns:
+            SpatialIndex: Empty index
+        """
+        sides = sorted(max(w, h) for w, h in zip(widths, heights))
+        cell_size = sides[len(sides) // 2] if sides else 1.0
+        return cls(cell_size if cell_size > 0 else 1.0)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def _cell_range(self, x0: float, y0: float, x1: float, y1: float) -> Iterable[Tuple[int, int]]:
+        """Yield the grid cells touched by an X-Y rectangle."""
+        size = self.cell_size
+        # Footprints are half-open, so an edge lying on a cell border stays in the lower cell
+        ix1 = max(math.floor(x0 / size), math.ceil(x1 / size) - 1)
+        iy1 = max(math.floor(y0 / size), math.ceil(y1 / size) - 1)
+        for ix in range(math.floor(x0 / size), ix1 + 1):
+            for iy in range(math.floor(y0 / size), iy1 + 1):
+                yield ix, iy
+
+    def insert(self, lo: Sequence[float], hi: Sequence[float]) -> int:
+        """
+        Add a box to the index.
+
+        Args:
+            lo: Lower corner (x, y, z)
+            hi: Upper corner (x, y, z)
+
+        Returns:
+            int: Id of the stored box
+        """
+        box_id = self._next_id
+        self._next_id += 1
+        box = (lo[0], lo[1], lo[2], hi[0], hi[1], hi[2])
+        self.boxes[box_id] = box
+        for cell in self._cell_range(box[0], box[1], box[3], box[4]):
+            self.cells[cell].append(box_id)
+            if box[5] > self.cell_max_top[cell]:
+                self.cell_max_top[cell] = box[5]
+        return box_id
+
+    def insert_bin(self, item) -> int:
+        """
+        Add a placed PackingBin to the index.
+
+        Args:
+            item: PackingBin with a position (its rotation is taken into account)
+
+        Returns:
+            int: Id of the stored box
+        """
+        x, y, z = item.position[0], item.position[1], item.position[2]
+        width, height, depth = item.get_size()
+        return self.insert((x, y, z), (x + width, y + height, z + depth))
+
+    def remove(self, box_id: int) -> None:
+        """
+        Remove a box from the index.
+
+        Args:
+            box_id: Id returned by insert
+        """
+        box = self.boxes.pop(box_id)
+        for cell in self._cell_range(box[0], box[1], box[3], box[4]):
+            ids = self.cells[cell]
+            ids.remove(box_id)
+            if box[5] >= self.cell_max_top[cell]:
+                self.cell_max_top[cell] = max((self.boxes[i][5] for i in ids), default=0.0)
+
+    def query_xy(self, x0: float, y0: float, x1: float, y1: float) -> Set[int]:
+        """
+        Find boxes whose footprint overlaps an X-Y rectangle.
+
+        Args:
+            x0, y0: Lower corner of the rectangle
+            x1, y1: Upper corner of the rectangle
+
+        Returns:
+            Set[int]: Ids of overlapping boxes
+        """
+        found = set()
+        for cell in self._cell_range(x0, y0, x1, y1):
+            ids = self.cells.get(cell, ())
+            self.checks += len(ids)
+            for box_id in ids:
+                box = self.boxes[box_id]
+                if box[0] < x1 and box[3] > x0 and box[1] < y1 and box[4] > y0:
+                    found.add(box_id)
+        return found
+
+    def max_top_height(self, x0: float, y0: float, x1: float, y1: float, floor: float = 0.0) -> float:
+        """
+        Get the highest top surface among boxes overlapping an X-Y rectangle.
+
+        Args:
+            x0, y0: Lower corner of the rectangle
+            x1, y1: Upper corner of the rectangle
+            floor: Height returned when nothing higher overlaps the rectangle
+
+        Returns:
+            float: Highest top surface, or floor
+        """
+        best = floor
+        for cell in self._cell_range(x0, y0, x1, y1):
+            if self.cell_max_top.get(cell, 0.0) <= best:
+                continue
+            ids = self.cells[cell]
+            self.checks += len(ids)
+            for box_id in ids:
+                box = self.boxes[box_id]
+                if box[5] > best and box[0] < x1 and box[3] > x0 and box[1] < y1 and box[4] > y0:
+                    best = box[5]
+        return best
+
+    def supporting(self, x0: float, y0: float, x1: float, y1: float, z: float) -> Set[int]:
+        """
+        Find boxes whose top surface is at height z and overlaps an X-Y rectangle.
+
+        Args:
+            x0, y0: Lower corner of the rectangle
+            x1, y1: Upper corner of the rectangle
+            z: Height of the bottom surface resting on the boxes
+
+        Returns:
+            Set[int]: Ids of supporting boxes
+        """
+        return {
+            box_id for box_id in self.query_xy(x0, y0, x1, y1)
+            if abs(self.boxes[box_id][5] - z) <= SURFACE_EPSILON
+        }
+
+    def intersecting(self, lo: Sequence[float], hi: Sequence[float], exclude: Optional[int] = None) -> Set[int]:
+        """
+        Find boxes that intersect a 3D box (touching faces do not count).
+
+        Args:
+            lo: Lower corner (x, y, z)
+            hi: Upper corner (x, y, z)
+            exclude: Optional box id to ignore (e.g. the box itself)
+
+        Returns:
+            Set[int]: Ids of intersecting boxes
+        """
+        return {
+            box_id for box_id in self.query_xy(lo[0], lo[1], hi[0], hi[1])
+            if box_id != exclude and self.boxes[box_id][2] < hi[2] and self.boxes[box_id][5] > lo[2]
+        }
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import sys
+from services.packing_engine import ENGINE_NAMES
+from services.server_service import DEFAULT_HOST, DEFAULT_PORT, PackingServer
+from utils.logger import configure_logging, setup_logger
+
+logger = setup_logger(__name__)
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Long-running packing server: POST JSON manifests to /pack.'
+    )
+    parser.add_argument(
+        '--host',
+        default=DEFAULT_HOST,
+        help=f'Interface to listen on (default: {DEFAULT_HOST}; the server has no authentication)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help=f'TCP port (default: {DEFAULT_PORT})'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=ENGINE_NAMES,
+        default='extreme_point',
+        help='Packing engine used when a request does not name one (default: extreme_point)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--max-pending',
+        type=int,
+        default=64,
+        help='Distinct jobs queued or running before requests get 503 (default: 64)'
+    )
+    parser.add_argument(
+        '--deadline',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='Default request deadline when a request does not set one (default: none)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='Reuse packing results of repeated manifests from this cache directory'
+    )
+    return parser.parse_args()
+
+def main() -> int:
+    """Server entry point."""
+    configure_logging()
+    args = parse_args()
+    if args.max_pending < 1:
+        logger.error('--max-pending must be at least 1')
+        return 2
+    server = PackingServer(
+        host=args.host,
+        port=args.port,
+        engine=args.engine,
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+        default_deadline=args.deadline,
+        cache_dir=args.cache_dir
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info('Packing server stopped')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
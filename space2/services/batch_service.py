@@ -0,0 +1,293 @@
+import glob
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from models.container import Container
+from services.cache_service import get_cache
+from services.packing_service import PackingService
+from services.result_format import ResultWriter, build_result
+from services.validation_service import validate_container
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BINS_FILE = 'Bins.tsv'
+CONTAINER_FILE = 'Container.tsv'
+
+# One VisualizationService (and off-screen plotter) per worker process, reused across manifests
+_visualization_service = None
+
+
+def is_manifest_dir(path: str) -> bool:
+    """
+    Check whether a directory holds a Bins.tsv/Container.tsv manifest pair.
+
+    Args:
+        path: Directory path
+
+    Returns:
+        bool: True if both manifest files exist
+    """
+    return (
+        os.path.isfile(os.path.join(path, BINS_FILE)) and
+        os.path.isfile(os.path.join(path, CONTAINER_FILE))
+    )
+
+
+def find_manifests(patterns: Sequence[str]) -> List[str]:
+    """
+    Find manifest directories from directories or glob patterns.
+
+    A directory is searched recursively for subdirectories holding a
+    Bins.tsv/Container.tsv pair. A glob may match manifest directories or
+    manifest files (the file's directory is used).
+
+    Args:
+        patterns: Directories or glob patterns
+
+    Returns:
+        List[str]: Sorted, de-duplicated manifest directories
+    """
+    manifests = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isfile(match):
+                match = os.path.dirname(match) or '.'
+            if not os.path.isdir(match):
+                continue
+            for root, _, _ in os.walk(match):
+                if is_manifest_dir(root):
+                    manifests.add(os.path.normpath(root))
+    return sorted(manifests)
+
+
+def get_visualization_service():
+    """
+    Get the process-wide VisualizationService used for exports.
+
+    PyVista is only imported once a manifest is actually exported. Colors
+    are loaded per manifest, never from the working directory.
+
+    Returns:
+        VisualizationService: Shared service instance
+    """
+    global _visualization_service
+    if _visualization_service is None:
+        from services.visualization_service import VisualizationService
+        _visualization_service = VisualizationService(bins_file=None)
+    return _visualization_service
+
+
+def get_export_dir(export_dir: str, manifest_dir: str) -> str:
+    """
+    Get the export directory of one manifest.
+
+    Args:
+        export_dir: Root export directory
+        manifest_dir: Manifest directory
+
+    Returns:
+        str: Export subdirectory named after the manifest path
+    """
+    name = re.sub(r'[^\w.-]+', '_', os.path.normpath(manifest_dir)).strip('_.') or 'manifest'
+    return os.path.join(export_dir, name)
+
+
+def get_result_record(container: Container, include_positions: bool = False) -> Dict[str, Any]:
+    """
+    Describe a packed container as a JSON-serializable record.
+
+    Args:
+        container: Packed container
+        include_positions: Whether to include every placement
+
+    Returns:
+        Dict[str, Any]: Counts, utilization, weight, height, counts per type and optional placements
+    """
+    stats = container.get_stats()
+    record: Dict[str, Any] = {
+        'container': container.name,
+        'packed': stats.packed_count,
+        'unfitted': stats.unfitted_count,
+        'packed_volume': stats.packed_volume,
+        'volume_utilization': round(container.get_volume_utilization(), 3),
+        'packed_weight': stats.packed_weight,
+        'height': stats.height,
+        'packed_by_type': dict(stats.packed_by_type),
+    }
+    if include_positions:
+        record['placements'] = [
+            {
+                'name': item.name,
+                'position': [float(v) for v in item.position],
+                'rotation': item.rotation_type
+            }
+            for item in container.items
+        ]
+    return record
+
+
+def pack_manifest(
+    manifest_dir: str,
+    engine: Optional[str] = None,
+    include_positions: bool = False,
+    cache_dir: Optional[str] = None,
+    export_dir: Optional[str] = None,
+    export_formats: Optional[Sequence[str]] = None,
+    export_views: Optional[Sequence[str]] = None,
+    keep_result: bool = False
+) -> Dict[str, Any]:
+    """
+    Pack one manifest and build its result record.
+
+    Errors are captured in the record instead of raised, so one bad manifest
+    doesn't stop a batch.
+
+    Args:
+        manifest_dir: Directory holding Bins.tsv and Container.tsv
+        engine: Packing engine name
+        include_positions: Whether to include every placement in the record
+        cache_dir: Optional packing result cache directory
+        export_dir: Optional directory to export the packed scene to (PNG/glTF/VTP)
+        export_formats: Export formats (defaults to all)
+        export_views: Camera views of exported PNGs (defaults to isometric)
+        keep_result: Whether to attach the binary result records under 'result'
+            (a services.result_format.ContainerResult, which is not JSON-serializable)
+
+    Returns:
+        Dict[str, Any]: JSON-serializable result record (unless keep_result is set)
+    """
+    record: Dict[str, Any] = {'manifest': manifest_dir, 'status': 'ok'}
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    try:
+        container = Container.from_data(os.path.join(manifest_dir, CONTAINER_FILE))
+        table = PackingService.load_item_table(os.path.join(manifest_dir, BINS_FILE))
+        timings['load'] = time.perf_counter() - started
+
+        pack_started = time.perf_counter()
+        cache = get_cache(cache_dir) if cache_dir else None
+        PackingService(engine, cache=cache).pack_table(container, table)
+        timings['pack'] = time.perf_counter() - pack_started
+
+        record.update(get_result_record(container, include_positions))
+        validate_started = time.perf_counter()
+        record['validation'] = validate_container(container).to_record()
+        timings['validate'] = time.perf_counter() - validate_started
+        if keep_result:
+            record['result'] = build_result(container, {'manifest': manifest_dir})
+
+        if export_dir:
+            export_started = time.perf_counter()
+            visualization_service = get_visualization_service()
+            visualization_service.load_colors(os.path.join(manifest_dir, BINS_FILE))
+            record['exports'] = visualization_service.export_packing(
+                container,
+                get_export_dir(export_dir, manifest_dir),
+                **({'formats': export_formats} if export_formats else {}),
+                **({'views': export_views} if export_views else {})
+            )
+            timings['export'] = time.perf_counter() - export_started
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        record['traceback'] = traceback.format_exc()
+    timings['total'] = time.perf_counter() - started
+    record['timings'] = {phase: round(seconds, 6) for phase, seconds in timings.items()}
+    return record
+
+
+class BatchService:
+    """
+    Service for packing many manifests in parallel across a process pool.
+    """
+    def __init__(
+        self,
+        engine: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        include_positions: bool = False,
+        cache_dir: Optional[str] = None,
+        export_dir: Optional[str] = None,
+        export_formats: Optional[Sequence[str]] = None,
+        export_views: Optional[Sequence[str]] = None,
+        results_file: Optional[str] = None
+    ):
+        """
+        Args:
+            engine: Packing engine name
+            max_workers: Process pool size (None for one per CPU, 1 to run in-process)
+            include_positions: Whether records include every placement
+            cache_dir: Optional packing result cache directory shared by all workers
+            export_dir: Optional directory to export every packed scene to
+            export_formats: Export formats (defaults to all)
+            export_views: Camera views of exported PNGs (defaults to isometric)
+            results_file: Optional binary result file collecting every packed
+                manifest (see services.result_format)
+        """
+        self.engine = engine
+        self.max_workers = max_workers
+        self.include_positions = include_positions
+        self.cache_dir = cache_dir
+        self.export_dir = export_dir
+        self.export_formats = export_formats
+        self.export_views = export_views
+        self.results_file = results_file
+
+    def _get_job(self, manifest: str) -> Tuple:
+        """Get the pack_manifest arguments of one manifest."""
+        return (
+            manifest, self.engine, self.include_positions, self.cache_dir,
+            self.export_dir, self.export_formats, self.export_views, self.results_file is not None
+        )
+
+    def run(self, manifests: Sequence[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Pack manifests, yielding each result record as soon as it finishes.
+
+        With a results file, each packed manifest is appended to it as it
+        finishes and its record gets the container's 'result_index'.
+
+        Args:
+            manifests: Manifest directories
+
+        Yields:
+            Dict[str, Any]: Result record per manifest, in completion order
+        """
+        if self.results_file is None:
+            yield from self._run(manifests)
+            return
+        with ResultWriter(self.results_file) as writer:
+            for record in self._run(manifests):
+                result = record.pop('result', None)
+                if result is not None:
+                    record['result_index'] = writer.add_result(result)
+                yield record
+
+    def _run(self, manifests: Sequence[str]) -> Iterator[Dict[str, Any]]:
+        """Pack manifests in-process or in the pool, yielding raw records in completion order."""
+        logger.info(f'Packing {len(manifests)} manifests')
+        if self.max_workers == 1:
+            for manifest in manifests:
+                yield pack_manifest(*self._get_job(manifest))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(pack_manifest, *self._get_job(manifest)): manifest
+                for manifest in manifests
+            }
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. killed), not just the packing
+                    yield {
+                        'manifest': futures[future],
+                        'status': 'error',
+                        'error': f"{type(e).__name__}: {e}",
+                        'timings': {}
+                    }
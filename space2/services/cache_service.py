@@ -0,0 +1,259 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+import numpy as np
+from models.container import Container
+from models.item_table import ItemTable
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Bump when the packing output for a given fingerprint may change
+CACHE_FORMAT_VERSION = 3
+
+DEFAULT_CACHE_DIR = '.packing_cache'
+
+CacheEntry = Dict[str, np.ndarray]
+
+
+def manifest_fingerprint(container: Container, table: ItemTable, engine_name: str) -> str:
+    """
+    Compute a canonical hash of a packing problem.
+
+    The hash covers the container dimensions, max weight and load limits, the
+    engine, and the sorted (type, dims, weight, max load, upright, quantity) tuples of
+    the manifest, so row order in Bins.tsv and the container's name don't matter.
+
+    Args:
+        container: Container being packed
+        table: Units to be packed
+        engine_name: Name of the packing engine
+
+    Returns:
+        str: Hex digest
+    """
+    keys = np.column_stack([table.type_id, table.dims, table.weight, table.max_load, table.upright])
+    bins = []
+    if len(keys):
+        keys = keys[np.lexsort(keys.T[::-1])]
+        starts = np.flatnonzero(np.concatenate([[True], np.any(keys[1:] != keys[:-1], axis=1)]))
+        counts = np.diff(np.append(starts, len(keys)))
+        for (type_id, width, height, depth, weight, max_load, upright), quantity in zip(
+            keys[starts].tolist(), counts.tolist()
+        ):
+            # inf (unlimited) isn't valid JSON
+            max_load = max_load if np.isfinite(max_load) else None
+            bins.append([
+                table.type_names[int(type_id)], width, height, depth, weight, max_load, bool(upright), quantity
+            ])
+
+    problem = {
+        'version': CACHE_FORMAT_VERSION,
+        'engine': engine_name,
+        'container': [container.width, container.height, container.depth, container.max_weight],
+        'load_limits': container.load_limits.to_dict() if container.load_limits is not None else None,
+        'bins': sorted(bins),
+    }
+    return hashlib.sha256(json.dumps(problem, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def build_entry(container: Container) -> CacheEntry:
+    """
+    Capture a packed container's placements as arrays.
+
+    Args:
+        container: Container packed from an ItemTable
+
+    Returns:
+        CacheEntry: Positions, rotations and item order of the container's table
+    """
+    table = container.table
+    return {
+        'position': table.position.copy(),
+        'rotation': table.rotation.copy(),
+        'fitted': np.asarray(container.items.indices, dtype=np.int64).copy(),
+        'unfitted': np.asarray(container.unfitted_items.indices, dtype=np.int64).copy(),
+    }
+
+
+def restore_entry(container: Container, table: ItemTable, entry: CacheEntry) -> Container:
+    """
+    Rebuild a packed container from a cache entry.
+
+    Args:
+        container: Empty container to fill
+        table: Table the entry was built from (same fingerprint and row order)
+        entry: Cached placements
+
+    Returns:
+        Container: Packed container
+    """
+    table.position[:] = entry['position']
+    table.set_rotation(slice(None), entry['rotation'])
+    table.fitted[:] = False
+    table.fitted[entry['fitted']] = True
+    container.set_table(table, entry['fitted'].copy(), entry['unfitted'].copy())
+    return container
+
+
+class PackingCache:
+    """
+    Two-tier cache of packing results keyed by manifest fingerprint.
+
+    An in-memory LRU tier sits in front of an SQLite file under a configurable
+    directory. The disk tier evicts least recently used entries once its total
+    size exceeds max_disk_bytes, and can be shared by several processes.
+    """
+    def __init__(
+        self,
+        directory: Optional[str] = DEFAULT_CACHE_DIR,
+        max_memory_entries: int = 128,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        Args:
+            directory: Directory for the on-disk tier, or None for memory only
+            max_memory_entries: Number of results kept in memory
+            max_disk_bytes: Size limit of the on-disk tier
+        """
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open (once) the on-disk tier."""
+        if self.directory is None:
+            return None
+        if self._connection is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._connection = sqlite3.connect(os.path.join(self.directory, 'packing_cache.sqlite'), timeout=30)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry in the memory tier, evicting the least recently used."""
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    @staticmethod
+    def _serialize(entry: CacheEntry) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(buffer, **entry)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _deserialize(data: bytes) -> CacheEntry:
+        with np.load(io.BytesIO(data)) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up a packing result.
+
+        Args:
+            key: Manifest fingerprint
+
+        Returns:
+            Optional[CacheEntry]: Cached placements, or None on a miss
+        """
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return self.memory[key]
+
+        connection = self._connect()
+        if connection is not None:
+            row = connection.execute('SELECT data FROM results WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                connection.execute('UPDATE results SET last_access = ? WHERE key = ?', (time.time(), key))
+                connection.commit()
+                entry = self._deserialize(row[0])
+                self._remember(key, entry)
+                self.hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """
+        Store a packing result in both tiers.
+
+        Args:
+            key: Manifest fingerprint
+            entry: Placements to cache
+        """
+        self._remember(key, entry)
+        connection = self._connect()
+        if connection is None:
+            return
+
+        data = self._serialize(entry)
+        if len(data) > self.max_disk_bytes:
+            logger.debug(f'Not caching {key[:12]} on disk: {len(data)} bytes exceeds the cache size')
+            return
+        connection.execute(
+            'INSERT OR REPLACE INTO results (key, data, size, last_access) VALUES (?, ?, ?, ?)',
+            (key, sqlite3.Binary(data), len(data), time.time())
+        )
+        self._evict(connection)
+        connection.commit()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Delete least recently used disk entries until the tier fits max_disk_bytes."""
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        for key, size in connection.execute('SELECT key, size FROM results ORDER BY last_access').fetchall():
+            connection.execute('DELETE FROM results WHERE key = ?', (key,))
+            total -= size
+            logger.debug(f'Evicted cached result {key[:12]} ({size} bytes)')
+            if total <= self.max_disk_bytes:
+                break
+
+    def clear(self) -> None:
+        """Remove every cached result from both tiers."""
+        self.memory.clear()
+        connection = self._connect()
+        if connection is not None:
+            connection.execute('DELETE FROM results')
+            connection.commit()
+
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+_caches: Dict[Optional[str], PackingCache] = {}
+
+
+def get_cache(directory: Optional[str] = DEFAULT_CACHE_DIR) -> PackingCache:
+    """
+    Get the process-wide cache for a directory, so repeated calls share the memory tier.
+
+    Args:
+        directory: Directory for the on-disk tier, or None for memory only
+
+    Returns:
+        PackingCache: Shared cache instance
+    """
+    if directory not in _caches:
+        _caches[directory] = PackingCache(directory)
+    return _caches[directory]
@@ -0,0 +1,749 @@
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from models.container import Container
+from models.item_table import ItemTable
+from models.load_limits import LoadTracker
+from models.rotation import ALL_ROTATIONS, ROTATIONS
+from models.spatial_index import SpatialIndex
+from services.packing_engine import PackingEngine, PackingStep
+from utils.cancellation import CancellationToken
+from utils.logger import setup_logger
+from utils.metrics import Metrics
+
+logger = setup_logger(__name__)
+
+# Tolerance for floating point comparisons against container walls
+EPSILON = 1e-9
+
+# Numeric modes of the engine: float64 geometry, or exact int64 grid units
+NUMERIC_MODES = ('float', 'grid')
+
+# Finest grid used by the grid mode (values with more decimals are rounded)
+MAX_GRID_DECIMALS = 6
+
+
+def get_grid_scale(values: np.ndarray, max_decimals: int = MAX_GRID_DECIMALS) -> int:
+    """
+    Find the smallest power of ten that turns every value into a whole number.
+
+    Args:
+        values: Dimensions to represent on the grid
+        max_decimals: Maximum number of decimals kept
+
+    Returns:
+        int: Grid units per input unit
+    """
+    values = np.asarray(values, dtype=np.float64)
+    for decimals in range(max_decimals + 1):
+        scaled = values * 10 ** decimals
+        if np.all(np.abs(scaled - np.round(scaled)) <= 1e-6):
+            return 10 ** decimals
+    return 10 ** max_decimals
+
+
+class ExtremePointState:
+    """
+    Placed boxes and free extreme points of a partially packed container.
+
+    Placed boxes are stored as NumPy arrays of lower/upper corners so that
+    intersection tests against all of them run as one batched operation.
+    Geometry is float64 by default; with an integer dtype every comparison
+    is exact and no tolerance is applied.
+    """
+    def __init__(
+        self,
+        width: float,
+        height: float,
+        depth: float,
+        max_weight: float,
+        capacity: int = 64,
+        dtype: np.dtype = np.float64
+    ):
+        self.dtype = np.dtype(dtype)
+        self.epsilon = 0 if np.issubdtype(self.dtype, np.integer) else EPSILON
+        self.size = np.array([width, height, depth], dtype=self.dtype)
+        self.max_weight = max_weight
+        self.total_weight = 0.0
+        self.count = 0
+        capacity = max(capacity, 1)
+        self.lo = np.zeros((capacity, 3), dtype=self.dtype)
+        self.hi = np.zeros((capacity, 3), dtype=self.dtype)
+        self.weights = np.zeros(capacity, dtype=np.float64)
+        # Caller-defined id per box (e.g. ItemTable row)
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        # Candidate positions, kept sorted bottom-back-left first (z, y, x)
+        self.points = np.zeros((1, 3), dtype=self.dtype)
+        # Per-point flags of shape ids known not to fit there (points x shapes)
+        self.failed = np.zeros((1, 0), dtype=bool)
+
+    @classmethod
+    def from_boxes(
+        cls,
+        width: float,
+        height: float,
+        depth: float,
+        max_weight: float,
+        lo: np.ndarray,
+        hi: np.ndarray,
+        weights: np.ndarray,
+        ids: np.ndarray,
+        dtype: np.dtype = np.float64
+    ) -> 'ExtremePointState':
+        """
+        Rebuild the state of an already packed container.
+
+        Extreme points are regenerated from the corners of every placed box,
+        so the layout can come from any engine (and may have been settled by gravity).
+
+        Args:
+            width, height, depth: Container dimensions
+            max_weight: Container weight limit
+            lo: (n, 3) lower corners of placed boxes
+            hi: (n, 3) upper corners of placed boxes
+            weights: Weight per box
+            ids: Caller-defined id per box
+            dtype: Geometry dtype (float64, or an integer type for grid units)
+
+        Returns:
+            ExtremePointState: State holding the given boxes
+        """
+        state = cls(width, height, depth, max_weight, capacity=len(lo), dtype=dtype)
+        count = len(lo)
+        state.lo[:count] = lo
+        state.hi[:count] = hi
+        state.weights[:count] = weights
+        state.ids[:count] = ids
+        state.count = count
+        state.total_weight = float(np.sum(weights))
+        state.points = np.zeros((0, 3), dtype=state.dtype)
+        state.failed = np.zeros((0, 0), dtype=bool)
+        origin = np.zeros((1, 3), dtype=state.dtype)
+        state._merge_points(np.concatenate([origin, state._corner_points(state.lo[:count], state.hi[:count])]))
+        return state
+
+    def rescaled(self, scale: int = 1) -> 'ExtremePointState':
+        """
+        Copy the state in float64 container units (e.g. to keep a grid-mode state on the container).
+
+        Failed-shape flags are dropped, since shape ids are only meaningful within one run.
+
+        Args:
+            scale: Grid units per container unit of this state
+
+        Returns:
+            ExtremePointState: Float64 copy
+        """
+        size = self.size / scale
+        state = ExtremePointState(size[0], size[1], size[2], self.max_weight, capacity=len(self.lo))
+        state.lo = self.lo / scale
+        state.hi = self.hi / scale
+        state.weights = self.weights.copy()
+        state.ids = self.ids.copy()
+        state.count = self.count
+        state.total_weight = self.total_weight
+        state.points = self.points / scale
+        state.failed = np.zeros((len(state.points), 0), dtype=bool)
+        return state
+
+    def _grow(self) -> None:
+        """Double the capacity of the placed box arrays."""
+        self.lo = np.concatenate([self.lo, np.zeros_like(self.lo)])
+        self.hi = np.concatenate([self.hi, np.zeros_like(self.hi)])
+        self.weights = np.concatenate([self.weights, np.zeros_like(self.weights)])
+        self.ids = np.concatenate([self.ids, np.full_like(self.ids, -1)])
+
+    def find_placement(
+        self,
+        dims: Sequence[float],
+        rotations: Sequence[int] = ALL_ROTATIONS,
+        chunk_size: int = 64,
+        shape_id: Optional[int] = None,
+        accept: Optional[Callable[[np.ndarray, np.ndarray], bool]] = None,
+        sizes: Optional[np.ndarray] = None
+    ) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Find the lowest free extreme point where a box fits.
+
+        Args:
+            dims: Box (width, height, depth)
+            rotations: Rotation types to try, in order of preference
+            chunk_size: Number of candidates tested against placed boxes per batch
+            shape_id: Optional small non-negative integer identifying the box shape. Points that
+                reject a shape are remembered and skipped for later boxes of that shape.
+            accept: Optional extra check of a free (position, effective size) candidate, e.g.
+                load limits. Points it rejects are not remembered as failed for the shape.
+            sizes: Optional precomputed (R, 3) effective size per rotation (skips rotating `dims`)
+
+        Returns:
+            Optional[Tuple[np.ndarray, int]]: (position, rotation_type), or None if the box does not fit
+        """
+        rotations = np.asarray(rotations, dtype=np.int64)
+        if sizes is None:
+            sizes = np.asarray(dims, dtype=self.dtype)[ROTATIONS[rotations]]   # (R, 3)
+
+        # Bounds check for every (point, rotation) pair at once
+        ends = self.points[:, None, :] + sizes[None, :, :]    # (M, R, 3)
+        in_bounds = np.all(ends <= self.size + self.epsilon, axis=2)
+        if shape_id is not None:
+            if shape_id >= self.failed.shape[1]:
+                padding = np.zeros((len(self.points), shape_id + 1 - self.failed.shape[1]), dtype=bool)
+                self.failed = np.concatenate([self.failed, padding], axis=1)
+            in_bounds &= ~self.failed[:, shape_id, None]
+        point_idx, rot_idx = np.nonzero(in_bounds)
+        if len(point_idx) == 0:
+            return None
+
+        cand_lo = self.points[point_idx]
+        cand_size = sizes[rot_idx]
+        cand_hi = cand_lo + cand_size
+        # First point whose candidates were free but not accepted
+        rejected = len(self.points)
+
+        def choose(free: np.ndarray, start: int) -> Optional[Tuple[np.ndarray, int]]:
+            nonlocal rejected
+            for candidate in (free + start).tolist():
+                if accept is None or accept(cand_lo[candidate], cand_size[candidate]):
+                    return self._found(point_idx, rot_idx, rotations, candidate, shape_id, rejected)
+                rejected = min(rejected, point_idx[candidate])
+            return None
+
+        if self.count == 0:
+            return choose(np.arange(len(cand_lo)), 0)
+
+        placed_lo = self.lo[:self.count]
+        placed_hi = self.hi[:self.count]
+        for start in range(0, len(cand_lo), chunk_size):
+            lo = cand_lo[start:start + chunk_size]
+            hi = cand_hi[start:start + chunk_size]
+
+            # Broadphase: only boxes touching the chunk's bounding region matter
+            near = np.all(
+                (placed_lo < hi.max(axis=0)) & (placed_hi > lo.min(axis=0)),
+                axis=1
+            )
+            if not near.any():
+                found = choose(np.arange(len(lo)), start)
+                if found is not None:
+                    return found
+                continue
+
+            near_lo = placed_lo[near]
+            near_hi = placed_hi[near]
+            collides = np.all(
+                (lo[:, None, :] < near_hi[None, :, :]) & (hi[:, None, :] > near_lo[None, :, :]),
+                axis=2
+            ).any(axis=1)
+            found = choose(np.flatnonzero(~collides), start)
+            if found is not None:
+                return found
+        return None
+
+    def _found(
+        self,
+        point_idx: np.ndarray,
+        rot_idx: np.ndarray,
+        rotations: np.ndarray,
+        candidate: int,
+        shape_id: Optional[int],
+        rejected: Optional[int] = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Build the result of find_placement and remember the points that were rejected.
+
+        Every point before the chosen one was tried with all rotations and failed,
+        and placements only ever remove free space, so they stay failed for this shape.
+        Points from `rejected` on may have failed only the accept check and are kept.
+        """
+        point = point_idx[candidate]
+        if shape_id is not None:
+            self.failed[:point if rejected is None else min(point, rejected), shape_id] = True
+        return self.points[point].copy(), int(rotations[rot_idx[candidate]])
+
+    def _project(self, points: np.ndarray, axis: int, chunk_size: int = 256) -> np.ndarray:
+        """
+        Slide points towards the origin along one axis until they meet a box or wall.
+
+        Args:
+            points: (n, 3) points to project
+            axis: Axis to project along
+            chunk_size: Number of points projected per batch
+
+        Returns:
+            np.ndarray: Projected points
+        """
+        others = [a for a in range(3) if a != axis]
+        lo = self.lo[:self.count]
+        hi = self.hi[:self.count]
+        projected = points.copy()
+        projected[:, axis] = 0
+        if self.count == 0:
+            return projected
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            blocking = (
+                (lo[None, :, others[0]] <= chunk[:, None, others[0]]) &
+                (hi[None, :, others[0]] > chunk[:, None, others[0]]) &
+                (lo[None, :, others[1]] <= chunk[:, None, others[1]]) &
+                (hi[None, :, others[1]] > chunk[:, None, others[1]]) &
+                (hi[None, :, axis] <= chunk[:, None, axis] + self.epsilon)
+            )
+            projected[start:start + chunk_size, axis] = np.where(blocking, hi[None, :, axis], 0).max(axis=1)
+        return projected
+
+    def _corner_points(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """
+        Generate the extreme points of boxes.
+
+        Each box contributes its corner along each axis, plus that corner's
+        projections along the other two axes.
+
+        Args:
+            lo: (n, 3) lower corners
+            hi: (n, 3) upper corners
+
+        Returns:
+            np.ndarray: (9n, 3) candidate points
+        """
+        points = []
+        for axis in range(3):
+            corners = lo.copy()
+            corners[:, axis] = hi[:, axis]
+            points.append(corners)
+            for other in range(3):
+                if other != axis:
+                    points.append(self._project(corners, other))
+        return np.concatenate(points)
+
+    def _merge_points(
+        self,
+        new_points: np.ndarray,
+        occupied_lo: Optional[np.ndarray] = None,
+        occupied_hi: Optional[np.ndarray] = None,
+        reset_failed: bool = False
+    ) -> None:
+        """
+        Add candidate points and drop points that are no longer usable.
+
+        Args:
+            new_points: (n, 3) points to add
+            occupied_lo: Lower corners of newly occupied boxes; existing points inside them are dropped.
+                Defaults to every placed box (new points are always checked against every placed box).
+            occupied_hi: Upper corners of newly occupied boxes
+            reset_failed: Forget which shapes failed where (after free space grew)
+        """
+        points = self.points
+        failed = self.failed
+        if occupied_lo is not None and len(points):
+            inside = self._inside(points, occupied_lo, occupied_hi)
+            points = points[~inside]
+            failed = failed[~inside]
+
+        in_container = np.all(new_points < self.size - self.epsilon, axis=1)
+        new_points = new_points[in_container]
+        if len(new_points):
+            new_points = new_points[~self._inside(new_points, self.lo[:self.count], self.hi[:self.count])]
+        new_points = np.unique(new_points, axis=0)
+        if len(new_points) and len(points):
+            duplicate = np.all(new_points[:, None, :] == points[None, :, :], axis=2).any(axis=1)
+            new_points = new_points[~duplicate]
+
+        points = np.concatenate([points, new_points])
+        failed = np.concatenate([failed, np.zeros((len(new_points), failed.shape[1]), dtype=bool)])
+        if reset_failed:
+            failed[:] = False
+        order = np.lexsort((points[:, 0], points[:, 1], points[:, 2]))
+        self.points = points[order]
+        self.failed = failed[order]
+
+    @staticmethod
+    def _inside(points: np.ndarray, lo: np.ndarray, hi: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+        """Flag points lying inside any of the given boxes (lower faces count as inside)."""
+        inside = np.zeros(len(points), dtype=bool)
+        if len(lo) == 0:
+            return inside
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            inside[start:start + chunk_size] = np.all(
+                (chunk[:, None, :] >= lo[None, :, :]) & (chunk[:, None, :] < hi[None, :, :]),
+                axis=2
+            ).any(axis=1)
+        return inside
+
+    def drop(self, position: np.ndarray, size: np.ndarray) -> np.ndarray:
+        """
+        Lower a free box position onto the highest surface below it.
+
+        Args:
+            position: Lower corner of a box that doesn't intersect any placed box
+            size: Effective box dimensions
+
+        Returns:
+            np.ndarray: Settled position
+        """
+        lo = self.lo[:self.count]
+        hi = self.hi[:self.count]
+        below = (
+            (lo[:, 0] < position[0] + size[0]) & (hi[:, 0] > position[0]) &
+            (lo[:, 1] < position[1] + size[1]) & (hi[:, 1] > position[1]) &
+            (hi[:, 2] <= position[2] + self.epsilon)
+        )
+        settled = position.copy()
+        settled[2] = hi[below, 2].max() if below.any() else 0
+        return settled
+
+    def place(self, position: np.ndarray, size: np.ndarray, weight: float, item_id: int = -1) -> None:
+        """
+        Record a placed box and update the extreme points.
+
+        Args:
+            position: Lower corner of the box
+            size: Effective (rotated) box dimensions
+            weight: Box weight
+            item_id: Caller-defined id of the box
+        """
+        if self.count == len(self.lo):
+            self._grow()
+        lo = np.asarray(position, dtype=self.dtype)
+        hi = lo + size
+        self.lo[self.count] = lo
+        self.hi[self.count] = hi
+        self.weights[self.count] = weight
+        self.ids[self.count] = item_id
+        self.count += 1
+        self.total_weight += weight
+        self._merge_points(self._corner_points(lo[None, :], hi[None, :]), lo[None, :], hi[None, :])
+
+    def remove(self, item_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Remove boxes by id and free their space.
+
+        Args:
+            item_ids: Ids of the boxes to remove
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Lower and upper corners of the removed boxes
+        """
+        removed = np.isin(self.ids[:self.count], np.asarray(item_ids, dtype=np.int64))
+        removed_lo = self.lo[:self.count][removed].copy()
+        removed_hi = self.hi[:self.count][removed].copy()
+        self.total_weight -= float(self.weights[:self.count][removed].sum())
+
+        keep = np.flatnonzero(~removed)
+        count = len(keep)
+        self.lo[:count] = self.lo[keep]
+        self.hi[:count] = self.hi[keep]
+        self.weights[:count] = self.weights[keep]
+        self.ids[:count] = self.ids[keep]
+        self.count = count
+
+        # The freed space can take new boxes: add its corners and retry every shape
+        self._merge_points(removed_lo, reset_failed=True)
+        return removed_lo, removed_hi
+
+    def move(self, item_ids: np.ndarray, positions: np.ndarray) -> None:
+        """
+        Move placed boxes (e.g. settled by gravity) and update the extreme points.
+
+        Args:
+            item_ids: Ids of the boxes to move
+            positions: (k, 3) new lower corners
+        """
+        if len(item_ids) == 0:
+            return
+        ids = self.ids[:self.count]
+        sorter = np.argsort(ids, kind='stable')
+        boxes = sorter[np.searchsorted(ids, item_ids, sorter=sorter)]
+        moved_from = self.lo[boxes].copy()
+        size = self.hi[boxes] - moved_from
+        self.lo[boxes] = positions
+        self.hi[boxes] = positions + size
+        # Freed corners of the old positions plus corners of the new positions
+        new_points = np.concatenate([moved_from, self._corner_points(self.lo[boxes], self.hi[boxes])])
+        self._merge_points(new_points, self.lo[boxes], self.hi[boxes], reset_failed=True)
+
+    def settle(self, freed_lo: np.ndarray, freed_hi: np.ndarray) -> np.ndarray:
+        """
+        Re-apply gravity only to boxes affected by freed space.
+
+        Boxes above a freed footprint are lowered onto the highest surface
+        below them; boxes above a box that moved are checked in turn.
+
+        Args:
+            freed_lo: (k, 3) lower corners of freed regions
+            freed_hi: (k, 3) upper corners of freed regions
+
+        Returns:
+            np.ndarray: Ids of boxes that moved
+        """
+        if self.count == 0 or len(freed_lo) == 0:
+            return np.zeros(0, dtype=np.int64)
+        lo = self.lo[:self.count]
+        hi = self.hi[:self.count]
+
+        # Only boxes starting at or above the lowest freed region can fall
+        order = np.argsort(lo[:, 2], kind='stable')
+        order = order[lo[order, 2] >= freed_lo[:, 2].min() - self.epsilon]
+
+        def overlapping(boxes: np.ndarray, region_lo: np.ndarray, region_hi: np.ndarray) -> np.ndarray:
+            return (
+                (lo[boxes, None, 0] < region_hi[None, :, 0]) & (hi[boxes, None, 0] > region_lo[None, :, 0]) &
+                (lo[boxes, None, 1] < region_hi[None, :, 1]) & (hi[boxes, None, 1] > region_lo[None, :, 1])
+            ).any(axis=1)
+
+        affected = overlapping(order, freed_lo, freed_hi)
+        moved = []
+        moved_from = []
+        position = 0
+        while True:
+            following = np.flatnonzero(affected[position:])
+            if len(following) == 0:
+                break
+            position += following[0]
+            box = order[position]
+            position += 1
+
+            # Highest surface below the box, ignoring the box itself
+            under = (
+                (lo[:, 0] < hi[box, 0]) & (hi[:, 0] > lo[box, 0]) &
+                (lo[:, 1] < hi[box, 1]) & (hi[:, 1] > lo[box, 1]) &
+                (hi[:, 2] <= lo[box, 2] + self.epsilon)
+            )
+            under[box] = False
+            settled_z = hi[under, 2].max() if under.any() else 0
+            if settled_z >= lo[box, 2] - self.epsilon:
+                continue
+
+            moved_from.append(lo[box].copy())
+            drop_by = lo[box, 2] - settled_z
+            lo[box, 2] -= drop_by
+            hi[box, 2] -= drop_by
+            moved.append(box)
+            affected[position:] |= overlapping(order[position:], lo[box][None, :], hi[box][None, :])
+
+        if moved:
+            moved = np.array(moved)
+            # Freed corners of the old positions plus corners of the new positions
+            new_points = np.concatenate([np.array(moved_from), self._corner_points(lo[moved], hi[moved])])
+            self._merge_points(new_points, lo[moved], hi[moved], reset_failed=True)
+            return self.ids[moved].copy()
+        return np.zeros(0, dtype=np.int64)
+
+
+class ExtremePointEngine(PackingEngine):
+    """
+    NumPy extreme-point packing backend.
+
+    Items are placed largest first at the lowest free extreme point (a
+    skyline-like bottom-up fill), trying rotations in py3dbp's order.
+    Only the allowed, distinct orientations of each shape are tried
+    ("this side up" units keep their depth vertical).
+
+    In 'grid' numeric mode all geometry is scaled to int64 grid units (the
+    smallest power of ten that makes every input dimension whole), so
+    comparisons are exact; positions are scaled back when the table is written.
+
+    When the container has load limits or units have a MaxLoad, every
+    placement is lowered onto its supports and checked against a LoadTracker
+    before it is accepted, so the limits hold for the packing as it grows.
+    """
+    name = 'extreme_point'
+
+    def __init__(
+        self,
+        chunk_size: int = 64,
+        numeric: str = 'float',
+        keep_order: bool = False,
+        rotations: Sequence[int] = ALL_ROTATIONS
+    ):
+        """
+        Args:
+            chunk_size: Number of candidates tested against placed boxes per batch
+            numeric: 'float' or 'grid' (exact integer grid units)
+            keep_order: Place units in table order instead of biggest first
+            rotations: Rotation types to try, in order of preference
+        """
+        if numeric not in NUMERIC_MODES:
+            raise ValueError(f"Unknown numeric mode: {numeric} (available: {', '.join(NUMERIC_MODES)})")
+        self.chunk_size = chunk_size
+        self.numeric = numeric
+        self.keep_order = keep_order
+        self.rotations = tuple(rotations)
+        if numeric == 'grid':
+            self.name = 'extreme_point_grid'
+
+    def pack(self, container: Container, table: ItemTable, metrics: Optional[Metrics] = None) -> None:
+        """
+        Pack the units of an ItemTable into the container using extreme-point placement.
+
+        Args:
+            container: Container to pack bins into
+            table: Units to be packed, in preferred packing order
+            metrics: Optional metrics to record engine phases and counters into
+        """
+        for _ in self.iter_pack(container, table, metrics):
+            pass
+
+    def iter_pack(
+        self,
+        container: Container,
+        table: ItemTable,
+        metrics: Optional[Metrics] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> Iterator[PackingStep]:
+        """
+        Pack unit by unit, yielding progress before each unit.
+
+        When cancelled, the units placed so far are kept and the rest are unfitted.
+
+        Args:
+            container: Container to pack bins into
+            table: Units to be packed, in preferred packing order
+            metrics: Optional metrics to record engine phases and counters into
+            cancel: Optional token to stop early
+
+        Yields:
+            PackingStep: Progress so far
+        """
+        metrics = metrics or Metrics()
+        size = np.array([container.width, container.height, container.depth], dtype=np.float64)
+
+        # Units with identical dimensions and upright flag share a shape id and its
+        # precomputed orientations. Space only shrinks as boxes are placed, so a
+        # shape that failed once fails again.
+        orientations = table.get_orientations(self.rotations)
+        shape_ids = orientations.shape_ids.tolist()
+        shape_sizes = orientations.sizes
+        metrics.count(
+            'pruned_orientations',
+            len(table) * len(self.rotations) - sum(len(orientations.rotations[shape]) for shape in shape_ids)
+        )
+
+        scale = 1
+        dtype = np.float64
+        if self.numeric == 'grid':
+            scale = get_grid_scale(np.concatenate([orientations.dims.ravel(), size]))
+            dtype = np.int64
+            shape_sizes = [np.round(sizes * scale).astype(np.int64) for sizes in shape_sizes]
+            # Rounded down so a grid packing never exceeds the real container
+            size = np.floor(size * scale + 1e-6).astype(np.int64)
+            # The scale of the last pack, not a total over packs
+            metrics.set_gauge('grid_scale', scale)
+
+        state = ExtremePointState(
+            size[0],
+            size[1],
+            size[2],
+            container.max_weight,
+            capacity=min(len(table), 1024),
+            dtype=dtype
+        )
+
+        # Biggest first, keeping the caller's order for equal volumes (as py3dbp does)
+        if self.keep_order:
+            order = np.arange(len(table))
+        else:
+            order = np.argsort(-table.get_volumes(), kind='stable')
+
+        # Shapes without an allowed orientation never fit
+        failed_shapes = [not rotations for rotations in orientations.rotations]
+        weights = table.weight.tolist()
+
+        tracker = None
+        accept = None
+        rejections: Counter = Counter()
+        # (shape id, weight) -> number of placed boxes when a search failed on load limits.
+        # Nothing changed while no box was placed since, so the search would fail again.
+        load_failures: Dict[Tuple[int, float], int] = {}
+        if container.load_limits is not None or np.isfinite(table.max_load).any():
+            index_cell = SpatialIndex.for_footprints(table.dims[:, 0].tolist(), table.dims[:, 1].tolist()).cell_size
+            tracker = LoadTracker(
+                container.width,
+                container.height,
+                container.depth,
+                container.max_weight,
+                container.load_limits,
+                index_cell
+            )
+            max_loads = table.max_load.tolist()
+
+            def accept(position: np.ndarray, size: np.ndarray) -> bool:
+                # `weight` is the unit being placed
+                violated = tracker.check(position / scale, size / scale, weight)
+                if violated is not None:
+                    rejections[violated] += 1
+                return violated is None
+
+        fitted: List[int] = []
+        fitted_rotations: List[int] = []
+        # Effective sizes of the fitted units (rotations are written to the table at the end)
+        fitted_sizes: List[np.ndarray] = []
+        unfitted: List[int] = []
+        searches = 0
+
+        def layout() -> Tuple[np.ndarray, np.ndarray]:
+            sizes = np.array(fitted_sizes, dtype=np.float64).reshape(-1, 3) / scale
+            return table.position[np.array(fitted, dtype=np.int64)], sizes
+
+        order = order.tolist()
+        for number, index in enumerate(order):
+            yield PackingStep(number, len(fitted), layout)
+            if cancel is not None and cancel.cancelled:
+                unfitted.extend(order[number:])
+                metrics.count('cancelled_units', len(order) - number)
+                break
+            shape_id = shape_ids[index]
+            weight = weights[index]
+            if (
+                failed_shapes[shape_id] or
+                state.total_weight + weight > state.max_weight or
+                load_failures.get((shape_id, weight)) == state.count
+            ):
+                unfitted.append(index)
+                continue
+
+            searches += 1
+            rejected_before = sum(rejections.values())
+            placement = state.find_placement(
+                orientations.dims[shape_id],
+                rotations=orientations.rotations[shape_id],
+                chunk_size=self.chunk_size,
+                shape_id=shape_id,
+                accept=accept,
+                sizes=shape_sizes[shape_id]
+            )
+            if placement is None:
+                # Load limits depend on the rest of the load, so only geometric failures are final
+                if sum(rejections.values()) == rejected_before:
+                    failed_shapes[shape_id] = True
+                else:
+                    load_failures[(shape_id, weight)] = state.count
+                unfitted.append(index)
+                continue
+
+            position, rotation_type = placement
+            size = shape_sizes[shape_id][orientations.rotations[shape_id].index(rotation_type)]
+            if tracker is not None:
+                position = state.drop(position, size)
+                tracker.add(position / scale, size / scale, weight, max_loads[index])
+            state.place(position, size, weight, index)
+            table.position[index] = position / scale
+            table.fitted[index] = True
+            fitted.append(index)
+            fitted_rotations.append(rotation_type)
+            fitted_sizes.append(size)
+
+        table.set_rotation(fitted, fitted_rotations)
+        # Without a tracker the load needed none, so set_table doesn't build one either
+        container.set_table(table, fitted, unfitted, tracker)
+        # Kept for incremental changes (PackingService.add_items/remove_items)
+        container.packing_state = state.rescaled(scale)
+        for constraint, count in rejections.items():
+            metrics.count(f'{constraint}_rejections', count)
+        metrics.count('placement_searches', searches)
+        # Units rejected without a search (shape already failed, or over the weight limit)
+        metrics.count('skipped_placements', len(table) - searches)
+        metrics.count('extreme_points', len(state.points))
+        logger.debug(f'Extreme point engine kept {len(state.points)} candidate points')
+        rows = container.items.indices
+        yield PackingStep(len(table), len(rows), lambda: (table.position[rows], table.size[rows]))
@@ -0,0 +1,413 @@
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from models.container import Container
+from models.item_table import ItemTable
+from services.packing_engine import PackingEngine, PackingStep
+from utils.cancellation import CancellationToken
+from utils.logger import setup_logger
+from utils.metrics import Metrics
+
+logger = setup_logger(__name__)
+
+# Tolerance for floating point comparisons of lengths
+EPSILON = 1e-9
+
+# Cut positions considered per axis by the layer pattern search. Longer axes
+# only cut at whole multiples of either box side.
+MAX_RASTER_POINTS = 64
+
+# Placement of one box in a floor pattern: (x, y, turned by 90 degrees)
+Cell = Tuple[float, float, bool]
+
+
+def get_raster_points(length: float, a: float, b: float) -> List[float]:
+    """
+    Get the lengths that box sides a and b can add up to without exceeding a limit.
+
+    Optimal guillotine cuts only need to be made at these positions.
+
+    Args:
+        length: Length to fill
+        a, b: Box sides
+
+    Returns:
+        List[float]: Sorted positions (including 0)
+    """
+    points = {
+        round(i * a + j * b, 9)
+        for i in range(int(length / a + EPSILON) + 1)
+        for j in range(int((length - i * a) / b + EPSILON) + 1)
+    }
+    if len(points) > MAX_RASTER_POINTS:
+        points = {round(i * a, 9) for i in range(int(length / a + EPSILON) + 1)}
+        points |= {round(j * b, 9) for j in range(int(length / b + EPSILON) + 1)}
+    return sorted(points)
+
+
+@lru_cache(maxsize=256)
+def solve_layer(width: float, height: float, a: float, b: float, turn: bool = True) -> Tuple[Cell, ...]:
+    """
+    Find a guillotine arrangement of as many a x b rectangles as possible in a floor.
+
+    Every sub-rectangle is either filled with a plain grid of one orientation
+    or cut in two along a raster point, and the best split is memoized per
+    sub-rectangle size (the classic recursive pallet loading search).
+
+    Args:
+        width: Floor extent along X
+        height: Floor extent along Y
+        a: Box footprint along X (untouched orientation)
+        b: Box footprint along Y (untouched orientation)
+        turn: Whether boxes may also be turned (footprint b x a)
+
+    Returns:
+        Tuple[Cell, ...]: (x, y, turned) of every box
+    """
+    xs = get_raster_points(width, a, b) if turn else get_raster_points(width, a, a)
+    ys = get_raster_points(height, a, b) if turn else get_raster_points(height, b, b)
+    # Best count and how it is achieved, per (width, height) raster point pair
+    memo: Dict[Tuple[float, float], Tuple[int, tuple]] = {}
+
+    def fit(points: List[float], value: float) -> float:
+        return points[bisect_right(points, value + EPSILON) - 1]
+
+    def grid(w: float, h: float, turned: bool) -> int:
+        sx, sy = (b, a) if turned else (a, b)
+        return int(w / sx + EPSILON) * int(h / sy + EPSILON)
+
+    def best(w: float, h: float) -> Tuple[int, tuple]:
+        key = (w, h)
+        if key in memo:
+            return memo[key]
+        bound = int(w * h / (a * b) + EPSILON)
+        result = (grid(w, h, False), ('grid', False))
+        if turn and grid(w, h, True) > result[0]:
+            result = (grid(w, h, True), ('grid', True))
+        for axis, points, length in ((0, xs, w), (1, ys, h)):
+            for cut in points:
+                if result[0] >= bound or cut > length / 2 + EPSILON:
+                    break
+                if cut <= 0:
+                    continue
+                rest = fit(points, length - cut)
+                if axis == 0:
+                    count = best(cut, h)[0] + best(rest, h)[0]
+                else:
+                    count = best(w, cut)[0] + best(w, rest)[0]
+                if count > result[0]:
+                    result = (count, ('cut', axis, cut, rest))
+        memo[key] = result
+        return result
+
+    cells: List[Cell] = []
+
+    def build(x: float, y: float, w: float, h: float) -> None:
+        plan = best(w, h)[1]
+        if plan[0] == 'grid':
+            turned = plan[1]
+            sx, sy = (b, a) if turned else (a, b)
+            for i in range(int(w / sx + EPSILON)):
+                for j in range(int(h / sy + EPSILON)):
+                    cells.append((x + i * sx, y + j * sy, turned))
+            return
+        _, axis, cut, rest = plan
+        if axis == 0:
+            build(x, y, cut, h)
+            build(x + cut, y, rest, h)
+        else:
+            build(x, y, w, cut)
+            build(x, y + cut, w, rest)
+
+    build(0.0, 0.0, fit(xs, width), fit(ys, height))
+    return tuple(cells)
+
+
+class LayerPattern(NamedTuple):
+    """Floor arrangement of one shape: one layer of boxes, repeated up the container."""
+    positions: np.ndarray   # (k, 2) X/Y of every box of a layer
+    rotations: np.ndarray   # (k,) rotation type of every box
+    height: float           # Layer height (vertical size of the boxes)
+    density: float          # Share of the floor covered by the layer
+
+
+class LayerEngine(PackingEngine):
+    """
+    Pre-packing stage for large groups of identical units.
+
+    Units are grouped by shape (dims and upright flag). For each group the
+    best guillotine floor pattern is searched once per allowed vertical
+    orientation, and groups whose pattern covers enough of the floor are
+    stacked as whole layers from the floor up. Every pattern position forms
+    a column, so layers rest fully on the one below. Layers are computed
+    with array operations, so their cost doesn't grow with the quantity.
+
+    The remaining units (partial layers and other shapes) are packed by the
+    wrapped engine into the space above the layers.
+
+    Layers don't check load limits, so containers with load limits are
+    packed by the wrapped engine alone, and units with a MaxLoad are never
+    layered.
+    """
+    def __init__(self, engine: PackingEngine, min_density: float = 0.85):
+        """
+        Args:
+            engine: Engine packing the units that aren't layered
+            min_density: Smallest share of the floor a layer pattern must cover to be used
+        """
+        self.engine = engine
+        self.min_density = min_density
+        self.name = f'{engine.name}+layers'
+
+    def get_pattern(self, container: Container, sizes: np.ndarray, rotations: Tuple[int, ...]) -> Optional[LayerPattern]:
+        """
+        Find the densest layer pattern of a shape.
+
+        Args:
+            container: Container whose floor is covered
+            sizes: (R, 3) effective size per allowed rotation of the shape
+            rotations: Allowed rotation types of the shape
+
+        Returns:
+            Optional[LayerPattern]: Densest pattern, or None if no box fits on the floor
+        """
+        best = None
+        floor_area = container.width * container.height
+        for size, rotation in zip(sizes.tolist(), rotations):
+            a, b, height = size
+            if height > container.depth + EPSILON:
+                continue
+            # Same vertical size with the footprint turned by 90 degrees
+            turned = [
+                other_rotation for other, other_rotation in zip(sizes.tolist(), rotations)
+                if other == [b, a, height] and other != size
+            ]
+            cells = solve_layer(container.width, container.height, a, b, bool(turned) or a == b)
+            if not cells:
+                continue
+            density = len(cells) * a * b / floor_area
+            if best is not None and (density, -height) <= (best.density, -best.height):
+                continue
+            turned_rotation = turned[0] if turned else rotation
+            best = LayerPattern(
+                positions=np.array([cell[:2] for cell in cells], dtype=np.float64),
+                rotations=np.array([turned_rotation if cell[2] else rotation for cell in cells], dtype=np.int8),
+                height=height,
+                density=density
+            )
+        return best
+
+    def get_column_row(
+        self,
+        width: float,
+        height: float,
+        sizes: np.ndarray,
+        rotations: Tuple[int, ...]
+    ) -> Optional[Tuple[int, np.ndarray, int, int]]:
+        """
+        Find the best row of full-height columns of a shape across the container.
+
+        A row is one box deep (along Y), as many boxes wide as fit along X and
+        as many boxes high as fit in the free height.
+
+        Args:
+            width: Container width
+            height: Free height
+            sizes: (R, 3) effective size per allowed rotation of the shape
+            rotations: Allowed rotation types of the shape
+
+        Returns:
+            Optional[Tuple[int, np.ndarray, int, int]]: (rotation type, effective size,
+                columns per row, boxes per column), or None if no row is dense enough
+        """
+        best = None
+        best_density = self.min_density
+        for size, rotation in zip(sizes, rotations):
+            across = int(width / size[0] + EPSILON)
+            stacked = int(height / size[2] + EPSILON)
+            if across == 0 or stacked == 0:
+                continue
+            # Share of the row's slab (width x box depth x free height) that is filled
+            density = across * size[0] * stacked * size[2] / (width * height)
+            if density >= best_density:
+                best = (rotation, size, across, stacked)
+                best_density = density + EPSILON
+        return best
+
+    def pack(self, container: Container, table: ItemTable, metrics: Optional[Metrics] = None) -> None:
+        """
+        Stack whole layers and columns of identical units, then pack the rest.
+
+        Layers cover the whole floor, from the bottom up. Above them, rows of
+        full-height columns are placed from the back wall (Y = 0). The rest
+        of the units go to the wrapped engine, which packs them into the
+        space left in front of the columns.
+
+        Args:
+            container: Container to pack bins into
+            table: Units to be packed, in preferred packing order
+            metrics: Optional metrics to record engine phases and counters into
+        """
+        for _ in self.iter_pack(container, table, metrics):
+            pass
+
+    def iter_pack(
+        self,
+        container: Container,
+        table: ItemTable,
+        metrics: Optional[Metrics] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> Iterator[PackingStep]:
+        """
+        Stack layers and columns, then pack the rest step by step with the wrapped engine.
+
+        Args:
+            container: Container to pack bins into
+            table: Units to be packed, in preferred packing order
+            metrics: Optional metrics to record engine phases and counters into
+            cancel: Optional token to stop early (layers and columns are always kept)
+
+        Yields:
+            PackingStep: Progress so far
+        """
+        metrics = metrics or Metrics()
+        if container.load_limits is not None:
+            yield from self.engine.iter_pack(container, table, metrics, cancel)
+            return
+
+        orientations = table.get_orientations()
+        stacked: List[np.ndarray] = []
+        # Corner of the space left for the wrapped engine
+        base = 0.0
+        front = 0.0
+        weight = 0.0
+        with metrics.phase('layers', len(table)):
+            candidates = []
+            for shape in range(len(orientations)):
+                # Pattern search is the slow part on mixed loads; stack what was found so far
+                if cancel is not None and cancel.cancelled:
+                    break
+                rows = np.flatnonzero(orientations.shape_ids == shape)
+                if np.isfinite(table.max_load[rows]).any():
+                    continue
+                pattern = self.get_pattern(container, orientations.sizes[shape], orientations.rotations[shape])
+                if pattern is not None and pattern.density >= self.min_density:
+                    candidates.append((pattern, shape, rows))
+            # Densest patterns at the bottom
+            candidates.sort(key=lambda candidate: -candidate[0].density)
+
+            remaining: List[Tuple[int, np.ndarray]] = []
+            for pattern, shape, rows in candidates:
+                per_layer = len(pattern.positions)
+                layers = min(len(rows) // per_layer, int((container.depth - base) / pattern.height + EPSILON))
+                layers = self.limit_weight(table, rows, per_layer, layers, container.max_weight - weight)
+                if layers:
+                    placed = rows[:layers * per_layer]
+                    table.position[placed, :2] = np.tile(pattern.positions, (layers, 1))
+                    table.position[placed, 2] = np.repeat(base + np.arange(layers) * pattern.height, per_layer)
+                    table.set_rotation(placed, np.tile(pattern.rotations, layers))
+                    stacked.append(placed)
+                    base += layers * pattern.height
+                    weight += float(table.weight[placed].sum())
+                    metrics.count('stacked_layers', layers)
+                remaining.append((shape, rows[layers * per_layer:]))
+
+            for shape, rows in remaining:
+                row = self.get_column_row(
+                    container.width,
+                    container.depth - base,
+                    orientations.sizes[shape],
+                    orientations.rotations[shape]
+                )
+                if row is None:
+                    continue
+                rotation, size, across, high = row
+                per_row = across * high
+                rows_fit = min(len(rows) // per_row, int((container.height - front) / size[1] + EPSILON))
+                rows_fit = self.limit_weight(table, rows, per_row, rows_fit, container.max_weight - weight)
+                if rows_fit == 0:
+                    continue
+                placed = rows[:rows_fit * per_row]
+                # Row-major: row (Y), then column (X), then height in the column (Z)
+                row_index, column, level = np.unravel_index(np.arange(len(placed)), (rows_fit, across, high))
+                table.position[placed] = np.column_stack([
+                    column * size[0],
+                    front + row_index * size[1],
+                    base + level * size[2]
+                ])
+                table.set_rotation(placed, rotation)
+                stacked.append(placed)
+                front += rows_fit * size[1]
+                weight += float(table.weight[placed].sum())
+                metrics.count('stacked_column_rows', rows_fit)
+
+        if not stacked:
+            yield from self.engine.iter_pack(container, table, metrics, cancel)
+            return
+
+        stacked_rows = np.concatenate(stacked)
+        table.fitted[stacked_rows] = True
+        metrics.count('stacked_items', len(stacked_rows))
+        # In the caller's packing order
+        rest = np.flatnonzero(~table.fitted)
+        logger.debug(f'Stacked {len(stacked_rows)} units in layers and columns; packing {len(rest)} more')
+
+        fitted = stacked_rows
+        unfitted = rest
+        if len(rest) and container.depth - base > EPSILON and container.height - front > EPSILON:
+            free = Container(
+                container.name,
+                container.width,
+                container.height - front,
+                container.depth - base,
+                container.max_weight - weight,
+                container.cost
+            )
+            others = table.take(rest)
+            offset = np.array([0.0, front, base])
+            for step in self.engine.iter_pack(free, others, metrics, cancel):
+                yield PackingStep(
+                    len(stacked_rows) + step.handled,
+                    len(stacked_rows) + step.placed,
+                    lambda layout=step.layout: self._join_layout(table, stacked_rows, layout(), offset)
+                )
+            table.position[rest] = others.position + [0.0, front, base]
+            table.set_rotation(rest, others.rotation)
+            table.fitted[rest] = others.fitted
+            fitted = np.concatenate([stacked_rows, rest[free.items.indices]])
+            unfitted = rest[free.unfitted_items.indices]
+        container.set_table(table, fitted, unfitted)
+        yield PackingStep(len(table), len(fitted), lambda: (table.position[fitted], table.size[fitted]))
+
+    @staticmethod
+    def _join_layout(
+        table: ItemTable,
+        stacked: np.ndarray,
+        layout: Tuple[np.ndarray, np.ndarray],
+        offset: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Combine the stacked units with the wrapped engine's partial layout, moved into place."""
+        positions, sizes = layout
+        return (
+            np.concatenate([table.position[stacked], positions + offset]),
+            np.concatenate([table.size[stacked], sizes])
+        )
+
+    @staticmethod
+    def limit_weight(table: ItemTable, rows: np.ndarray, per_group: int, groups: int, capacity: float) -> int:
+        """
+        Count how many whole groups (layers or rows) of units stay within a weight capacity.
+
+        Args:
+            table: Item table
+            rows: Rows of the units, in stacking order
+            per_group: Units per group
+            groups: Number of groups that fit geometrically
+            capacity: Remaining weight capacity
+
+        Returns:
+            int: Number of groups to stack
+        """
+        group_weights = table.weight[rows[:groups * per_group]].reshape(groups, per_group).sum(axis=1)
+        return int(np.searchsorted(np.cumsum(group_weights), capacity, side='right'))
@@ -0,0 +1,224 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np
+from models.container import Container
+from models.item_table import ItemList, ItemTable
+from services.packing_engine import PackingEngine
+from services.packing_service import PackingService
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class MultiPackingResult:
+    """
+    Result of packing one manifest into several containers.
+    """
+    def __init__(self, containers: List[Container], unfitted_items: ItemList, strategy: str):
+        self.containers = containers
+        self.unfitted_items = unfitted_items
+        self.strategy = strategy
+
+    def get_total_cost(self) -> float:
+        """
+        Calculate the total cost of the containers used.
+
+        Returns:
+            float: Sum of container costs
+        """
+        return sum(container.cost for container in self.containers)
+
+    def get_volume_utilization(self) -> float:
+        """
+        Calculate the volume utilization over all containers used.
+
+        Returns:
+            float: Volume utilization as a percentage
+        """
+        total_volume = sum(container.get_volume() for container in self.containers)
+        if total_volume == 0:
+            return 0.0
+        packed_volume = sum(container.get_packed_volume() for container in self.containers)
+        return (packed_volume / total_volume) * 100
+
+    def get_rank(self) -> Tuple[int, int, float, float]:
+        """
+        Get the sort key used to pick the best result (lower is better).
+
+        Returns:
+            Tuple: (unfitted bins, containers used, total cost, -utilization)
+        """
+        return (
+            len(self.unfitted_items),
+            len(self.containers),
+            self.get_total_cost(),
+            -self.get_volume_utilization()
+        )
+
+    def get_packing_summary(self) -> str:
+        """
+        Get a cost/utilization summary of the multi-container packing.
+
+        Returns:
+            str: Summary of containers used and unfitted items
+        """
+        summary = [
+            f"\nMulti-Container Packing Results:",
+            f"Strategy: {self.strategy}",
+            f"Containers used: {len(self.containers)}",
+            f"Successfully packed: {sum(len(c.items) for c in self.containers)} bins",
+            f"Unable to pack: {len(self.unfitted_items)} bins",
+            f"Total Cost: {self.get_total_cost():.2f}",
+            f"Overall Volume Utilization: {self.get_volume_utilization():.1f}%",
+            f"\nContainers:"
+        ]
+        for number, container in enumerate(self.containers, start=1):
+            summary.append(
+                f"{number}. {container.name}: {len(container.items)} bins, "
+                f"{container.get_volume_utilization():.1f}% utilization, cost {container.cost:.2f}"
+            )
+        return "\n".join(summary)
+
+
+def pack_with_strategy(
+    container_types: Sequence[Container],
+    table: ItemTable,
+    engine: Union[str, PackingEngine, None],
+    fill_type: int,
+    close_with_cheapest: bool,
+    max_containers: int
+) -> MultiPackingResult:
+    """
+    Pack a manifest into containers, spilling overflow into new containers.
+
+    Args:
+        container_types: Available container types
+        table: Units to be packed
+        engine: Packing engine name or instance
+        fill_type: Index of the container type used while items remain
+        close_with_cheapest: Whether to switch to the cheapest type that holds
+            all remaining items, once one does
+        max_containers: Maximum number of containers to use
+
+    Returns:
+        MultiPackingResult: Packed containers and leftover items
+    """
+    service = PackingService(engine)
+    by_cost = sorted(container_types, key=lambda c: c.cost)
+    fill = container_types[fill_type]
+    strategy = f"fill with {fill.name}" + (", close with cheapest fitting type" if close_with_cheapest else "")
+
+    containers: List[Container] = []
+    remaining = table
+    while len(remaining) and len(containers) < max_containers:
+        packed = None
+        if close_with_cheapest:
+            remaining_volume = remaining.get_volumes().sum()
+            remaining_weight = remaining.weight.sum()
+            for container_type in by_cost:
+                if container_type.get_volume() < remaining_volume or container_type.max_weight < remaining_weight:
+                    continue
+                candidate = service.pack_table(container_type.copy_empty(), remaining)
+                if not len(candidate.unfitted_items):
+                    packed = candidate
+                    break
+        if packed is None:
+            packed = service.pack_table(fill.copy_empty(), remaining)
+        if not len(packed.items):
+            # Nothing left fits into this container type
+            break
+
+        # Keep only this container's items in its table; the rest spill over
+        leftover = packed.table.take(packed.unfitted_items.indices)
+        packed.set_table(
+            packed.table.take(packed.items.indices), np.arange(len(packed.items)), [], packed.load_tracker
+        )
+        containers.append(packed)
+        remaining = leftover
+
+    return MultiPackingResult(containers, ItemList(remaining, np.arange(len(remaining))), strategy)
+
+
+def _pack_with_strategy(args: Tuple) -> MultiPackingResult:
+    """Process pool entry point for pack_with_strategy."""
+    return pack_with_strategy(*args)
+
+
+class MultiContainerService:
+    """
+    Service for packing a manifest into as few (and as cheap) containers as possible.
+
+    Alternative container mixes are packed in parallel in a process pool and
+    the best result is kept.
+    """
+    def __init__(
+        self,
+        engine: Union[str, PackingEngine, None] = 'extreme_point',
+        max_workers: Optional[int] = None,
+        max_containers: int = 100
+    ):
+        """
+        Args:
+            engine: Packing engine name or instance used for every container
+            max_workers: Process pool size (None for one per CPU, 1 to run in-process)
+            max_containers: Maximum number of containers per mix
+        """
+        self.engine = engine
+        self.max_workers = max_workers
+        self.max_containers = max_containers
+
+    @staticmethod
+    def get_strategies(container_types: Sequence[Container]) -> List[Tuple[int, bool]]:
+        """
+        List the container mixes to try.
+
+        Each strategy fills containers of one type, optionally closing with
+        the cheapest type that holds everything that's left.
+
+        Args:
+            container_types: Available container types
+
+        Returns:
+            List[Tuple[int, bool]]: (fill type index, close with cheapest) pairs
+        """
+        strategies = [(index, False) for index in range(len(container_types))]
+        if len(container_types) > 1:
+            strategies += [(index, True) for index in range(len(container_types))]
+        return strategies
+
+    def pack(self, container_types: Sequence[Container], table: Optional[ItemTable] = None) -> MultiPackingResult:
+        """
+        Pack bins into as few containers as possible, choosing among the available types.
+
+        Args:
+            container_types: Available container types (e.g. Container.all_from_data())
+            table: Units to be packed; defaults to Bins.tsv
+
+        Returns:
+            MultiPackingResult: Best result over all strategies
+        """
+        if not container_types:
+            raise ValueError("At least one container type is required")
+        if table is None:
+            table = PackingService.load_item_table()
+
+        jobs = [
+            (container_types, table, self.engine, fill_type, close, self.max_containers)
+            for fill_type, close in self.get_strategies(container_types)
+        ]
+        logger.info(f'Evaluating {len(jobs)} container mixes for {len(table)} bins')
+
+        if self.max_workers == 1 or len(jobs) == 1:
+            results = [_pack_with_strategy(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_pack_with_strategy, jobs))
+
+        for result in results:
+            logger.debug(
+                f'{result.strategy}: {len(result.containers)} containers, '
+                f'{len(result.unfitted_items)} unfitted, cost {result.get_total_cost():.2f}'
+            )
+        best = min(results, key=lambda result: result.get_rank())
+        logger.info(f'Best mix: {best.strategy} ({len(best.containers)} containers)')
+        return best
@@ -0,0 +1,186 @@
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple, Union
+import numpy as np
+from models.container import Container
+from models.item_table import ItemTable
+from models.rotation import UPRIGHT_ROTATIONS
+from utils.cancellation import CancellationToken
+from utils.logger import setup_logger
+from utils.metrics import Metrics
+
+logger = setup_logger(__name__)
+
+# py3dbp Item subclass for upright units, created with the first py3dbp import
+_upright_item_class = None
+
+
+class PackingStep(NamedTuple):
+    """Progress of an engine while it packs."""
+    handled: int    # Units placed or given up on so far
+    placed: int     # Units placed so far
+    # Returns (positions, effective sizes) of the placed units, in container coordinates
+    layout: Callable[[], Tuple[np.ndarray, np.ndarray]]
+
+
+class PackingEngine:
+    """
+    Base class for packing backends used by PackingService.
+
+    An engine receives an empty container and an ItemTable of the units to
+    pack. It writes positions and rotations into the table and attaches it
+    to the container, which fills container.items / container.unfitted_items.
+    """
+    name = 'base'
+
+    def pack(self, container: Container, table: ItemTable, metrics: Optional[Metrics] = None) -> None:
+        """
+        Pack the units of an ItemTable into the container.
+
+        Args:
+            container: Container to pack bins into
+            table: Units to be packed, in preferred packing order
+            metrics: Optional metrics to record engine phases and counters into
+        """
+        raise NotImplementedError
+
+    def iter_pack(
+        self,
+        container: Container,
+        table: ItemTable,
+        metrics: Optional[Metrics] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> Iterator[PackingStep]:
+        """
+        Pack step by step, reporting progress and stopping early when cancelled.
+
+        When cancelled, the units placed so far are kept and the rest are
+        unfitted. Engines without incremental progress (this default) pack in
+        one step and only check the token before they start.
+
+        Args:
+            container: Container to pack bins into
+            table: Units to be packed, in preferred packing order
+            metrics: Optional metrics to record engine phases and counters into
+            cancel: Optional token to stop early
+
+        Yields:
+            PackingStep: Progress so far
+        """
+        if cancel is not None and cancel.cancelled:
+            container.set_table(table, np.zeros(0, dtype=np.int64), np.arange(len(table)))
+            if metrics is not None:
+                metrics.count('cancelled_units', len(table))
+            return
+        self.pack(container, table, metrics)
+        rows = container.items.indices
+        yield PackingStep(len(table), len(rows), lambda: (table.position[rows], table.size[rows]))
+
+
+def get_upright_item_class() -> type:
+    """
+    Get a py3dbp Item class that only allows "this side up" rotations.
+
+    py3dbp tries every rotation and skips the ones that stick out of the
+    container, so a disallowed rotation reports an infinite size.
+
+    Returns:
+        type: py3dbp.Item subclass
+    """
+    global _upright_item_class
+    if _upright_item_class is None:
+        from py3dbp import Item as Py3dbpItem
+
+        class UprightItem(Py3dbpItem):
+            def get_dimension(self):
+                if self.rotation_type not in UPRIGHT_ROTATIONS:
+                    return [Decimal('Infinity')] * 3
+                return super().get_dimension()
+
+        _upright_item_class = UprightItem
+    return _upright_item_class
+
+
+class Py3dbpEngine(PackingEngine):
+    """
+    Reference backend that delegates the search to py3dbp.Packer.
+    """
+    name = 'py3dbp'
+
+    def pack(self, container: Container, table: ItemTable, metrics: Optional[Metrics] = None) -> None:
+        """
+        Pack the units of an ItemTable into the container using py3dbp Packer.
+
+        Args:
+            container: Container to pack bins into
+            table: Units to be packed, in preferred packing order
+            metrics: Optional metrics to record engine phases and counters into
+        """
+        from py3dbp import Packer, Item as Py3dbpItem
+
+        metrics = metrics or Metrics()
+        if container.load_limits is not None or np.isfinite(table.max_load).any():
+            logger.warning('py3dbp engine ignores load limits and MaxLoad; use an extreme_point engine')
+
+        # Create packer instance and add container
+        packer = Packer()
+        with metrics.phase('pack.convert_items', len(table)):
+            packer.add_bin(container.to_py3dbp_bin())
+
+            # py3dbp needs one object per unit; the name carries the table row
+            upright_item = get_upright_item_class() if table.upright.any() else Py3dbpItem
+            items = zip(table.dims.tolist(), table.weight.tolist(), table.upright.tolist())
+            for index, (dims, weight, upright) in enumerate(items):
+                item_class = upright_item if upright else Py3dbpItem
+                packer.add_item(item_class(str(index), dims[0], dims[1], dims[2], weight))
+
+        # Run the packing algorithm
+        with metrics.phase('pack.search', len(table)):
+            packer.pack(
+                bigger_first=True,
+                distribute_items=False,  # Don't spread items across container
+                number_of_decimals=0
+            )
+
+        # Get the container results
+        container_result = packer.bins[0]  # We only have one container
+
+        # Copy placements back into the table
+        with metrics.phase('pack.convert_results', len(table)):
+            fitted = np.array([int(item.name) for item in container_result.items], dtype=np.int64)
+            unfitted = np.array([int(item.name) for item in container_result.unfitted_items], dtype=np.int64)
+            if len(fitted):
+                table.position[fitted] = [[float(v) for v in item.position] for item in container_result.items]
+                table.set_rotation(fitted, [item.rotation_type for item in container_result.items])
+                table.fitted[fitted] = True
+        container.set_table(table, fitted, unfitted)
+
+
+# Engine names accepted by get_packing_engine
+ENGINE_NAMES = ('py3dbp', 'extreme_point', 'extreme_point_grid')
+
+
+def get_packing_engine(engine: Union[str, PackingEngine, None] = None) -> PackingEngine:
+    """
+    Resolve an engine name (or instance) to a PackingEngine instance.
+
+    Args:
+        engine: Engine name, engine instance, or None for the reference engine
+
+    Returns:
+        PackingEngine: Engine instance
+    """
+    if isinstance(engine, PackingEngine):
+        return engine
+
+    # Imported here to avoid a circular import with the engine modules
+    from services.extreme_point_engine import ExtremePointEngine
+
+    engines: Dict[str, Callable[[], PackingEngine]] = {
+        Py3dbpEngine.name: Py3dbpEngine,
+        ExtremePointEngine.name: ExtremePointEngine,
+        'extreme_point_grid': lambda: ExtremePointEngine(numeric='grid'),
+    }
+    name = engine or Py3dbpEngine.name
+    if name not in engines:
+        raise ValueError(f"Unknown packing engine: {name} (available: {', '.join(engines)})")
+    return engines[name]()
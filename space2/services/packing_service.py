@@ -1,118 +1,652 @@
-from typing import List
-from py3dbp import Packer
+import asyncio
+import time
+from typing import AsyncIterator, Generator, List, NamedTuple, Optional, Sequence, Union
+import numpy as np
 from models.container import Container
 from models.bin import PackingBin
+from models.item_table import ItemList, ItemTable, ItemView
+from models.rotation import OrientationTable
+from models.spatial_index import SpatialIndex
+from services.cache_service import PackingCache, build_entry, manifest_fingerprint, restore_entry
+from services.extreme_point_engine import ExtremePointState
+from services.layer_engine import LayerEngine
+from services.packing_engine import PackingEngine, get_packing_engine
+from utils.cancellation import CancellationToken
 from utils.logger import setup_logger
-from utils.file_loader import load_bins_data
+from utils.manifest_loader import ManifestSource, load_bin_records
+from utils.metrics import Metrics
 
 logger = setup_logger(__name__)
 
+class PackingProgress(NamedTuple):
+    """Progress event of a packing run (see PackingService.iter_pack_table)."""
+    placed: int              # Units placed so far
+    handled: int             # Units placed or given up on so far
+    total: int               # Units to pack
+    utilization: float       # Volume utilization of the placed units (%)
+    elapsed: float           # Seconds since the run started
+    positions: np.ndarray    # Partial layout: positions of the placed units
+    sizes: np.ndarray        # Partial layout: effective sizes of the placed units
+    done: bool = False       # Last event; the container holds the result
+    cancelled: bool = False  # The run was stopped early; the result is partial
+
 class PackingService:
     """
     Service for handling bin packing operations.
     """
+    def __init__(
+        self,
+        engine: Optional[Union[str, PackingEngine]] = None,
+        cache: Optional[PackingCache] = None,
+        metrics: Optional[Metrics] = None,
+        layers: bool = False
+    ):
+        """
+        Args:
+            engine: Packing engine name or instance ('py3dbp' or 'extreme_point').
+                Defaults to the py3dbp reference engine.
+            cache: Optional result cache; repeated manifests are rebuilt from it
+                instead of being packed again
+            metrics: Optional metrics shared by every container packed by this
+                service; otherwise each container gets its own
+            layers: Stack large groups of identical units as whole layers
+                before the engine packs the rest (see LayerEngine)
+        """
+        self.engine = get_packing_engine(engine)
+        if layers:
+            self.engine = LayerEngine(self.engine)
+        self.cache = cache
+        self.metrics = metrics
+
+    def get_metrics(self, container: Container) -> Metrics:
+        """
+        Get the metrics to record a container's phases into, attaching them as container.metrics.
+        
+        Args:
+            container: Container being packed
+            
+        Returns:
+            Metrics: The service's metrics, else the container's own
+        """
+        if self.metrics is not None:
+            container.metrics = self.metrics
+        elif container.metrics is None:
+            container.metrics = Metrics()
+        return container.metrics
+
     @staticmethod
-    def load_bins() -> List[PackingBin]:
+    def load_bins(filepath: ManifestSource = 'Bins.tsv') -> List[PackingBin]:
         """
         Load bins from Bins.tsv and convert to PackingBin instances.
         
+        Args:
+            filepath: Path to the bins TSV file (or another manifest source)
+            
         Returns:
             List[PackingBin]: List of bins to be packed
         """
-        bins_data = load_bins_data()
         bins = []
         
-        for row in bins_data:
+        for record in load_bin_records(filepath):
             # Create multiple items based on quantity
-            for i in range(int(row['Quantity'])):
+            for i in range(record.quantity):
                 bin_item = PackingBin(
-                    name=f"{row['Type']}_{i+1}",
-                    width=float(row['Width']),
-                    height=float(row['Height']),
-                    depth=float(row['Depth']),
-                    weight=float(row['Weight'])
+                    name=f"{record.type}_{i+1}",
+                    width=record.width,
+                    height=record.height,
+                    depth=record.depth,
+                    weight=record.weight,
+                    upright=record.upright
                 )
                 bins.append(bin_item)
         
         return bins
 
     @staticmethod
-    def apply_gravity(container: Container) -> None:
+    def load_item_table(filepath: ManifestSource = 'Bins.tsv') -> ItemTable:
+        """
+        Load bins from Bins.tsv into an array-backed ItemTable.
+        
+        Unlike load_bins, no per-unit objects are created, so memory and load
+        time don't grow with Python object overhead for large quantities.
+        The parsed manifest is cached while the file is unchanged.
+        
+        Args:
+            filepath: Path to the bins TSV file (or another manifest source)
+            
+        Returns:
+            ItemTable: One row per unit to be packed
+        """
+        return ItemTable.from_records(load_bin_records(filepath))
+
+    @staticmethod
+    def settle_heights(positions: np.ndarray, dims: np.ndarray, metrics: Optional[Metrics] = None) -> np.ndarray:
+        """
+        Compute gravity-settled Z positions for boxes ordered bottom to top.
+        
+        A spatial index over the footprints of already settled boxes finds the
+        highest surface under each box.
+        
+        Args:
+            positions: (n, 3) box positions, sorted by Z
+            dims: (n, 3) effective (rotated) box sizes along X, Y and Z
+            metrics: Optional metrics to count overlap checks into
+            
+        Returns:
+            np.ndarray: Settled Z position per box
+        """
+        index = SpatialIndex.for_footprints(dims[:, 0].tolist(), dims[:, 1].tolist())
+        heights = positions[:, 2].tolist()
+        
+        for i, ((x, y, z), (width, height, depth)) in enumerate(zip(positions.tolist(), dims.tolist())):
+            # Highest surface of any box below this one overlapping it in the X-Y plane,
+            # or the container floor
+            min_height = index.max_top_height(x, y, x + width, y + height)
+            
+            # Move box down to rest on highest surface below it
+            if z > min_height:
+                heights[i] = min_height
+            index.insert((x, y, heights[i]), (x + width, y + height, heights[i] + depth))
+        
+        if metrics is not None:
+            metrics.count('gravity_overlap_checks', index.checks)
+        return np.array(heights, dtype=np.float64)
+
+    @classmethod
+    def apply_gravity(cls, container: Container, metrics: Optional[Metrics] = None) -> None:
         """
         Apply gravity to make items rest on surfaces below them.
         
         Args:
             container: Container with items to apply gravity to
+            metrics: Optional metrics to record the gravity phase into
         """
-        # Sort items by Z position (bottom to top)
-        container.items.sort(key=lambda x: x.position[2])
+        # Positions change, so cached stats must be rebuilt
+        container.invalidate_stats()
+        metrics = metrics or Metrics()
         
-        for i, item in enumerate(container.items):
-            # Start at container floor
-            min_height = 0
+        with metrics.phase('gravity', len(container.items)):
+            if isinstance(container.items, ItemList):
+                # Sort table rows by Z position (bottom to top) and settle them in place
+                table = container.table
+                indices = container.items.indices
+                indices = indices[np.argsort(table.position[indices, 2], kind='stable')]
+                container.items.indices = indices
+                heights = cls.settle_heights(table.position[indices], table.size[indices], metrics)
+                fell = heights != table.position[indices, 2]
+                moved = indices[fell]
+                table.position[moved, 2] = heights[fell]
+                # Keep the engine's free-space state: only the boxes that fell are updated
+                if container.packing_state is not None:
+                    container.packing_state.move(moved, table.position[moved])
+                # Engines that track the load place units resting already; others' trackers go stale
+                if len(moved) and container.load_tracker is not None:
+                    container.rebuild_load_tracker()
+                return
             
-            # Check all items below this one for collision
-            for other in container.items[:i]:
-                # If there's overlap in X-Y plane, this item must rest on top of the other
-                if item.overlaps_xy(other):
-                    min_height = max(min_height, other.get_top_surface_height())
+            container.packing_state = None
             
-            # Move item down to rest on highest surface below it
-            if item.position[2] > min_height:
-                item.position[2] = min_height
+            # Sort items by Z position (bottom to top)
+            container.items.sort(key=lambda x: x.position[2])
+            positions = np.array([list(item.position) for item in container.items], dtype=np.float64).reshape(-1, 3)
+            dims = np.array([item.get_size() for item in container.items], dtype=np.float64).reshape(-1, 3)
+            for item, height in zip(container.items, cls.settle_heights(positions, dims, metrics).tolist()):
+                item.position[2] = height
 
-    def pack_bins(self, container: Container) -> Container:
+    def pack_table(self, container: Container, table: ItemTable, cancel: Optional[CancellationToken] = None) -> Container:
         """
-        Pack bins into the container using py3dbp Packer for optimal fitting.
+        Pack the units of an ItemTable into the container and apply gravity.
+        
+        With a cache configured, the table is put into canonical row order and
+        a cached result for the same manifest is reused when available.
         
         Args:
-            container: Container to pack bins into
+            container: Empty container to pack bins into
+            table: Units to be packed
+            cancel: Optional token to stop early, keeping the units placed so far
             
         Returns:
             Container: Container with packed items
         """
-        # Load bins
-        bins = self.load_bins()
+        for _ in self.iter_pack_table(container, table, cancel, interval=None):
+            pass
+        return container
+
+    def iter_pack_table(
+        self,
+        container: Container,
+        table: ItemTable,
+        cancel: Optional[CancellationToken] = None,
+        interval: Optional[float] = 0.5
+    ) -> Generator[PackingProgress, None, Container]:
+        """
+        Pack the units of an ItemTable into the container, yielding progress events.
         
-        # Create packer instance and add container
-        packer = Packer()
-        packer.add_bin(container.to_py3dbp_bin())
+        Works like pack_table. When the token is cancelled (or its deadline
+        passes) the engine stops between units and the units placed so far are
+        kept, settled by gravity, as the result; partial results aren't cached.
+        The py3dbp engine can't be interrupted and only reports when it's done.
+        
+        Args:
+            container: Empty container to pack bins into
+            table: Units to be packed
+            cancel: Optional token to stop early
+            interval: Minimum seconds between progress events (None: only the final event)
+            
+        Yields:
+            PackingProgress: Progress so far; the last event has done set
+            
+        Returns:
+            Container: Container with packed items
+        """
+        started = time.perf_counter()
+        metrics = self.get_metrics(container)
+        key = None
+        if self.cache is not None:
+            with metrics.phase('fingerprint', len(table)):
+                table = table.canonicalize()
+                key = manifest_fingerprint(container, table, self.engine.name)
         
         # Sort bins by height (Z dimension) in descending order
-        bins.sort(key=lambda x: x.depth, reverse=True)
+        with metrics.phase('sort', len(table)):
+            table = table.take(np.argsort(-table.dims[:, 2], kind='stable'))
+        
+        if key is not None:
+            with metrics.phase('cache_lookup'):
+                entry = self.cache.get(key)
+            if entry is not None:
+                logger.debug(f'Reusing cached packing result {key[:12]}')
+                metrics.count('cache_hits')
+                restore_entry(container, table, entry)
+                yield self.get_progress(container, len(table), started, True)
+                return container
+            metrics.count('cache_misses')
+        
+        # Run the packing engine
+        logger.debug(f'Packing {len(table)} bins with {self.engine.name} engine')
+        table.fitted[:] = False
+        volume = container.get_volume()
+        last_event = None
+        cancelled_units = metrics.counters.get('cancelled_units', 0)
+        with metrics.phase('pack', len(table)):
+            for step in self.engine.iter_pack(container, table, metrics, cancel):
+                now = time.perf_counter()
+                if interval is None or (last_event is not None and now - last_event < interval):
+                    continue
+                last_event = now
+                positions, sizes = step.layout()
+                utilization = float(np.prod(sizes, axis=1).sum()) / volume * 100 if volume else 0.0
+                yield PackingProgress(step.placed, step.handled, len(table), utilization, now - started, positions, sizes)
+        # Engines count the units they gave up on when stopped early
+        cancelled = metrics.counters.get('cancelled_units', 0) > cancelled_units
+        metrics.count('packed_items', len(container.items))
+        metrics.count('unfitted_items', len(container.unfitted_items))
+        if cancelled:
+            logger.info(f'Packing cancelled; keeping {len(container.items)} of {len(table)} bins placed so far')
         
-        # Add all bins to the packer
-        for bin_item in bins:
-            packer.add_item(bin_item.to_py3dbp_item())
+        # Apply gravity to make items rest on surfaces below them
+        self.apply_gravity(container, metrics)
+        
+        if key is not None and not cancelled:
+            with metrics.phase('cache_store'):
+                self.cache.put(key, build_entry(container))
+        yield self.get_progress(container, len(table), started, True, cancelled)
+        return container
+
+    @staticmethod
+    def get_progress(
+        container: Container,
+        total: int,
+        started: float,
+        done: bool = False,
+        cancelled: bool = False
+    ) -> PackingProgress:
+        """
+        Describe a container's current packing as a progress event.
         
-        # Run the packing algorithm
-        packer.pack(
-            bigger_first=True,
-            distribute_items=False,  # Don't spread items across container
-            number_of_decimals=0
+        Args:
+            container: Container being packed
+            total: Units to pack
+            started: time.perf_counter() when the run started
+            done: Whether the run is over
+            cancelled: Whether the run was stopped early
+            
+        Returns:
+            PackingProgress: Progress event
+        """
+        if isinstance(container.items, ItemList):
+            positions = container.table.position[container.items.indices]
+            sizes = container.table.size[container.items.indices]
+        else:
+            positions = np.array([list(item.position) for item in container.items], dtype=np.float64).reshape(-1, 3)
+            sizes = np.array([item.get_size() for item in container.items], dtype=np.float64).reshape(-1, 3)
+        return PackingProgress(
+            len(container.items),
+            len(container.items) + len(container.unfitted_items),
+            total,
+            container.get_volume_utilization(),
+            time.perf_counter() - started,
+            positions,
+            sizes,
+            done,
+            cancelled
         )
+
+    async def stream_pack(
+        self,
+        container: Container,
+        table: ItemTable,
+        cancel: Optional[CancellationToken] = None,
+        interval: Optional[float] = 0.5
+    ) -> AsyncIterator[PackingProgress]:
+        """
+        Pack a table in a worker thread, streaming progress events to an async consumer.
         
-        # Get the container results
-        container_result = packer.bins[0]  # We only have one container
+        Leaving the loop early (break, aclose() or task cancellation) cancels
+        the run and waits for the engine to stop, so the container holds the
+        partial packing afterwards.
         
-        # Process fitted items
-        for item in container_result.items:
-            fitted_item = PackingBin.from_py3dbp_item(item)
-            container.add_fitted_item(fitted_item)
+        Args:
+            container: Empty container to pack bins into
+            table: Units to be packed
+            cancel: Optional token to stop early (e.g. with a deadline)
+            interval: Minimum seconds between progress events
+            
+        Yields:
+            PackingProgress: Progress so far; the last event has done set
+        """
+        cancel = cancel or CancellationToken()
+        loop = asyncio.get_running_loop()
+        events: 'asyncio.Queue[Optional[PackingProgress]]' = asyncio.Queue()
         
-        # Process unfitted items
-        for item in container_result.unfitted_items:
-            unfitted_item = PackingBin.from_py3dbp_item(item)
-            container.add_unfitted_item(unfitted_item)
+        def run() -> None:
+            try:
+                for event in self.iter_pack_table(container, table, cancel, interval):
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, None)
         
-        # Apply gravity to make items rest on surfaces below them
-        self.apply_gravity(container)
+        worker = loop.run_in_executor(None, run)
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            # Re-raise errors of the packing run
+            await worker
+        finally:
+            if not worker.done():
+                cancel.cancel()
+                await asyncio.shield(worker)
+
+    @staticmethod
+    def _ensure_table(container: Container) -> ItemTable:
+        """
+        Move a container's items into ItemTable storage if they're PackingBin objects.
+        
+        Args:
+            container: Packed container
+            
+        Returns:
+            ItemTable: The container's table
+        """
+        if container.table is None or not isinstance(container.items, ItemList):
+            items = list(container.items) + list(container.unfitted_items)
+            table = ItemTable.from_bins(items)
+            table.fitted[:len(container.items)] = True
+            container.set_table(table, np.arange(len(container.items)), np.arange(len(container.items), len(items)))
+        return container.table
+
+    @staticmethod
+    def get_packing_state(container: Container) -> ExtremePointState:
+        """
+        Get the free-space state of a packed container, rebuilding it if needed.
+        
+        The state is kept on the container, so consecutive incremental changes
+        don't rebuild it.
+        
+        Args:
+            container: Packed container with ItemTable storage
+            
+        Returns:
+            ExtremePointState: Placed boxes and free extreme points
+        """
+        if container.packing_state is None:
+            table = container.table
+            rows = container.items.indices
+            lo = table.position[rows]
+            size = table.get_sizes(rows)
+            container.packing_state = ExtremePointState.from_boxes(
+                container.width,
+                container.height,
+                container.depth,
+                container.max_weight,
+                lo,
+                lo + size,
+                table.weight[rows],
+                rows
+            )
+        return container.packing_state
+
+    def add_items(
+        self,
+        container: Container,
+        items: Union[ItemTable, Sequence[PackingBin]],
+        repack_on_failure: bool = True
+    ) -> Container:
+        """
+        Add bins to an already packed container without repacking it.
+        
+        New bins are placed (largest first) into the free space left by the
+        current layout and settled onto the surface below them. Existing
+        bins don't move. Placements are checked against the container's load
+        limits and the bins' MaxLoad, as during packing. Only when some new
+        bin can't be placed this way is the whole manifest repacked (if
+        repack_on_failure is set).
+        
+        Args:
+            container: Packed container
+            items: Bins to add (ItemTable or PackingBin list)
+            repack_on_failure: Whether to fall back to a full repack when a bin doesn't fit
+            
+        Returns:
+            Container: The updated container
+        """
+        new_table = items if isinstance(items, ItemTable) else ItemTable.from_bins(items)
+        table = self._ensure_table(container)
+        state = self.get_packing_state(container)
+        
+        rows = table.append(new_table)
+        table.fitted[rows] = False
+        tracker = container.load_tracker
+        if tracker is None and container.needs_load_tracking():
+            container.rebuild_load_tracker()
+            tracker = container.load_tracker
+        weight = 0.0
+        accept = None
+        if tracker is not None:
+            def accept(position: np.ndarray, size: np.ndarray) -> bool:
+                # `weight` is the bin being placed
+                return tracker.check(position, size, weight) is None
+        orientations = OrientationTable(table.dims[rows], table.upright[rows])
+        shape_ids = dict(zip(rows.tolist(), orientations.shape_ids.tolist()))
+        placed: List[int] = []
+        failed: List[int] = []
+        for row in rows[np.argsort(-table.get_volumes()[rows], kind='stable')].tolist():
+            shape_id = shape_ids[row]
+            rotations = orientations.rotations[shape_id]
+            weight = float(table.weight[row])
+            placement = None
+            if rotations and state.total_weight + weight <= state.max_weight:
+                placement = state.find_placement(
+                    table.dims[row], rotations=rotations, accept=accept, sizes=orientations.sizes[shape_id]
+                )
+            if placement is None:
+                failed.append(row)
+                continue
+            
+            position, rotation_type = placement
+            size = orientations.sizes[shape_id][rotations.index(rotation_type)]
+            position = state.drop(position, size)
+            if tracker is not None:
+                tracker.add(position, size, weight, float(table.max_load[row]))
+            state.place(position, size, weight, row)
+            table.position[row] = position
+            table.set_rotation(row, rotation_type)
+            table.fitted[row] = True
+            placed.append(row)
+        
+        container.items.indices = np.concatenate([container.items.indices, np.array(placed, dtype=np.int64)])
+        container.unfitted_items.indices = np.concatenate(
+            [container.unfitted_items.indices, np.array(failed, dtype=np.int64)]
+        )
+        container.invalidate_stats()
+        logger.info(f'Incrementally placed {len(placed)} of {len(rows)} added bins')
+        
+        if failed and repack_on_failure:
+            self.repack(container)
+        return container
+
+    def remove_items(self, container: Container, items: Sequence[Union[str, ItemView]]) -> Container:
+        """
+        Remove bins from a packed container without repacking it.
+        
+        The removed bins' space is freed and gravity is re-applied only to
+        bins resting (directly or indirectly) above them.
+        
+        Args:
+            container: Packed container
+            items: Bins to remove, as names (e.g. "Large_3") or item views
+            
+        Returns:
+            Container: The updated container
+        """
+        table = self._ensure_table(container)
+        live = np.concatenate([container.items.indices, container.unfitted_items.indices])
+        names = [item for item in items if isinstance(item, str)]
+        rows = [item.index for item in items if isinstance(item, ItemView)]
+        found = table.find_rows(names, within=live)
+        missing = [name for name, row in zip(names, found.tolist()) if row < 0]
+        if missing:
+            raise ValueError(f"Items not in container: {', '.join(missing)}")
+        rows = np.concatenate([np.array(rows, dtype=np.int64), found])
+        
+        container.unfitted_items.indices = container.unfitted_items.indices[
+            ~np.isin(container.unfitted_items.indices, rows)
+        ]
+        container.invalidate_stats()
+        fitted = rows[np.isin(rows, container.items.indices)]
+        if len(fitted) == 0:
+            return container
+        
+        state = self.get_packing_state(container)
+        freed_lo, freed_hi = state.remove(fitted)
+        container.items.indices = container.items.indices[~np.isin(container.items.indices, fitted)]
+        table.fitted[fitted] = False
+        
+        # Copy positions of bins that fell into the freed space back to the table
+        moved = state.settle(freed_lo, freed_hi)
+        container.invalidate_stats()
+        if len(moved):
+            boxes = np.flatnonzero(np.isin(state.ids[:state.count], moved))
+            table.position[state.ids[boxes]] = state.lo[boxes]
+        # Carried weights can't be taken back out of a tracker
+        if container.needs_load_tracking():
+            container.rebuild_load_tracker()
+        logger.info(f'Removed {len(rows)} bins; {len(moved)} bins settled into the freed space')
+        return container
+
+    def repack(self, container: Container) -> Container:
+        """
+        Repack every bin of a container from scratch, keeping the result only if it fits more bins.
+        
+        Args:
+            container: Packed container
+            
+        Returns:
+            Container: The updated container
+        """
+        table = self._ensure_table(container)
+        rows = np.concatenate([container.items.indices, container.unfitted_items.indices])
+        repacked = self.pack_table(container.copy_empty(), table.take(rows))
+        logger.info(
+            f'Full repack: {len(repacked.unfitted_items)} unfitted '
+            f'(incremental: {len(container.unfitted_items)})'
+        )
+        if len(repacked.unfitted_items) < len(container.unfitted_items):
+            container.set_table(
+                repacked.table, repacked.items.indices, repacked.unfitted_items.indices, repacked.load_tracker
+            )
+        return container
+
+    def pack_bins(
+        self,
+        container: Container,
+        bins_file: ManifestSource = 'Bins.tsv',
+        cancel: Optional[CancellationToken] = None
+    ) -> Container:
+        """
+        Pack bins from Bins.tsv into the container using the configured packing engine.
+        
+        Args:
+            container: Container to pack bins into
+            bins_file: Path to the bins TSV file (or another manifest source)
+            cancel: Optional token to stop early, keeping the bins placed so far
+            
+        Returns:
+            Container: Container with packed items
+        """
+        for _ in self.iter_pack_bins(container, bins_file, cancel, interval=None):
+            pass
+        return container
+
+    def iter_pack_bins(
+        self,
+        container: Container,
+        bins_file: ManifestSource = 'Bins.tsv',
+        cancel: Optional[CancellationToken] = None,
+        interval: Optional[float] = 0.5
+    ) -> Generator[PackingProgress, None, Container]:
+        """
+        Pack bins from Bins.tsv into the container, yielding progress events (see iter_pack_table).
+        
+        The packing summary is printed once the run is over.
+        
+        Args:
+            container: Container to pack bins into
+            bins_file: Path to the bins TSV file (or another manifest source)
+            cancel: Optional token to stop early, keeping the bins placed so far
+            interval: Minimum seconds between progress events (None: only the final event)
+            
+        Yields:
+            PackingProgress: Progress so far; the last event has done set
+            
+        Returns:
+            Container: Container with packed items
+        """
+        # Load bins and pack them
+        metrics = self.get_metrics(container)
+        with metrics.phase('load_bins') as timing:
+            table = self.load_item_table(bins_file)
+            timing.items += len(table)
+        metrics.count('loaded_items', len(table))
+        final = None
+        for event in self.iter_pack_table(container, table, cancel, interval):
+            if event.done:
+                # Held back so the summary is printed before the caller sees the run end
+                final = event
+            else:
+                yield event
         
         # Log results
         logger.info(f'Packed {len(container.items)} bins into container')
         logger.info(f'Unable to pack {len(container.unfitted_items)} bins')
         
         # Print packing summary without position details
-        print(container.get_packing_summary(include_positions=False))
+        with metrics.phase('summary', len(container.items) + len(container.unfitted_items)):
+            summary = container.get_packing_summary(include_positions=False)
+        print(summary)
         
+        yield final
         return container
@@ -0,0 +1,299 @@
+import json
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+import numpy as np
+from models.container import Container
+from models.item_table import ItemList, ItemTable
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+RESULT_FORMAT_VERSION = 1
+RESULT_MAGIC = b'SP2PACK\x00'
+
+# Fixed-size file header: magic, version, record size, record count, index offset
+HEADER_STRUCT = struct.Struct('<8sIIQQ')
+# Records start at this offset, so they are aligned for memory mapping
+HEADER_SIZE = 64
+
+# One placement per record (64 bytes, little-endian, 8-byte fields first)
+RESULT_DTYPE = np.dtype({
+    'names': ['dims', 'position', 'container', 'type_id', 'ordinal', 'rotation', 'fitted'],
+    'formats': [('<f8', 3), ('<f8', 3), '<u4', '<u4', '<u4', 'i1', '?'],
+    'offsets': [0, 24, 48, 52, 56, 60, 61],
+    'itemsize': 64,
+})
+
+
+class ResultFormatError(ValueError):
+    """
+    Raised when a file is not a readable binary packing result.
+    """
+
+
+class ContainerResult(NamedTuple):
+    """A packed container as records plus its index entry (picklable, to return from workers)."""
+    info: Dict[str, Any]
+    type_names: List[str]
+    records: np.ndarray
+
+
+def build_result(container: Container, metadata: Optional[Dict[str, Any]] = None) -> ContainerResult:
+    """
+    Convert a packed container to result records.
+
+    Fitted units come first, in placement order, followed by the unfitted ones.
+
+    Args:
+        container: Packed container
+        metadata: Optional JSON-serializable values stored with the container (e.g. the manifest path)
+
+    Returns:
+        ContainerResult: Index entry, type names and records (type ids index the type names)
+    """
+    if isinstance(container.items, ItemList) and container.table is not None:
+        table = container.table
+        rows = np.concatenate([container.items.indices, container.unfitted_items.indices])
+    else:
+        table = ItemTable.from_bins(list(container.items) + list(container.unfitted_items))
+        rows = np.arange(len(table))
+    fitted_count = len(container.items)
+
+    records = np.zeros(len(rows), dtype=RESULT_DTYPE)
+    records['dims'] = table.dims[rows]
+    records['position'] = table.position[rows]
+    records['type_id'] = table.type_id[rows]
+    records['ordinal'] = table.ordinal[rows]
+    records['rotation'] = table.rotation[rows]
+    records['fitted'][:fitted_count] = True
+
+    info: Dict[str, Any] = {
+        'name': container.name,
+        'width': container.width,
+        'height': container.height,
+        'depth': container.depth,
+        'max_weight': container.max_weight,
+        'cost': container.cost,
+        'packed': fitted_count,
+        'unfitted': len(rows) - fitted_count,
+        'packed_volume': container.get_packed_volume(),
+        'unpacked_volume': container.get_unpacked_volume(),
+        'volume_utilization': round(container.get_volume_utilization(), 3),
+        'packed_weight': container.get_stats().packed_weight,
+        'height': container.get_stats().height,
+    }
+    if metadata:
+        info['metadata'] = metadata
+    return ContainerResult(info, list(table.type_names), records)
+
+
+class ResultWriter:
+    """
+    Streams packed containers into one binary result file.
+
+    Records are written as they arrive; the JSON index (containers, their
+    summary stats and record ranges, and the type names) is written after
+    them when the writer is closed. A file that was never closed reads as
+    incomplete. Type ids are shared across every container of the file.
+    """
+    def __init__(self, path: Union[str, os.PathLike]):
+        """
+        Args:
+            path: Output file (overwritten)
+        """
+        self.path = os.fspath(path)
+        self.file: Optional[BinaryIO] = open(self.path, 'wb')
+        self.file.write(bytes(HEADER_SIZE))
+        self.count = 0
+        self.containers: List[Dict[str, Any]] = []
+        self.type_names: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add(self, container: Container, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Append a packed container.
+
+        Args:
+            container: Packed container
+            metadata: Optional JSON-serializable values stored with the container
+
+        Returns:
+            int: Index of the container in the file
+        """
+        return self.add_result(build_result(container, metadata))
+
+    def add_result(self, result: ContainerResult) -> int:
+        """
+        Append a container already converted with build_result (e.g. in a worker process).
+
+        Its records are relabelled in place (container index and file-wide
+        type ids) and written without copying.
+
+        Args:
+            result: Converted container
+
+        Returns:
+            int: Index of the container in the file
+        """
+        if self.file is None:
+            raise ValueError(f'{self.path} is closed')
+        index = len(self.containers)
+        type_map = np.array(
+            [self._type_ids.setdefault(name, len(self._type_ids)) for name in result.type_names],
+            dtype=np.uint32
+        )
+        self.type_names = list(self._type_ids)
+        records = result.records
+        if len(records):
+            records['container'] = index
+            records['type_id'] = type_map[records['type_id']]
+            self.file.write(memoryview(records))
+        self.containers.append({**result.info, 'start': self.count, 'count': len(records)})
+        self.count += len(records)
+        return index
+
+    def close(self) -> None:
+        """Write the index and the final header."""
+        if self.file is None:
+            return
+        index_offset = HEADER_SIZE + self.count * RESULT_DTYPE.itemsize
+        index = {'version': RESULT_FORMAT_VERSION, 'type_names': self.type_names, 'containers': self.containers}
+        self.file.write(json.dumps(index).encode('utf-8'))
+        self.file.seek(0)
+        self.file.write(HEADER_STRUCT.pack(
+            RESULT_MAGIC, RESULT_FORMAT_VERSION, RESULT_DTYPE.itemsize, self.count, index_offset
+        ))
+        self.file.close()
+        self.file = None
+        logger.debug(f'Wrote {self.count} placements of {len(self.containers)} containers to {self.path}')
+
+
+def write_results(
+    path: Union[str, os.PathLike],
+    containers: Sequence[Container],
+    metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+) -> None:
+    """
+    Write packed containers to a binary result file.
+
+    Args:
+        path: Output file (overwritten)
+        containers: Packed containers
+        metadata: Optional metadata per container
+    """
+    with ResultWriter(path) as writer:
+        for number, container in enumerate(containers):
+            writer.add(container, metadata[number] if metadata else None)
+
+
+class ResultFile:
+    """
+    Memory-mapped reader of a binary result file.
+
+    `records` is a read-only view of every placement in the file; slicing
+    and filtering it only reads the pages that are touched, so large files
+    can be scanned without loading them.
+    """
+    def __init__(self, path: Union[str, os.PathLike]):
+        """
+        Args:
+            path: Result file written by ResultWriter
+
+        Raises:
+            ResultFormatError: The file is not a complete result file of this version
+        """
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as file:
+            header = file.read(HEADER_STRUCT.size)
+            if len(header) < HEADER_STRUCT.size:
+                raise ResultFormatError(f'{self.path}: not a result file (too short)')
+            magic, version, record_size, count, index_offset = HEADER_STRUCT.unpack(header)
+            if magic != RESULT_MAGIC:
+                if magic == bytes(len(RESULT_MAGIC)):
+                    raise ResultFormatError(f'{self.path}: incomplete result file (the writer was not closed)')
+                raise ResultFormatError(f'{self.path}: not a result file')
+            if version != RESULT_FORMAT_VERSION or record_size != RESULT_DTYPE.itemsize:
+                raise ResultFormatError(
+                    f'{self.path}: unsupported result format version {version} (record size {record_size})'
+                )
+            file.seek(index_offset)
+            index = json.loads(file.read().decode('utf-8'))
+        self.type_names: List[str] = index['type_names']
+        self.containers: List[Dict[str, Any]] = index['containers']
+        self.records = (
+            np.memmap(self.path, dtype=RESULT_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,)) if count
+            else np.zeros(0, dtype=RESULT_DTYPE)
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __enter__(self) -> 'ResultFile':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Drop this reader's mapping (views taken from it stay valid until released)."""
+        self.records = np.zeros(0, dtype=RESULT_DTYPE)
+
+    def get_records(self, container: int) -> np.ndarray:
+        """
+        Get the records of one container (a view, nothing is copied).
+
+        Args:
+            container: Container index
+
+        Returns:
+            np.ndarray: Records, fitted units first
+        """
+        entry = self.containers[container]
+        return self.records[entry['start']:entry['start'] + entry['count']]
+
+    def iter_chunks(self, chunk_size: int = 1 << 20) -> Iterator[np.ndarray]:
+        """
+        Iterate over every record in fixed-size views.
+
+        Args:
+            chunk_size: Records per chunk
+
+        Yields:
+            np.ndarray: Consecutive record views
+        """
+        for start in range(0, len(self.records), chunk_size):
+            yield self.records[start:start + chunk_size]
+
+    def get_type_id(self, name: str) -> int:
+        """
+        Get the file-wide id of a bin type.
+
+        Args:
+            name: Bin type name
+
+        Returns:
+            int: Type id (-1 when the file has no unit of this type)
+        """
+        return self.type_names.index(name) if name in self.type_names else -1
+
+    def get_names(self, records: np.ndarray) -> List[str]:
+        """
+        Get the display names (e.g. "Large_3") of records.
+
+        Args:
+            records: Records of this file
+
+        Returns:
+            List[str]: One name per record
+        """
+        return [
+            f'{self.type_names[type_id]}_{ordinal}'
+            for type_id, ordinal in zip(records['type_id'].tolist(), records['ordinal'].tolist())
+        ]
@@ -0,0 +1,387 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+import numpy as np
+from models.container import Container
+from models.item_table import ItemTable
+from models.rotation import ALL_ROTATIONS, UPRIGHT_ROTATIONS
+from services.cache_service import CacheEntry, build_entry, restore_entry
+from services.extreme_point_engine import ExtremePointEngine
+from services.packing_engine import PackingEngine, get_packing_engine
+from services.packing_service import PackingService
+from utils.logger import setup_logger
+from utils.metrics import Metrics
+
+logger = setup_logger(__name__)
+
+# Sort keys of the randomized restarts (all descending)
+SORT_KEYS: Dict[str, Callable[[ItemTable], np.ndarray]] = {
+    'volume': lambda table: table.get_volumes(),
+    'height': lambda table: table.dims[:, 2],
+    'base_area': lambda table: table.dims[:, 0] * table.dims[:, 1],
+    'longest_side': lambda table: table.dims.max(axis=1),
+    'weight': lambda table: table.weight,
+}
+
+# Rotation policies: rotation types to try, in order of preference ('shuffled' is drawn per attempt)
+ROTATION_POLICIES = ('all', 'upright', 'shuffled')
+
+# Relative noise applied to the sort key of a restart
+NOISE_LEVELS = (0.0, 0.05, 0.2)
+
+# Share of attempts that restart from a random sort key instead of mutating the current ordering
+RESTART_PROBABILITY = 0.3
+
+# Starting annealing temperature in utilization percentage points (cools to 0 over the budget)
+INITIAL_TEMPERATURE = 1.0
+
+
+class Attempt(NamedTuple):
+    """One packing attempt of the search."""
+    number: int
+    seed: int
+    sort_key: str
+    noise: float
+    rotation_policy: str
+    rotations: Tuple[int, ...]
+    # Mutated ordering (rows of the search table); None to derive it from the sort key
+    order: Optional[np.ndarray] = None
+
+    def describe(self) -> str:
+        if self.order is not None:
+            return f'mutation ({self.rotation_policy} rotations)'
+        return f'{self.sort_key} order, noise {self.noise:g}, {self.rotation_policy} rotations'
+
+
+class AttemptResult(NamedTuple):
+    """Outcome of one attempt, sent back from a worker."""
+    attempt: Attempt
+    utilization: float
+    unfitted: int
+    order: np.ndarray
+    entry: CacheEntry
+
+
+class SearchProgress(NamedTuple):
+    """Progress of a search, reported whenever a better packing is found."""
+    attempts: int
+    elapsed: float
+    utilization: float
+    unfitted: int
+    description: str
+
+
+class SearchResult:
+    """
+    Best packing found by a search.
+    """
+    def __init__(self, container: Container, attempts: int, elapsed: float, history: List[SearchProgress]):
+        self.container = container
+        self.attempts = attempts
+        self.elapsed = elapsed
+        # Every improvement, in the order found
+        self.history = history
+
+    def get_summary(self) -> str:
+        """
+        Get a summary of the search.
+
+        Returns:
+            str: Attempts, time and improvements
+        """
+        best = self.history[-1]
+        lines = [
+            "\nSearch Results:",
+            f"Attempts: {self.attempts} in {self.elapsed:.1f}s",
+            f"Best: {best.utilization:.1f}% utilization, {best.unfitted} unfitted ({best.description})",
+            f"Improvements: {len(self.history) - 1} over the deterministic pass "
+            f"({self.history[0].utilization:.1f}%)",
+        ]
+        return "\n".join(lines)
+
+
+def get_rotations(policy: str, rng: random.Random) -> Tuple[int, ...]:
+    """
+    Get the rotation types tried by a rotation policy.
+
+    Args:
+        policy: Name from ROTATION_POLICIES
+        rng: Random source for the 'shuffled' policy
+
+    Returns:
+        Tuple[int, ...]: Rotation types in order of preference
+    """
+    if policy == 'upright':
+        return UPRIGHT_ROTATIONS
+    if policy == 'shuffled':
+        rotations = list(ALL_ROTATIONS)
+        rng.shuffle(rotations)
+        return tuple(rotations)
+    return ALL_ROTATIONS
+
+
+def get_order(table: ItemTable, attempt: Attempt, rng: random.Random) -> np.ndarray:
+    """
+    Get the packing order of an attempt.
+
+    Args:
+        table: Units to be packed
+        attempt: Attempt with a sort key and noise, or an explicit order
+        rng: Random source for the noise
+
+    Returns:
+        np.ndarray: Row indices in packing order
+    """
+    if attempt.order is not None:
+        return attempt.order
+    key = SORT_KEYS[attempt.sort_key](table)
+    if attempt.noise:
+        noise = np.random.default_rng(rng.getrandbits(32)).uniform(-attempt.noise, attempt.noise, len(table))
+        key = key * (1 + noise)
+    return np.argsort(-key, kind='stable')
+
+
+def mutate(order: np.ndarray, rng: random.Random) -> np.ndarray:
+    """
+    Perturb an ordering with a few random swaps and one segment reversal.
+
+    Args:
+        order: Row indices in packing order
+        rng: Random source
+
+    Returns:
+        np.ndarray: New ordering
+    """
+    order = order.copy()
+    count = len(order)
+    if count < 2:
+        return order
+    for _ in range(rng.randint(1, max(1, min(8, count // 4)))):
+        i, j = rng.randrange(count), rng.randrange(count)
+        order[i], order[j] = order[j], order[i]
+    start = rng.randrange(count - 1)
+    end = min(count, start + rng.randint(2, max(2, min(32, count))))
+    order[start:end] = order[start:end][::-1]
+    return order
+
+
+def run_attempt(container: Container, table: ItemTable, engine: ExtremePointEngine, attempt: Attempt) -> AttemptResult:
+    """
+    Pack the table once in the order and with the rotations of an attempt.
+
+    Args:
+        container: Empty container
+        table: Units to be packed
+        engine: Extreme-point engine whose options the attempt overrides
+        attempt: Attempt to run
+
+    Returns:
+        AttemptResult: Utilization and placements
+    """
+    order = get_order(table, attempt, random.Random(attempt.seed))
+    attempt_engine = ExtremePointEngine(
+        chunk_size=engine.chunk_size,
+        numeric=engine.numeric,
+        keep_order=True,
+        rotations=attempt.rotations
+    )
+    packed = container.copy_empty()
+    ordered = table.take(order)
+    ordered.fitted[:] = False
+    attempt_engine.pack(packed, ordered)
+    PackingService.apply_gravity(packed)
+    return AttemptResult(
+        attempt,
+        packed.get_volume_utilization(),
+        len(packed.unfitted_items),
+        order,
+        build_entry(packed)
+    )
+
+
+# Search problem of a worker process, set once by the pool initializer
+_worker_problem: Optional[Tuple[Container, ItemTable, ExtremePointEngine]] = None
+
+
+def _init_worker(container: Container, table: ItemTable, engine: ExtremePointEngine) -> None:
+    """Process pool initializer: keep the problem so jobs only carry their attempt."""
+    global _worker_problem
+    _worker_problem = (container, table, engine)
+
+
+def _run_attempt(attempt: Attempt) -> AttemptResult:
+    """Process pool entry point for run_attempt."""
+    return run_attempt(*_worker_problem, attempt)
+
+
+class SearchService:
+    """
+    Multi-start search for a better packing than the single deterministic pass.
+
+    Attempts run in a process pool and vary the packing order and rotation
+    policy. Randomized restarts use a random sort key with noise; the other
+    attempts mutate the current ordering, which is replaced by simulated
+    annealing acceptance (worse results are accepted with a probability that
+    shrinks as the budget runs out). The first attempt is the deterministic
+    pass, so the result is never worse than a plain pack.
+    """
+    def __init__(
+        self,
+        engine: Union[str, PackingEngine, None] = 'extreme_point',
+        max_workers: Optional[int] = None,
+        time_limit: Optional[float] = 10.0,
+        max_attempts: Optional[int] = None,
+        seed: int = 0,
+        on_progress: Optional[Callable[[SearchProgress], None]] = None,
+        metrics: Optional[Metrics] = None
+    ):
+        """
+        Args:
+            engine: Extreme-point engine name or instance ('extreme_point' or 'extreme_point_grid')
+            max_workers: Process pool size (None for one per CPU, 1 to run in-process)
+            time_limit: Wall-clock budget in seconds (None for no limit)
+            max_attempts: Attempt budget (None for no limit)
+            seed: Random seed; a search with an attempt budget and one worker is reproducible
+            on_progress: Called with every improvement as the search runs
+            metrics: Optional metrics to record the search phase and counters into
+        """
+        engine = get_packing_engine(engine)
+        if not isinstance(engine, ExtremePointEngine):
+            raise ValueError(f"Search needs an extreme-point engine, got {engine.name}")
+        if time_limit is None and max_attempts is None:
+            raise ValueError("A time limit or an attempt budget is required")
+        self.engine = engine
+        self.max_workers = max_workers
+        self.time_limit = time_limit
+        self.max_attempts = max_attempts
+        self.seed = seed
+        self.on_progress = on_progress
+        self.metrics = metrics or Metrics()
+
+    def _next_attempt(self, number: int, rng: random.Random, current: Optional[AttemptResult]) -> Attempt:
+        """Draw the next attempt: the deterministic pass, a restart or a mutation."""
+        seed = rng.getrandbits(32)
+        if number == 0:
+            return Attempt(number, seed, 'volume', 0.0, 'all', ALL_ROTATIONS)
+        if current is None or rng.random() < RESTART_PROBABILITY:
+            policy = rng.choice(ROTATION_POLICIES)
+            return Attempt(
+                number,
+                seed,
+                rng.choice(list(SORT_KEYS)),
+                rng.choice(NOISE_LEVELS),
+                policy,
+                get_rotations(policy, rng)
+            )
+        # Mutations keep the parent's rotations (including a shuffled permutation)
+        return current.attempt._replace(number=number, seed=seed, order=mutate(current.order, rng))
+
+    def search(self, container: Container, table: ItemTable) -> SearchResult:
+        """
+        Search for the packing with the highest volume utilization.
+
+        Args:
+            container: Empty container to pack
+            table: Units to be packed
+
+        Returns:
+            SearchResult: Best packed container and the search history
+        """
+        rng = random.Random(self.seed)
+        # Same starting order as PackingService.pack_table, so attempt 0 reproduces a plain pack
+        table = table.take(np.argsort(-table.dims[:, 2], kind='stable'))
+        started = time.perf_counter()
+        deadline = started + self.time_limit if self.time_limit is not None else math.inf
+        workers = self.max_workers or os.cpu_count() or 1
+        history: List[SearchProgress] = []
+        best: Optional[AttemptResult] = None
+        current: Optional[AttemptResult] = None
+        attempts = 0
+        submitted = 0
+
+        def budget_left() -> bool:
+            return (
+                time.perf_counter() < deadline and
+                (self.max_attempts is None or submitted < self.max_attempts)
+            )
+
+        def record(result: AttemptResult) -> None:
+            nonlocal best, current, attempts
+            attempts += 1
+            score = (result.utilization, -result.unfitted)
+            if best is None or score > (best.utilization, -best.unfitted):
+                best = result
+                progress = SearchProgress(
+                    attempts,
+                    time.perf_counter() - started,
+                    result.utilization,
+                    result.unfitted,
+                    result.attempt.describe()
+                )
+                history.append(progress)
+                logger.info(
+                    f'Search attempt {result.attempt.number}: {result.utilization:.1f}% utilization '
+                    f'({result.attempt.describe()})'
+                )
+                if self.on_progress is not None:
+                    self.on_progress(progress)
+
+            # Simulated annealing acceptance of the current ordering
+            if current is None or result.utilization >= current.utilization:
+                current = result
+            else:
+                fraction = (time.perf_counter() - started) / self.time_limit if self.time_limit else (
+                    submitted / self.max_attempts
+                )
+                temperature = INITIAL_TEMPERATURE * max(0.0, 1.0 - fraction)
+                if temperature > 0 and rng.random() < math.exp((result.utilization - current.utilization) / temperature):
+                    current = result
+
+        with self.metrics.phase('search', len(table)):
+            if workers == 1:
+                while budget_left():
+                    attempt = self._next_attempt(submitted, rng, current)
+                    submitted += 1
+                    record(run_attempt(container, table, self.engine, attempt))
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(container.copy_empty(), table, self.engine)
+                ) as pool:
+                    # Keep every worker busy with one queued attempt each
+                    in_flight = 2 * workers
+                    pending: Set[Future] = set()
+                    while budget_left() or pending:
+                        while budget_left() and len(pending) < in_flight:
+                            pending.add(pool.submit(_run_attempt, self._next_attempt(submitted, rng, current)))
+                            submitted += 1
+                        timeout = max(0.0, deadline - time.perf_counter()) if deadline < math.inf else None
+                        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            record(future.result())
+                        if time.perf_counter() >= deadline:
+                            # Out of time: drop queued attempts (running ones can't be interrupted)
+                            break
+                    pool.shutdown(wait=False, cancel_futures=True)
+
+        self.metrics.count('search_attempts', attempts)
+        self.metrics.count('search_improvements', max(0, len(history) - 1))
+        if best is None:
+            # The budget ran out before any attempt finished: fall back to the deterministic pass
+            best = run_attempt(container, table, self.engine, self._next_attempt(0, rng, None))
+            attempts += 1
+            history.append(SearchProgress(
+                attempts,
+                time.perf_counter() - started,
+                best.utilization,
+                best.unfitted,
+                best.attempt.describe()
+            ))
+
+        packed = restore_entry(container, table.take(best.order), best.entry)
+        packed.metrics = self.metrics
+        return SearchResult(packed, attempts, time.perf_counter() - started, history)
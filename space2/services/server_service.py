@@ -0,0 +1,432 @@
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from models.container import Container
+from models.item_table import ItemTable
+from services.batch_service import get_result_record
+from services.cache_service import get_cache
+from services.packing_service import PackingService
+from services.validation_service import validate_container
+from utils.cancellation import CancellationToken
+from utils.logger import setup_logger
+from utils.manifest_loader import ManifestSource, iter_rows
+from utils.metrics import Metrics
+
+logger = setup_logger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Largest accepted request body
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+LOOPBACK_HOSTS = ('127.0.0.1', '::1', 'localhost')
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+    504: 'Gateway Timeout',
+}
+
+
+class HttpError(Exception):
+    """
+    Raised by request handlers to answer with an HTTP error status.
+    """
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def pack_request(
+    problem: Dict[str, Any],
+    engine: Optional[str],
+    cache_dir: Optional[str],
+    deadline: Optional[float]
+) -> Dict[str, Any]:
+    """
+    Pack one JSON problem (runs in a worker process).
+
+    Errors are captured in the record instead of raised. Invalid problems are
+    flagged as client errors.
+
+    Args:
+        problem: {"container": Container.tsv row, "bins": Bins.tsv rows, optional
+            "engine" and "include_positions"}
+        engine: Engine used when the problem doesn't name one
+        cache_dir: Optional packing result cache directory
+        deadline: Epoch time after which the job is skipped (it waited too long to start)
+            or stopped; a stopped job's record holds the bins placed so far and "partial"
+
+    Returns:
+        Dict[str, Any]: JSON-serializable result record
+    """
+    if deadline is not None and time.time() > deadline:
+        return {'status': 'cancelled', 'error': 'deadline passed before packing started'}
+
+    record: Dict[str, Any] = {'status': 'ok'}
+    started = time.perf_counter()
+    try:
+        try:
+            container = Container.from_row(problem['container'])
+            table = ItemTable.from_rows(problem['bins'])
+            service = PackingService(problem.get('engine') or engine, cache=get_cache(cache_dir) if cache_dir else None)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            record.update({'status': 'error', 'client_error': True, 'error': f"{type(e).__name__}: {e}"})
+            return record
+        service.pack_table(container, table, CancellationToken(deadline))
+        record.update(get_result_record(container, bool(problem.get('include_positions'))))
+        if service.get_metrics(container).counters.get('cancelled_units'):
+            record['partial'] = True
+        record['validation'] = validate_container(container).to_record()
+        record['summary'] = container.get_packing_summary()
+    except Exception as e:
+        record.update({'status': 'error', 'error': f"{type(e).__name__}: {e}", 'traceback': traceback.format_exc()})
+    record['timings'] = {'pack': round(time.perf_counter() - started, 6)}
+    return record
+
+
+def get_problem_key(problem: Dict[str, Any]) -> str:
+    """
+    Get the coalescing key of a problem: identical problems share one packing job.
+
+    Args:
+        problem: Request body (its deadline is ignored)
+
+    Returns:
+        str: Hex digest
+    """
+    fields = {name: problem.get(name) for name in ('container', 'bins', 'engine', 'include_positions')}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class PackingJob:
+    """
+    A packing job shared by every concurrent request for the same problem.
+    """
+    __slots__ = ('key', 'problem', 'future', 'waiters', 'deadline', 'started')
+
+    def __init__(self, key: str, problem: Dict[str, Any], future: 'asyncio.Future[Dict[str, Any]]'):
+        self.key = key
+        self.problem = problem
+        self.future = future
+        self.waiters = 0
+        # Latest deadline of its waiters (epoch seconds); None while any waiter has none
+        self.deadline: Optional[float] = None
+        self.started = False
+
+
+class PackingServer:
+    """
+    Long-running asyncio HTTP server around PackingService.
+
+    Packing runs in a process pool, so imports and worker start-up are paid
+    once. Concurrent requests for the same problem are coalesced into one
+    job. At most max_pending distinct jobs are queued or running, and further
+    requests are answered with 503. A request whose deadline passes gets 504;
+    its job is dropped if no other request is waiting for it and it hasn't
+    started (running jobs finish, but their result is discarded).
+
+    Endpoints:
+        POST /pack     Pack a JSON problem (see pack_request)
+        GET /health    Queue and worker status
+        GET /metrics   Request counters in Prometheus text format
+    """
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        engine: Optional[str] = 'extreme_point',
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+        default_deadline: Optional[float] = None,
+        cache_dir: Optional[str] = None,
+        max_body_bytes: int = MAX_BODY_BYTES
+    ):
+        """
+        Args:
+            host: Interface to listen on (loopback by default; there is no authentication)
+            port: TCP port (0 for any free port)
+            engine: Packing engine used when a problem doesn't name one
+            max_workers: Process pool size (None for one per CPU)
+            max_pending: Maximum number of distinct jobs queued or running
+            default_deadline: Seconds a request may wait when it doesn't set "deadline"
+            cache_dir: Optional packing result cache directory shared by all workers
+            max_body_bytes: Largest accepted request body
+        """
+        self.host = host
+        self.port = port
+        self.engine = engine
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.default_deadline = default_deadline
+        self.cache_dir = cache_dir
+        self.max_body_bytes = max_body_bytes
+        self.metrics = Metrics()
+        self.jobs: Dict[str, PackingJob] = {}
+        self.running = 0
+        self._queue: Optional['asyncio.Queue[PackingJob]'] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._dispatchers: List['asyncio.Task[None]'] = []
+
+    async def start(self) -> None:
+        """Start the worker pool and listen for connections."""
+        if self.host not in LOOPBACK_HOSTS:
+            logger.warning(f'Listening on {self.host}: the server has no authentication')
+        self._queue = asyncio.Queue()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        # One dispatcher per worker: jobs wait in our queue, where they can still be dropped
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.max_workers)]
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f'Packing server listening on http://{self.host}:{self.port} ({self.max_workers} workers)')
+
+    async def serve_forever(self) -> None:
+        """Start the server (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening, drop queued jobs and shut the worker pool down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _dispatch(self) -> None:
+        """Feed queued jobs to the process pool, skipping jobs nobody waits for anymore."""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                continue
+            job.started = True
+            self.running += 1
+            try:
+                with self.metrics.phase('pack_job'):
+                    result = await loop.run_in_executor(
+                        self._pool, pack_request, job.problem, self.engine, self.cache_dir, job.deadline
+                    )
+                if not job.future.done():
+                    job.future.set_result(result)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                # The worker itself died (e.g. killed), not just the packing
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self.running -= 1
+                if self.jobs.get(job.key) is job:
+                    del self.jobs[job.key]
+
+    async def pack(self, problem: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Pack a problem, joining an identical job that is already queued or running.
+
+        Args:
+            problem: Request body; an optional "deadline" gives the seconds the caller will wait
+
+        Returns:
+            Dict[str, Any]: Result record
+
+        Raises:
+            HttpError: 503 when the queue is full, 504 when the deadline passes
+        """
+        self.metrics.count('requests')
+        timeout = problem.get('deadline', self.default_deadline)
+        if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+            raise HttpError(400, 'deadline must be a positive number of seconds')
+        deadline = time.time() + timeout if timeout is not None else None
+
+        key = get_problem_key(problem)
+        job = self.jobs.get(key)
+        if job is not None:
+            self.metrics.count('coalesced_requests')
+            if job.deadline is not None:
+                job.deadline = None if deadline is None else max(job.deadline, deadline)
+        else:
+            if len(self.jobs) >= self.max_pending:
+                self.metrics.count('rejected_requests')
+                raise HttpError(503, f'{len(self.jobs)} jobs pending; retry later', {'Retry-After': '1'})
+            job = PackingJob(key, problem, asyncio.get_running_loop().create_future())
+            job.deadline = deadline
+            self.jobs[key] = job
+            self._queue.put_nowait(job)
+
+        job.waiters += 1
+        try:
+            # Shielded: one waiter timing out must not cancel the job for the others
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        except asyncio.TimeoutError:
+            self.metrics.count('deadline_exceeded')
+            raise HttpError(504, f'deadline of {timeout}s passed') from None
+        finally:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.started and not job.future.done():
+                job.future.cancel()
+                self.metrics.count('cancelled_jobs')
+                if self.jobs.get(key) is job:
+                    del self.jobs[key]
+
+    def get_health(self) -> Dict[str, Any]:
+        """
+        Get the server status.
+
+        Returns:
+            Dict[str, Any]: Worker count and queued/running job counts
+        """
+        return {
+            'status': 'ok',
+            'workers': self.max_workers,
+            'running': self.running,
+            'queued': len(self.jobs) - self.running,
+            'max_pending': self.max_pending,
+        }
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, bytes, str]:
+        """Handle one request; returns (status, body, content type)."""
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            if method != 'GET':
+                raise HttpError(405, 'use GET')
+            return 200, json.dumps(self.get_health()).encode('utf-8'), 'application/json'
+        if path == '/metrics':
+            if method != 'GET':
+                raise HttpError(405, 'use GET')
+            return 200, self.metrics.to_prometheus('space2_server').encode('utf-8'), 'text/plain; version=0.0.4'
+        if path != '/pack':
+            raise HttpError(404, f'no such endpoint: {path}')
+        if method != 'POST':
+            raise HttpError(405, 'use POST')
+
+        try:
+            problem = json.loads(body)
+        except ValueError as e:
+            raise HttpError(400, f'invalid JSON: {e}') from None
+        if not isinstance(problem, dict):
+            raise HttpError(400, 'expected a JSON object')
+        record = await self.pack(problem)
+        if record['status'] == 'cancelled':
+            raise HttpError(504, record['error'])
+        if record['status'] != 'ok':
+            status = 400 if record.get('client_error') else 500
+            return status, json.dumps(record).encode('utf-8'), 'application/json'
+        return 200, json.dumps(record).encode('utf-8'), 'application/json'
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one HTTP/1.1 connection (one request; the connection is closed after the response)."""
+        headers: Dict[str, str] = {}
+        try:
+            try:
+                request_line = (await reader.readline()).decode('latin-1').split()
+                if len(request_line) != 3:
+                    raise HttpError(400, 'malformed request line')
+                method, path, _ = request_line
+                while True:
+                    line = (await reader.readline()).decode('latin-1').strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', '0') or 0)
+                if length > self.max_body_bytes:
+                    raise HttpError(413, f'request body over {self.max_body_bytes} bytes')
+                body = await reader.readexactly(length) if length else b''
+                status, payload, content_type = await self._route(method, path, body)
+                response_headers: Dict[str, str] = {}
+            except HttpError as e:
+                status, content_type, response_headers = e.status, 'application/json', e.headers
+                payload = json.dumps({'status': 'error', 'error': str(e)}).encode('utf-8')
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                status, content_type, response_headers = 400, 'application/json', {}
+                payload = json.dumps({'status': 'error', 'error': f'malformed request: {e}'}).encode('utf-8')
+
+            head = [f'HTTP/1.1 {status} {HTTP_REASONS.get(status, "")}',
+                    f'Content-Type: {content_type}',
+                    f'Content-Length: {len(payload)}',
+                    'Connection: close']
+            head.extend(f'{name}: {value}' for name, value in response_headers.items())
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+            await writer.drain()
+        except ConnectionError:
+            # The client went away; nothing left to answer
+            pass
+        except Exception:
+            logger.exception('Unhandled error while serving a request')
+        finally:
+            writer.close()
+
+
+def load_problem(
+    bins_file: ManifestSource = 'Bins.tsv',
+    container_file: ManifestSource = 'Container.tsv',
+    **options: Any
+) -> Dict[str, Any]:
+    """
+    Build a /pack request body from manifest files.
+
+    Args:
+        bins_file: Bins manifest
+        container_file: Container manifest (its first row is used)
+        options: Extra request fields (engine, include_positions, deadline)
+
+    Returns:
+        Dict[str, Any]: Request body
+    """
+    container = next((dict(row) for row, _, _ in iter_rows(container_file)), None)
+    if container is None:
+        raise ValueError(f'No container rows in {container_file}')
+    return {'container': container, 'bins': [dict(row) for row, _, _ in iter_rows(bins_file)], **options}
+
+
+def request_packing(
+    problem: Dict[str, Any],
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    timeout: Optional[float] = None
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Send a problem to a running packing server (a minimal local client).
+
+    Args:
+        problem: Request body (see load_problem)
+        host: Server host
+        port: Server port
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: (HTTP status, response body)
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        connection.request('POST', '/pack', body=json.dumps(problem), headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
@@ -0,0 +1,294 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from models.container import Container
+from models.item_table import ItemList
+from utils.metrics import Metrics
+
+# Tolerance for matching touching box faces and for overlaps and bounds
+CONTACT_EPSILON = 1e-6
+
+# Default share of a box's base that must rest on the floor or on boxes below
+DEFAULT_MIN_SUPPORT = 0.5
+
+# Candidate pairs expanded at once by the overlap broadphase (bounds memory use)
+SWEEP_CHUNK = 1 << 21
+
+# Most strips the overlap broadphase cuts the boxes into (bounds the copies of a long box)
+MAX_STRIPS = 4096
+
+# Problems listed by name in a validation summary, per kind
+SUMMARY_EXAMPLES = 10
+
+
+def get_contact_pairs(lo: np.ndarray, hi: np.ndarray, axis: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find pairs of boxes where the upper face of one touches the lower face of another.
+
+    Sort and sweep: lower faces are sorted by plane and by their start along
+    the longer of the two other axes, so each upper face only looks at the
+    window of lower faces in its plane that can reach it.
+
+    Args:
+        lo: (n, 3) lower corners
+        hi: (n, 3) upper corners
+        axis: Axis the faces are perpendicular to
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (box below, box above, contact area) per pair
+    """
+    others = [a for a in range(3) if a != axis]
+    extent = hi.max(axis=0) - lo.min(axis=0)
+    u, v = sorted(others, key=lambda a: -extent[a])
+    planes, plane_ids = np.unique(
+        np.round(np.concatenate([lo[:, axis], hi[:, axis]]) / CONTACT_EPSILON).astype(np.int64),
+        return_inverse=True
+    )
+    plane_ids = plane_ids.reshape(-1)
+    lower_plane, upper_plane = plane_ids[:len(lo)], plane_ids[len(lo):]
+
+    # One sort key per lower face: its plane, then its start along u
+    origin = lo[:, u].min()
+    span = extent[u] + 1.0
+    keys = lower_plane * span + (lo[:, u] - origin)
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    longest = (hi[:, u] - lo[:, u]).max()
+    # Clamped below the plane's first key (not to it) so faces starting at the origin aren't skipped
+    start = np.searchsorted(
+        keys, upper_plane * span + np.maximum(lo[:, u] - longest - origin, -0.5), side='right'
+    )
+    end = np.searchsorted(keys, upper_plane * span + (hi[:, u] - origin), side='left')
+    counts = np.maximum(end - start, 0)
+
+    # Expand the ragged windows into (upper face box, lower face box) candidates
+    below = np.repeat(np.arange(len(lo)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    above = order[np.repeat(start, counts) + offsets]
+    overlap_u = np.minimum(hi[below, u], hi[above, u]) - np.maximum(lo[below, u], lo[above, u])
+    overlap_v = np.minimum(hi[below, v], hi[above, v]) - np.maximum(lo[below, v], lo[above, v])
+    touching = (overlap_u > CONTACT_EPSILON) & (overlap_v > CONTACT_EPSILON) & (below != above)
+    return below[touching], above[touching], (overlap_u * overlap_v)[touching]
+
+
+def get_overlapping_pairs(lo: np.ndarray, hi: np.ndarray, metrics: Optional[Metrics] = None) -> np.ndarray:
+    """
+    Find pairs of boxes whose interiors intersect.
+
+    Sort and sweep in strips: the boxes are cut into strips along the second
+    most crowded axis (a box is copied into every strip it crosses), then
+    each strip is swept along the most crowded axis, so a box is only tested
+    against the boxes of its strips that start before it ends. A pair is
+    kept in the one strip holding the start of its overlap, so it's reported
+    once. Boxes that merely touch don't overlap.
+
+    Args:
+        lo: (n, 3) lower corners
+        hi: (n, 3) upper corners
+        metrics: Optional metrics to count the candidate pairs into
+
+    Returns:
+        np.ndarray: (k, 2) box indices per overlapping pair, lower index first
+    """
+    n = len(lo)
+    if n < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    origin = lo.min(axis=0)
+    extent = hi.max(axis=0) - origin
+    typical = np.maximum(np.median(hi - lo, axis=0), CONTACT_EPSILON)
+    sweep, across = np.argsort(-extent / typical)[:2].tolist()
+
+    # Strips along the second axis, at most MAX_STRIPS of them
+    cell = max(typical[across], extent[across] / MAX_STRIPS)
+    first_strip = np.floor((lo[:, across] - origin[across]) / cell).astype(np.int64)
+    last_strip = np.maximum(
+        np.floor((hi[:, across] - CONTACT_EPSILON - origin[across]) / cell).astype(np.int64), first_strip
+    )
+    copies = last_strip - first_strip + 1
+    boxes = np.repeat(np.arange(n), copies)
+    strips = first_strip[boxes] + np.arange(len(boxes)) - np.repeat(np.cumsum(copies) - copies, copies)
+
+    # One sort key per copy: its strip, then its start along the sweep axis
+    span = extent[sweep] + 1.0
+    keys = strips * span + (lo[boxes, sweep] - origin[sweep])
+    order = np.argsort(keys, kind='stable')
+    keys, boxes, strips = keys[order], boxes[order], strips[order]
+    # Sweep window of each copy: the copies after it in its strip that start before it ends
+    end = np.searchsorted(keys, strips * span + (hi[boxes, sweep] - CONTACT_EPSILON - origin[sweep]), side='left')
+    counts = np.maximum(end - np.arange(1, len(keys) + 1), 0)
+    total = np.cumsum(counts)
+
+    pairs: List[np.ndarray] = []
+    first = 0
+    while first < len(keys):
+        done = total[first - 1] if first else 0
+        last = max(int(np.searchsorted(total, done + SWEEP_CHUNK, side='right')), first + 1)
+        chunk = counts[first:last]
+        a = np.repeat(np.arange(first, last), chunk)
+        b = a + 1 + np.arange(chunk.sum()) - np.repeat(np.cumsum(chunk) - chunk, chunk)
+        strip = strips[a]
+        a, b = boxes[a], boxes[b]
+        overlap = np.minimum(hi[a], hi[b]) - np.maximum(lo[a], lo[b])
+        start = np.floor((np.maximum(lo[a, across], lo[b, across]) - origin[across]) / cell).astype(np.int64)
+        hit = np.all(overlap > CONTACT_EPSILON, axis=1) & (start == strip)
+        pairs.append(np.column_stack([np.minimum(a[hit], b[hit]), np.maximum(a[hit], b[hit])]))
+        first = last
+    if metrics is not None:
+        metrics.count('overlap_candidates', int(total[-1]))
+    result = np.concatenate(pairs)
+    return result[np.lexsort((result[:, 1], result[:, 0]))]
+
+
+def get_support(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Get the share of each box's base resting on the floor or on the tops of boxes below.
+
+    Args:
+        lo: (n, 3) lower corners
+        hi: (n, 3) upper corners
+
+    Returns:
+        np.ndarray: (n,) supported share of the base, from 0 to 1
+    """
+    supported = np.zeros(len(lo), dtype=np.float64)
+    if len(lo):
+        below, above, area = get_contact_pairs(lo, hi, 2)
+        np.add.at(supported, above, area)
+    base = (hi[:, 0] - lo[:, 0]) * (hi[:, 1] - lo[:, 1])
+    support = np.minimum(supported / np.maximum(base, CONTACT_EPSILON), 1.0)
+    support[lo[:, 2] <= CONTACT_EPSILON] = 1.0
+    return support
+
+
+class ValidationReport:
+    """
+    Physical validity of a packed container: overlaps, bounds and support.
+
+    Indices refer to positions in container.items.
+    """
+    def __init__(
+        self,
+        container: Container,
+        overlaps: np.ndarray,
+        out_of_bounds: np.ndarray,
+        support: np.ndarray,
+        min_support: float
+    ):
+        self.container = container
+        # (k, 2) pairs of boxes whose interiors intersect
+        self.overlaps = overlaps
+        # Boxes sticking out of the container
+        self.out_of_bounds = out_of_bounds
+        # Supported share of each box's base
+        self.support = support
+        self.min_support = min_support
+        # Boxes resting on less than min_support of their base
+        self.unsupported = np.flatnonzero(support < min_support - CONTACT_EPSILON)
+
+    @property
+    def valid(self) -> bool:
+        """Whether the packing has no overlaps, out-of-bounds or unsupported boxes."""
+        return not (len(self.overlaps) or len(self.out_of_bounds) or len(self.unsupported))
+
+    def get_names(self, indices: np.ndarray) -> List[str]:
+        """
+        Get the names of boxes by their position in container.items.
+
+        Args:
+            indices: Positions in container.items
+
+        Returns:
+            List[str]: Names
+        """
+        return [self.container.items[int(index)].name for index in indices]
+
+    def to_record(self) -> Dict[str, Any]:
+        """
+        Describe the validation as a JSON-serializable record.
+
+        Returns:
+            Dict[str, Any]: Validity, problem counts and the lowest support
+        """
+        return {
+            'valid': self.valid,
+            'overlapping_pairs': len(self.overlaps),
+            'out_of_bounds': len(self.out_of_bounds),
+            'unsupported': len(self.unsupported),
+            'min_support': round(float(self.support.min()), 6) if len(self.support) else 1.0,
+        }
+
+    def get_summary(self) -> str:
+        """
+        Get a summary of the validation, naming the first problems of each kind.
+
+        Returns:
+            str: Problem counts and examples
+        """
+        lines = [
+            "\nValidation:",
+            f"Overlapping pairs: {len(self.overlaps)}",
+            f"Out of bounds: {len(self.out_of_bounds)} bins",
+            f"Unsupported (less than {self.min_support:.0%} of base supported): {len(self.unsupported)} bins",
+            f"Result: {'valid' if self.valid else 'INVALID'}"
+        ]
+        for first, second in self.overlaps[:SUMMARY_EXAMPLES].tolist():
+            lines.append(f"Overlap: {' and '.join(self.get_names(np.array([first, second])))}")
+        for name in self.get_names(self.out_of_bounds[:SUMMARY_EXAMPLES]):
+            lines.append(f"Out of bounds: {name}")
+        unsupported = self.unsupported[:SUMMARY_EXAMPLES]
+        for name, support in zip(self.get_names(unsupported), self.support[unsupported].tolist()):
+            lines.append(f"Unsupported: {name} ({support:.0%} of base supported)")
+        return "\n".join(lines)
+
+
+def get_boxes(container: Container) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the lower and upper corners of a container's packed boxes.
+
+    Args:
+        container: Packed container
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n, 3) lower and upper corners, in container.items order
+    """
+    if isinstance(container.items, ItemList):
+        lo = container.table.position[container.items.indices]
+        return lo, lo + container.table.size[container.items.indices]
+    lo = np.array([list(item.position) for item in container.items], dtype=np.float64).reshape(-1, 3)
+    sizes = np.array([item.get_size() for item in container.items], dtype=np.float64).reshape(-1, 3)
+    return lo, lo + sizes
+
+
+def validate_container(
+    container: Container,
+    min_support: float = DEFAULT_MIN_SUPPORT,
+    metrics: Optional[Metrics] = None
+) -> ValidationReport:
+    """
+    Check that a packed container is physically valid.
+
+    Boxes must not overlap, must stay inside the container and must rest on
+    at least min_support of their base (on the floor or on boxes below).
+
+    Args:
+        container: Packed container
+        min_support: Required supported share of each box's base (0 to 1)
+        metrics: Optional metrics to record the validation phase and counters into
+
+    Returns:
+        ValidationReport: Problems found
+    """
+    if not 0 <= min_support <= 1:
+        raise ValueError(f"min_support must be between 0 and 1, got {min_support}")
+    metrics = metrics or Metrics()
+    lo, hi = get_boxes(container)
+    with metrics.phase('validate', len(lo)):
+        limits = np.array([container.width, container.height, container.depth], dtype=np.float64)
+        out_of_bounds = np.flatnonzero(
+            np.any(lo < -CONTACT_EPSILON, axis=1) | np.any(hi > limits + CONTACT_EPSILON, axis=1)
+        )
+        overlaps = get_overlapping_pairs(lo, hi, metrics)
+        report = ValidationReport(container, overlaps, out_of_bounds, get_support(lo, hi), min_support)
+    metrics.count('overlapping_pairs', len(report.overlaps))
+    metrics.count('out_of_bounds_items', len(report.out_of_bounds))
+    metrics.count('unsupported_items', len(report.unsupported))
+    return report
@@ -0,0 +1,13 @@
+# Visualization options that entry points need before deciding whether to
+# render, kept free of PyVista so headless packing runs never import it
+
+DEFAULT_CAMERA_POSITION = [(300, 300, 300), (0, 0, 0), (0, 0, 1)]
+
+# Camera angles for exported images, mapped to the plotter method that sets them
+CAMERA_VIEWS = {
+    'iso': 'view_isometric',
+    'top': 'view_xy',
+    'front': 'view_xz',
+    'side': 'view_yz',
+}
+EXPORT_FORMATS = ('png', 'gltf', 'vtp')
@@ -1,21 +1,210 @@
-from typing import Optional, Tuple
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
 import pyvista as pv
 from models.container import Container
 from models.bin import PackingBin
+from models.item_table import ItemList
+from services.validation_service import CONTACT_EPSILON, get_contact_pairs
+from services.visualization_options import CAMERA_VIEWS, DEFAULT_CAMERA_POSITION, EXPORT_FORMATS
 from utils.logger import setup_logger
 from utils.file_loader import get_bin_colors
+from utils.metrics import Metrics
 
 logger = setup_logger(__name__)
 
+# Corner offsets of a unit box (as fractions of its size) and its six quad faces
+BOX_CORNERS = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=np.float64)
+BOX_FACES = np.array([
+    [0, 3, 2, 1],  # bottom
+    [4, 5, 6, 7],  # top
+    [0, 1, 5, 4],  # front
+    [2, 3, 7, 6],  # back
+    [0, 4, 7, 3],  # left
+    [1, 2, 6, 5],  # right
+], dtype=np.int64)
+
+# Keys toggling the visibility of bin types in level-of-detail mode ('0' shows every type)
+TYPE_TOGGLE_KEYS = '123456789'
+
+
+def find_hidden_boxes(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Flag boxes whose six faces are all covered by touching neighbors.
+
+    Packed boxes don't overlap, so the contact areas on one face never
+    overlap either and a face is covered when they add up to its area.
+    Such boxes can't be seen from anywhere while their neighbors are drawn opaque.
+
+    Args:
+        lo: (n, 3) lower corners
+        hi: (n, 3) upper corners
+
+    Returns:
+        np.ndarray: (n,) hidden flags
+    """
+    size = hi - lo
+    covered = np.zeros((len(lo), 6), dtype=np.float64)
+    face_area = np.zeros((len(lo), 6), dtype=np.float64)
+    for axis in range(3):
+        others = [a for a in range(3) if a != axis]
+        face_area[:, 2 * axis] = face_area[:, 2 * axis + 1] = size[:, others[0]] * size[:, others[1]]
+        below, above, area = get_contact_pairs(lo, hi, axis)
+        np.add.at(covered[:, 2 * axis + 1], below, area)
+        np.add.at(covered[:, 2 * axis], above, area)
+    return np.all(covered >= face_area * (1 - CONTACT_EPSILON), axis=1)
+
+
+class BoxLayers:
+    """
+    Level-of-detail geometry of fitted boxes: one mesh per bin type.
+
+    Each mesh instances a unit cube, scaled per box by a glyph filter, and
+    leaves out boxes hidden by their neighbors. Types can be hidden; the
+    meshes are then updated in place (so every plotter showing them follows)
+    and boxes that become visible through the gap are drawn again.
+    """
+    def __init__(self, positions: np.ndarray, sizes: np.ndarray, type_ids: np.ndarray, type_names: Sequence[str]):
+        """
+        Args:
+            positions: (n, 3) lower corners
+            sizes: (n, 3) box sizes
+            type_ids: (n,) index into type_names per box
+            type_names: Bin type names
+        """
+        self.lo = np.asarray(positions, dtype=np.float64)
+        self.hi = self.lo + sizes
+        self.type_ids = np.asarray(type_ids, dtype=np.int64)
+        self.type_names = list(type_names)
+        self.visible = np.ones(len(self.type_names), dtype=bool)
+        self.meshes = [pv.PolyData() for _ in self.type_names]
+        self.drawn = 0
+        self.update()
+
+    @staticmethod
+    def create_mesh(lo: np.ndarray, hi: np.ndarray) -> pv.PolyData:
+        """Instance a unit cube at each lower corner, scaled to the box size."""
+        if len(lo) == 0:
+            return pv.PolyData()
+        cloud = pv.PolyData(lo)
+        cloud.point_data['sizes'] = hi - lo
+        return cloud.glyph(orient=False, scale='sizes', factor=1.0, geom=pv.Box(bounds=(0, 1, 0, 1, 0, 1)))
+
+    def update(self) -> None:
+        """Re-cull the boxes of the visible types and rebuild the meshes in place."""
+        shown = np.flatnonzero(self.visible[self.type_ids])
+        shown = shown[~find_hidden_boxes(self.lo[shown], self.hi[shown])]
+        self.drawn = len(shown)
+        for type_id, mesh in enumerate(self.meshes):
+            rows = shown[self.type_ids[shown] == type_id]
+            mesh.copy_from(self.create_mesh(self.lo[rows], self.hi[rows]))
+
+    def toggle(self, type_id: int) -> None:
+        """
+        Show or hide the boxes of one bin type.
+
+        Args:
+            type_id: Index into type_names
+        """
+        if type_id < len(self.visible):
+            self.visible[type_id] = not self.visible[type_id]
+            self.update()
+
+    def show_all(self) -> None:
+        """Show the boxes of every bin type."""
+        self.visible[:] = True
+        self.update()
+
+class PackingScene:
+    """
+    Render-target independent geometry of a packed container.
+    
+    Meshes are built once and recorded with their display options; attach()
+    adds the same meshes to any number of plotters (off-screen screenshot,
+    interactive window, exporters) without rebuilding them.
+    """
+    def __init__(self, name: str = ''):
+        self.name = name
+        self.layers: List[Tuple[pv.DataSet, Dict[str, Any]]] = []
+        # Per-type fitted box meshes in level-of-detail mode
+        self.box_layers: Optional[BoxLayers] = None
+
+    def get_file_stem(self) -> str:
+        """Get a file-system safe base name for exported files."""
+        return re.sub(r'[^\w.-]+', '_', self.name).strip('_') or 'container'
+
+    def add_mesh(self, mesh: pv.DataSet, **kwargs: Any) -> None:
+        """
+        Record a mesh and its plotter.add_mesh options.
+        
+        Args:
+            mesh: Mesh to display
+            **kwargs: Options passed to plotter.add_mesh
+        """
+        self.layers.append((mesh, kwargs))
+
+    def attach(self, plotter: pv.Plotter, show_grid: bool = True) -> pv.Plotter:
+        """
+        Add the scene's meshes to a plotter.
+        
+        Args:
+            plotter: Target plotter
+            show_grid: Whether to show the axes grid
+            
+        Returns:
+            pv.Plotter: The same plotter
+        """
+        for mesh, kwargs in self.layers:
+            plotter.add_mesh(mesh, **kwargs)
+        if show_grid:
+            plotter.show_grid()
+        return plotter
+
 class VisualizationService:
     """
     Service for handling 3D visualization of packed containers.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        merged: bool = True,
+        bins_file: Optional[str] = 'Bins.tsv',
+        metrics: Optional[Metrics] = None,
+        lod: bool = False
+    ):
+        """
+        Args:
+            merged: Draw all fitted (and all unfitted) items as one mesh each
+                instead of one actor per item
+            bins_file: Bins.tsv to read the bin colors from (None: no colors until load_colors)
+            metrics: Optional metrics to record rendering phases into
+            lod: Level-of-detail mode for large loads: fitted items are opaque
+                instanced cubes without edges, one mesh per bin type, boxes hidden
+                by their neighbors are left out, and number keys toggle bin types
+        """
+        self.lod = lod
+        self.metrics = metrics or Metrics()
         # Configure PyVista theme
         pv.global_theme.background = 'white'
         pv.global_theme.window_size = [1024, 768]
-        self.colors = get_bin_colors()
+        # Level-of-detail meshes of hidden bin types are empty
+        pv.global_theme.allow_empty_mesh = True
+        self.merged = merged
+        self._offscreen_plotter: Optional[pv.Plotter] = None
+        self.load_colors(bins_file)
+
+    def load_colors(self, bins_file: Optional[str] = 'Bins.tsv') -> None:
+        """
+        Load the bin colors used for rendering.
+        
+        Args:
+            bins_file: Bins.tsv to read the bin colors from (None: every bin is black)
+        """
+        self.colors = get_bin_colors(bins_file) if bins_file is not None else {}
+        self._rgb_cache: Dict[str, np.ndarray] = {}
 
     @staticmethod
     def create_box(width: float, height: float, depth: float, position: Tuple[float, float, float]) -> pv.Box:
@@ -37,6 +226,117 @@ class VisualizationService:
             position[2], position[2] + depth      # z bounds (up)
         ))
 
+    @staticmethod
+    def create_boxes_mesh(positions: np.ndarray, sizes: np.ndarray) -> pv.PolyData:
+        """
+        Create a single mesh holding many boxes, built with NumPy.
+        
+        Args:
+            positions: (n, 3) lower corners
+            sizes: (n, 3) box dimensions
+            
+        Returns:
+            pv.PolyData: Mesh with 8 points and 6 quad cells per box
+        """
+        count = len(positions)
+        points = positions[:, None, :] + BOX_CORNERS[None, :, :] * sizes[:, None, :]
+        corners = BOX_FACES[None, :, :] + 8 * np.arange(count)[:, None, None]
+        faces = np.concatenate([np.full((count, 6, 1), 4, dtype=np.int64), corners], axis=2)
+        return pv.PolyData(points.reshape(-1, 3), faces.ravel())
+
+    def get_rgb(self, bin_type: str) -> np.ndarray:
+        """
+        Get the RGB color (0-255) of a bin type.
+        
+        Args:
+            bin_type: Bin type
+            
+        Returns:
+            np.ndarray: RGB color
+        """
+        if bin_type not in self._rgb_cache:
+            self._rgb_cache[bin_type] = np.array(pv.Color(self.colors.get(bin_type, 'black')).int_rgb, dtype=np.uint8)
+        return self._rgb_cache[bin_type]
+
+    def get_item_arrays(self, items: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get positions, sizes and RGB colors of items as arrays.
+        
+        Args:
+            items: Container items (ItemList or PackingBin list)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: (n, 3) positions, (n, 3) sizes, (n, 3) colors
+        """
+        if isinstance(items, ItemList):
+            table = items.table
+            palette = np.array([self.get_rgb(name) for name in table.type_names], dtype=np.uint8).reshape(-1, 3)
+            return (
+                table.position[items.indices],
+                table.size[items.indices],
+                palette[table.type_id[items.indices]]
+            )
+        positions = np.array([list(item.position) for item in items], dtype=np.float64).reshape(-1, 3)
+        sizes = np.array([item.get_size() for item in items], dtype=np.float64).reshape(-1, 3)
+        colors = np.array([self.get_rgb(item.bin_type) for item in items], dtype=np.uint8).reshape(-1, 3)
+        return positions, sizes, colors
+
+    @staticmethod
+    def get_item_types(items: Sequence) -> Tuple[np.ndarray, List[str]]:
+        """
+        Get the bin type of every item.
+        
+        Args:
+            items: Container items (ItemList or PackingBin list)
+            
+        Returns:
+            Tuple[np.ndarray, List[str]]: (n,) type id per item, type names
+        """
+        if isinstance(items, ItemList):
+            return items.table.type_id[items.indices], list(items.table.type_names)
+        type_ids: Dict[str, int] = {}
+        ids = [type_ids.setdefault(item.bin_type, len(type_ids)) for item in items]
+        return np.array(ids, dtype=np.int64), list(type_ids)
+
+    def create_items_mesh(self, positions: np.ndarray, sizes: np.ndarray, colors: np.ndarray) -> pv.PolyData:
+        """
+        Create one mesh for many items, with per-cell RGB colors.
+        
+        Args:
+            positions: (n, 3) lower corners
+            sizes: (n, 3) box dimensions
+            colors: (n, 3) RGB colors
+            
+        Returns:
+            pv.PolyData: Merged mesh with a 'colors' cell array
+        """
+        mesh = self.create_boxes_mesh(positions, sizes)
+        mesh.cell_data['colors'] = np.repeat(colors, len(BOX_FACES), axis=0)
+        return mesh
+
+    @staticmethod
+    def get_unfitted_positions(container: Container, count: int) -> np.ndarray:
+        """
+        Get grid layout positions for unfitted items, next to the container.
+        
+        Args:
+            container: Container being visualized
+            count: Number of unfitted items
+            
+        Returns:
+            np.ndarray: (count, 3) positions
+        """
+        grid_size = 5  # Items per row
+        spacing = 50   # Space between items
+        start_x = container.width + spacing
+        
+        index = np.arange(count)
+        return np.column_stack([
+            start_x + (index % grid_size) * spacing,
+            (index // grid_size) * spacing,
+            np.zeros(count)
+        ]).astype(np.float64)
+
     def setup_plotter(self) -> pv.Plotter:
         """
         Create and configure a PyVista plotter.
@@ -48,7 +348,7 @@ class VisualizationService:
         plotter.enable_trackball_style()
         
         # Set initial camera orientation
-        plotter.camera_position = [(300, 300, 300), (0, 0, 0), (0, 0, 1)]
+        plotter.camera_position = DEFAULT_CAMERA_POSITION
         
         # Add camera orientation widget and reset camera button
         plotter.add_camera_orientation_widget()
@@ -56,19 +356,19 @@ class VisualizationService:
         
         # Add reset camera handlers
         def reset_view(p):
-            p.camera_position = [(300, 300, 300), (0, 0, 0), (0, 0, 1)]
+            p.camera_position = DEFAULT_CAMERA_POSITION
         
         plotter.add_key_event('r', lambda: reset_view(plotter))
         plotter.add_key_event('R', lambda: reset_view(plotter))
         
         return plotter
 
-    def add_container(self, plotter: pv.Plotter, container: Container) -> None:
+    def add_container(self, plotter: Union[pv.Plotter, PackingScene], container: Container) -> None:
         """
         Add container wireframe to the plot.
         
         Args:
-            plotter: PyVista plotter instance
+            plotter: PyVista plotter instance or scene
             container: Container to visualize
         """
         container_box = self.create_box(
@@ -77,23 +377,29 @@ class VisualizationService:
             container.depth,
             (0, 0, 0)
         )
-        plotter.add_mesh(container_box, color='green', opacity=0.2)
+        plotter.add_mesh(container_box, color='green', opacity=0.2, name='container')
 
-    def add_fitted_items(self, plotter: pv.Plotter, container: Container) -> None:
+    def add_fitted_items(self, plotter: Union[pv.Plotter, PackingScene], container: Container) -> None:
         """
         Add fitted items to the plot.
         
         Args:
-            plotter: PyVista plotter instance
+            plotter: PyVista plotter instance or scene
             container: Container with fitted items
         """
+        if self.lod:
+            self.add_lod_items(plotter, container)
+            return
+        
+        if self.merged:
+            if not len(container.items):
+                return
+            mesh = self.create_items_mesh(*self.get_item_arrays(container.items))
+            plotter.add_mesh(mesh, scalars='colors', rgb=True, opacity=0.7, show_edges=True, name='fitted')
+            return
+        
         for item in container.items:
-            box = self.create_box(
-                item.width,
-                item.height,
-                item.depth,
-                item.position
-            )
+            box = self.create_box(*item.get_size(), item.position)
             plotter.add_mesh(
                 box,
                 color=self.colors.get(item.bin_type, 'black'),
@@ -101,16 +407,68 @@ class VisualizationService:
                 show_edges=True
             )
 
-    def add_unfitted_items(self, plotter: pv.Plotter, container: Container) -> None:
+    def add_lod_items(self, plotter: Union[pv.Plotter, PackingScene], container: Container) -> None:
+        """
+        Add fitted items as level-of-detail per-type meshes.
+        
+        Args:
+            plotter: PyVista plotter instance or scene
+            container: Container with fitted items
+        """
+        positions, sizes, _ = self.get_item_arrays(container.items)
+        type_ids, type_names = self.get_item_types(container.items)
+        with self.metrics.phase('cull_hidden', len(positions)):
+            box_layers = BoxLayers(positions, sizes, type_ids, type_names)
+        self.metrics.count('culled_items', len(positions) - box_layers.drawn)
+        for name, mesh in zip(type_names, box_layers.meshes):
+            plotter.add_mesh(mesh, color=self.colors.get(name, 'black'), name=f'fitted_{name}')
+        if isinstance(plotter, PackingScene):
+            plotter.box_layers = box_layers
+
+    def add_type_toggles(self, plotter: pv.Plotter, scene: PackingScene) -> None:
+        """
+        Bind number keys to the visibility of bin types (level-of-detail scenes only).
+        
+        Args:
+            plotter: Interactive plotter showing the scene
+            scene: Scene built in level-of-detail mode
+        """
+        box_layers = scene.box_layers
+        if box_layers is None:
+            return
+        
+        def toggle(type_id: int) -> None:
+            box_layers.toggle(type_id)
+            plotter.render()
+        
+        def show_all() -> None:
+            box_layers.show_all()
+            plotter.render()
+        
+        legend = []
+        for type_id, (key, name) in enumerate(zip(TYPE_TOGGLE_KEYS, box_layers.type_names)):
+            plotter.add_key_event(key, lambda type_id=type_id: toggle(type_id))
+            legend.append(f'{key}: {name}')
+        plotter.add_key_event('0', show_all)
+        plotter.add_text('Toggle types - ' + ', '.join(legend) + ', 0: all', position='lower_left', font_size=10)
+
+    def add_unfitted_items(self, plotter: Union[pv.Plotter, PackingScene], container: Container) -> None:
         """
         Add unfitted items to the plot in a grid layout.
         
         Args:
-            plotter: PyVista plotter instance
+            plotter: PyVista plotter instance or scene
             container: Container with unfitted items
         """
         if not container.unfitted_items:
             return
+        
+        if self.merged:
+            _, sizes, colors = self.get_item_arrays(container.unfitted_items)
+            positions = self.get_unfitted_positions(container, len(sizes))
+            mesh = self.create_items_mesh(positions, sizes, colors)
+            plotter.add_mesh(mesh, scalars='colors', rgb=True, opacity=0.4, style='wireframe', name='unfitted')
+            return
             
         grid_size = 5  # Items per row
         spacing = 50   # Space between items
@@ -140,6 +498,23 @@ class VisualizationService:
                 style='wireframe'
             )
 
+    def build_scene(self, container: Container) -> PackingScene:
+        """
+        Build the geometry of a packed container once.
+        
+        Args:
+            container: Container to visualize
+            
+        Returns:
+            PackingScene: Scene that can be attached to several plotters
+        """
+        scene = PackingScene(container.name)
+        with self.metrics.phase('build_scene', len(container.items) + len(container.unfitted_items)):
+            self.add_container(scene, container)
+            self.add_fitted_items(scene, container)
+            self.add_unfitted_items(scene, container)
+        return scene
+
     def visualize_packing(self, container: Container, plotter: Optional[pv.Plotter] = None) -> pv.Plotter:
         """
         Create 3D visualization of packed container.
@@ -153,30 +528,139 @@ class VisualizationService:
         """
         if plotter is None:
             plotter = self.setup_plotter()
+        scene = self.build_scene(container)
+        scene.attach(plotter)
+        self.add_type_toggles(plotter, scene)
+        return plotter
+
+    def save_screenshot(self, scene: PackingScene, filename: str = 'packing_visualization.png') -> None:
+        """
+        Render a scene off-screen to an image file.
         
-        self.add_container(plotter, container)
-        self.add_fitted_items(plotter, container)
-        self.add_unfitted_items(plotter, container)
+        Only an off-screen render window is created, so this works without a
+        display and never sets up the interactive window or its widgets.
         
-        plotter.show_grid()
-        return plotter
+        Args:
+            scene: Scene to render
+            filename: Output image path
+        """
+        with self.metrics.phase('screenshot'):
+            plotter = pv.Plotter(off_screen=True)
+            try:
+                scene.attach(plotter)
+                plotter.screenshot(filename)
+            finally:
+                plotter.close()
+        logger.info(f"Visualization saved to '{filename}'")
 
     def show_interactive_plot(self, container: Container) -> None:
         """
         Show interactive 3D plot and save screenshot.
         
+        The scene is built once and shared by the screenshot and the window.
+        
         Args:
             container: Container to visualize
         """
         try:
-            # Create off-screen plotter for screenshot
-            plotter = pv.Plotter(off_screen=True)
-            plotter = self.visualize_packing(container, plotter)
-            plotter.screenshot('packing_visualization.png')
-            logger.info("Visualization saved to 'packing_visualization.png'")
+            scene = self.build_scene(container)
+            self.save_screenshot(scene, 'packing_visualization.png')
             
-            # Create new plotter for interactive display
-            plotter = self.visualize_packing(container)
+            plotter = scene.attach(self.setup_plotter())
+            self.add_type_toggles(plotter, scene)
             plotter.show()
         except Exception as e:
             logger.error(f"Error showing plot: {e}")
+
+    def get_offscreen_plotter(self) -> pv.Plotter:
+        """
+        Get this service's off-screen plotter, reused across exports.
+        
+        Returns:
+            pv.Plotter: Off-screen plotter with no actors
+        """
+        if self._offscreen_plotter is None:
+            self._offscreen_plotter = pv.Plotter(off_screen=True)
+        else:
+            self._offscreen_plotter.clear()
+        return self._offscreen_plotter
+
+    def export_scene(
+        self,
+        scene: PackingScene,
+        output_dir: str,
+        formats: Sequence[str] = EXPORT_FORMATS,
+        views: Sequence[str] = ('iso',)
+    ) -> List[str]:
+        """
+        Write a scene to files without a display.
+        
+        Each file is written as soon as it is rendered: one PNG per camera
+        view, a glTF of the whole scene and one VTP per scene layer.
+        
+        Args:
+            scene: Scene to export
+            output_dir: Directory for the files (created if needed)
+            formats: Any of 'png', 'gltf' and 'vtp'
+            views: Camera views for PNGs (keys of CAMERA_VIEWS)
+            
+        Returns:
+            List[str]: Paths of the written files
+        """
+        unknown = [f for f in formats if f not in EXPORT_FORMATS] + [v for v in views if v not in CAMERA_VIEWS]
+        if unknown:
+            raise ValueError(
+                f"Unknown export format or view: {', '.join(unknown)} "
+                f"(formats: {', '.join(EXPORT_FORMATS)}; views: {', '.join(CAMERA_VIEWS)})"
+            )
+        os.makedirs(output_dir, exist_ok=True)
+        stem = os.path.join(output_dir, scene.get_file_stem())
+        written = []
+        
+        if 'vtp' in formats:
+            with self.metrics.phase('export.vtp', len(scene.layers)):
+                for number, (mesh, kwargs) in enumerate(scene.layers):
+                    path = f"{stem}_{kwargs.get('name', number)}.vtp"
+                    mesh.save(path)
+                    written.append(path)
+        
+        if 'png' in formats or 'gltf' in formats:
+            plotter = self.get_offscreen_plotter()
+            scene.attach(plotter)
+            if 'gltf' in formats:
+                with self.metrics.phase('export.gltf'):
+                    path = f'{stem}.gltf'
+                    plotter.export_gltf(path)
+                    written.append(path)
+            if 'png' in formats:
+                with self.metrics.phase('export.png', len(views)):
+                    for view in views:
+                        getattr(plotter, CAMERA_VIEWS[view])()
+                        path = f'{stem}_{view}.png'
+                        plotter.screenshot(path)
+                        written.append(path)
+            plotter.clear()
+        
+        logger.info(f"Exported {len(written)} files for '{scene.name}' to {output_dir}")
+        return written
+
+    def export_packing(
+        self,
+        container: Container,
+        output_dir: str,
+        formats: Sequence[str] = EXPORT_FORMATS,
+        views: Sequence[str] = ('iso',)
+    ) -> List[str]:
+        """
+        Build a packed container's scene and write it to files without a display.
+        
+        Args:
+            container: Container to export
+            output_dir: Directory for the files (created if needed)
+            formats: Any of 'png', 'gltf' and 'vtp'
+            views: Camera views for PNGs (keys of CAMERA_VIEWS)
+            
+        Returns:
+            List[str]: Paths of the written files
+        """
+        return self.export_scene(self.build_scene(container), output_dir, formats, views)
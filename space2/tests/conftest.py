@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app's packages (models, services, utils) are imported from the project directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
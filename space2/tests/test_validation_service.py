@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from models.container import Container
+from services.packing_engine import ENGINE_NAMES
+from services.packing_service import PackingService
+from services.validation_service import CONTACT_EPSILON, get_overlapping_pairs, get_support, validate_container
+
+
+def random_boxes(rng: np.random.Generator, n: int, span: int = 12) -> tuple:
+    """Random boxes on an integer grid, so many of them touch exactly."""
+    lo = rng.integers(0, span, size=(n, 3)).astype(np.float64)
+    hi = lo + rng.integers(1, 5, size=(n, 3))
+    return lo, hi
+
+
+def brute_force_overlaps(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    pairs = [
+        (a, b)
+        for a in range(len(lo))
+        for b in range(a + 1, len(lo))
+        if np.all(np.minimum(hi[a], hi[b]) - np.maximum(lo[a], lo[b]) > CONTACT_EPSILON)
+    ]
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+def brute_force_support(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    support = np.zeros(len(lo))
+    for above in range(len(lo)):
+        if lo[above, 2] <= CONTACT_EPSILON:
+            support[above] = 1.0
+            continue
+        area = 0.0
+        for below in range(len(lo)):
+            if below != above and abs(hi[below, 2] - lo[above, 2]) <= CONTACT_EPSILON:
+                overlap = np.minimum(hi[below, :2], hi[above, :2]) - np.maximum(lo[below, :2], lo[above, :2])
+                if np.all(overlap > CONTACT_EPSILON):
+                    area += overlap[0] * overlap[1]
+        base = (hi[above, 0] - lo[above, 0]) * (hi[above, 1] - lo[above, 1])
+        support[above] = min(area / base, 1.0)
+    return support
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_overlapping_pairs_match_brute_force(seed):
+    lo, hi = random_boxes(np.random.default_rng(seed), 80)
+    np.testing.assert_array_equal(get_overlapping_pairs(lo, hi), brute_force_overlaps(lo, hi))
+
+
+def test_overlapping_pairs_with_long_boxes():
+    # Boxes crossing many strips are reported once
+    rng = np.random.default_rng(0)
+    lo, hi = random_boxes(rng, 60, span=200)
+    hi[:5, 0] = lo[:5, 0] + 150
+    hi[5:10, 1] = lo[5:10, 1] + 150
+    np.testing.assert_array_equal(get_overlapping_pairs(lo, hi), brute_force_overlaps(lo, hi))
+
+
+def test_touching_boxes_dont_overlap():
+    lo = np.array([[0, 0, 0], [2, 0, 0], [0, 0, 2]], dtype=np.float64)
+    hi = lo + 2
+    assert len(get_overlapping_pairs(lo, hi)) == 0
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_support_matches_brute_force(seed):
+    lo, hi = random_boxes(np.random.default_rng(seed), 80)
+    np.testing.assert_allclose(get_support(lo, hi), brute_force_support(lo, hi))
+
+
+def make_manifest(layered: bool) -> list:
+    rows = [
+        {'Type': 'Crate', 'Width': 12, 'Height': 10, 'Depth': 8, 'Weight': 20, 'Quantity': 6},
+        {'Type': 'Tube', 'Width': 30, 'Height': 6, 'Depth': 6, 'Weight': 5, 'Quantity': 4},
+        {'Type': 'Cube', 'Width': 7.5, 'Height': 7.5, 'Depth': 7.5, 'Weight': 10, 'Quantity': 8},
+    ]
+    if layered:
+        # Enough identical units for whole layers
+        rows.append({'Type': 'Carton', 'Width': 10, 'Height': 10, 'Depth': 10, 'Weight': 8, 'Quantity': 40})
+    return rows
+
+
+@pytest.mark.parametrize('layers', [False, True])
+@pytest.mark.parametrize('engine', ENGINE_NAMES)
+def test_packing_validates(engine, layers):
+    table = PackingService.load_item_table(make_manifest(layers))
+    container = Container('Test', 40, 50, 60, 10000)
+    PackingService(engine, layers=layers).pack_table(container, table)
+
+    assert len(container.items) + len(container.unfitted_items) == len(table)
+    assert len(container.items) > 0
+    if layers:
+        assert container.metrics.counters.get('stacked_layers')
+    report = validate_container(container)
+    assert report.valid, report.get_summary()
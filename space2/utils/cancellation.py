@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Optional
+
+
+class CancellationToken:
+    """
+    Tells a long packing run to stop early.
+
+    A token is cancelled explicitly (cancel(), safe to call from another
+    thread) or when its deadline passes. Packers check it between units and
+    keep what they placed so far. The deadline is in epoch seconds, so a
+    pickled token keeps it in a worker process; a later cancel() in the
+    parent doesn't reach the copy.
+    """
+    def __init__(self, deadline: Optional[float] = None):
+        """
+        Args:
+            deadline: Epoch time (time.time()) after which the token counts as cancelled
+        """
+        self.deadline = deadline
+        self._event = threading.Event()
+
+    @classmethod
+    def with_timeout(cls, seconds: Optional[float]) -> 'CancellationToken':
+        """
+        Create a token that expires after a number of seconds.
+
+        Args:
+            seconds: Time budget (None: no deadline)
+
+        Returns:
+            CancellationToken: New token
+        """
+        return cls(time.time() + seconds if seconds is not None else None)
+
+    def cancel(self) -> None:
+        """Cancel the run."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run was cancelled or its deadline passed."""
+        return self._event.is_set() or (self.deadline is not None and time.time() > self.deadline)
+
+    def __getstate__(self) -> dict:
+        return {'deadline': self.deadline, 'cancelled': self._event.is_set()}
+
+    def __setstate__(self, state: dict) -> None:
+        self.deadline = state['deadline']
+        self._event = threading.Event()
+        if state['cancelled']:
+            self._event.set()
@@ -1,38 +1,106 @@
+import atexit
 import logging
-from typing import Optional
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_LOG_FILE = 'app.log'
+
+# Top-level names of this application's loggers (module loggers are named after
+# their module; entry points run as __main__)
+APP_LOGGERS = ('__main__', '__mp_main__', 'benchmarks', 'models', 'services', 'utils')
+
+# Set by configure_logging: the root logger's queue handler, the handlers it
+# feeds and the thread that writes them
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_file_handlers: List[logging.Handler] = []
 
 def setup_logger(name: Optional[str] = None) -> logging.Logger:
     """
-    Configure and return a logger instance with both file and console handlers.
-    
+    Get a module logger.
+
+    Loggers have no handlers of their own: records propagate to the root
+    logger, which the entry point configures once with configure_logging().
+    Without it (library use) only warnings and errors reach stderr.
+
     Args:
         name: Optional name for the logger. If None, uses root logger.
-        
+
     Returns:
-        logging.Logger: Configured logger instance
+        logging.Logger: Logger instance
+    """
+    return logging.getLogger(name)
+
+def configure_logging(
+    level: int = logging.INFO,
+    log_file: Optional[str] = DEFAULT_LOG_FILE,
+    console_level: int = logging.INFO,
+    app_level: int = logging.DEBUG
+) -> None:
+    """
+    Configure application logging once, at the entry point.
+
+    Console output is written directly. The log file is written by a
+    background thread fed through a queue, so logging never blocks on disk;
+    the queue is flushed at exit. Calling it again does nothing.
+
+    Args:
+        level: Level of the root logger (third-party libraries such as matplotlib)
+        app_level: Level of this application's own loggers (APP_LOGGERS)
+        log_file: Log file (opened on the first record), or None for console only
+        console_level: Level of the console handler
     """
-    logger = logging.getLogger(name)
-    
-    # Only add handlers if they haven't been added yet
-    if not logger.handlers:
-        # Configure logging format
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        
-        # File handler
-        file_handler = logging.FileHandler('app.log')
+    global _queue_handler, _listener, _file_handlers
+    if _queue_handler is not None:
+        return
+    formatter = logging.Formatter(LOG_FORMAT)
+    root = logging.getLogger()
+    root.setLevel(level)
+    for name in APP_LOGGERS:
+        logging.getLogger(name).setLevel(app_level)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(console_level)
+    root.addHandler(console_handler)
+
+    _file_handlers = []
+    if log_file:
+        file_handler = logging.FileHandler(log_file, delay=True)
         file_handler.setFormatter(formatter)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers to logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-        
-        # Set logging level
-        logger.setLevel(logging.DEBUG)
-    
-    return logger
+        _file_handlers.append(file_handler)
+    records: 'queue.Queue[logging.LogRecord]' = queue.Queue()
+    _queue_handler = QueueHandler(records)
+    _listener = QueueListener(records, *_file_handlers, respect_handler_level=True)
+    _listener.start()
+    root.addHandler(_queue_handler)
+    atexit.register(_stop_listener)
+
+def _stop_listener() -> None:
+    """Write out the queued records and stop the file writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _after_fork() -> None:
+    """
+    Write the file directly in forked worker processes.
+
+    The writer thread doesn't survive fork, and pool workers exit without
+    running atexit handlers, so a queue there would only lose records.
+    """
+    global _queue_handler, _listener
+    if _queue_handler is None:
+        return
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    for handler in _file_handlers:
+        root.addHandler(handler)
+    _listener = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,351 @@
+import csv
+import math
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple, TypeVar, Union
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# A manifest source: a file path (.tsv, .csv or .parquet), an open text
+# stream of TSV/CSV, or rows already in memory (mappings of column to value)
+ManifestSource = Union[str, os.PathLike, IO[str], Iterable[Mapping[str, Any]]]
+
+# Rows per batch when streaming Parquet files
+PARQUET_BATCH_SIZE = 65536
+
+# Bounds of the parsed-file cache; least recently used files are dropped first
+CACHE_MAX_FILES = 64
+CACHE_MAX_RECORDS = 1_000_000
+
+# Accepted spellings of yes/no columns (case-insensitive; empty means no)
+TRUE_VALUES = ('yes', 'y', 'true', '1')
+FALSE_VALUES = ('no', 'n', 'false', '0')
+
+
+class ManifestError(ValueError):
+    """
+    Raised when a manifest row is missing a column or holds an invalid value.
+    """
+    def __init__(self, source: str, line: int, message: str):
+        super().__init__(f"{source}:{line}: {message}")
+        self.source = source
+        self.line = line
+
+
+class BinRecord(NamedTuple):
+    """One Bins.tsv row (a bin type and its quantity)."""
+    type: str
+    width: float
+    height: float
+    depth: float
+    weight: float
+    quantity: int
+    color: str
+    # Weight each unit can carry on top of it (None: unlimited)
+    max_load: Optional[float] = None
+    # "This side up": the unit may only turn about the vertical axis
+    upright: bool = False
+
+
+class ContainerRecord(NamedTuple):
+    """One Container.tsv row (a container type)."""
+    id: str
+    width: float
+    height: float
+    depth: float
+    max_weight: float
+    cost: Union[float, None]
+    # Optional load distribution limits (see models.load_limits.LoadLimits)
+    max_moment_offset: Optional[float] = None
+    max_cog_offset: Optional[float] = None
+    cog_min_weight: Optional[float] = None
+    floor_cell_size: Optional[float] = None
+    max_floor_load: Optional[float] = None
+    front_axle: Optional[float] = None
+    rear_axle: Optional[float] = None
+    max_axle_load: Optional[float] = None
+
+
+Record = TypeVar('Record', BinRecord, ContainerRecord)
+
+
+class _Row:
+    """Typed access to the columns of one raw row, with errors pointing at the row."""
+    __slots__ = ('row', 'source', 'line')
+
+    def __init__(self, row: Mapping[str, Any], source: str, line: int):
+        self.row = row
+        self.source = source
+        self.line = line
+
+    def error(self, message: str) -> ManifestError:
+        return ManifestError(self.source, self.line, message)
+
+    def text(self, column: str, default: Union[str, None] = None) -> str:
+        value = self.row.get(column)
+        value = '' if value is None else str(value).strip()
+        if not value:
+            if default is None:
+                raise self.error(f"missing {column}")
+            return default
+        return value
+
+    def number(self, column: str, minimum: float = 0.0, allow_minimum: bool = False) -> float:
+        value = self.text(column)
+        try:
+            number = float(value)
+        except ValueError:
+            raise self.error(f"{column} is not a number: {value!r}") from None
+        if not math.isfinite(number) or number < minimum or (number == minimum and not allow_minimum):
+            bound = '>=' if allow_minimum else '>'
+            raise self.error(f"{column} must be {bound} {minimum:g}, got {value}")
+        return number
+
+    def optional_number(self, column: str, minimum: float = 0.0, allow_minimum: bool = False) -> Optional[float]:
+        if not self.text(column, ''):
+            return None
+        return self.number(column, minimum, allow_minimum)
+
+    def flag(self, column: str) -> bool:
+        value = self.text(column, 'no').lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        raise self.error(f"{column} must be yes or no, got {self.text(column)}")
+
+    def integer(self, column: str) -> int:
+        number = self.number(column, allow_minimum=True)
+        if not number.is_integer():
+            raise self.error(f"{column} must be a whole number, got {self.text(column)}")
+        return int(number)
+
+
+def parse_bin_row(row: Mapping[str, Any], source: str = '<rows>', line: int = 0) -> BinRecord:
+    """
+    Convert and validate one Bins.tsv row.
+
+    Args:
+        row: Row with Type, Width, Height, Depth, Weight, Quantity and optional Color, MaxLoad
+            and Upright (yes/no)
+        source: Source name for error messages
+        line: Line number for error messages
+
+    Returns:
+        BinRecord: Typed row
+    """
+    fields = _Row(row, source, line)
+    return BinRecord(
+        type=fields.text('Type'),
+        width=fields.number('Width'),
+        height=fields.number('Height'),
+        depth=fields.number('Depth'),
+        weight=fields.number('Weight', allow_minimum=True),
+        quantity=fields.integer('Quantity'),
+        # Use specified color if available, otherwise default to black
+        color=fields.text('Color', 'black'),
+        max_load=fields.optional_number('MaxLoad', allow_minimum=True),
+        upright=fields.flag('Upright')
+    )
+
+
+def parse_container_row(row: Mapping[str, Any], source: str = '<rows>', line: int = 0) -> ContainerRecord:
+    """
+    Convert and validate one Container.tsv row.
+
+    Args:
+        row: Row with ID, Width, Height, Depth, MaxWeight and optional Cost and load limit columns
+            (MaxMomentOffset, MaxCogOffset, CogMinWeight, FloorCellSize, MaxFloorLoad, FrontAxle, RearAxle, MaxAxleLoad)
+        source: Source name for error messages
+        line: Line number for error messages
+
+    Returns:
+        ContainerRecord: Typed row
+    """
+    fields = _Row(row, source, line)
+    return ContainerRecord(
+        id=fields.text('ID'),
+        width=fields.number('Width'),
+        height=fields.number('Height'),
+        depth=fields.number('Depth'),
+        max_weight=fields.number('MaxWeight', allow_minimum=True),
+        cost=fields.optional_number('Cost', allow_minimum=True),
+        max_moment_offset=fields.optional_number('MaxMomentOffset'),
+        max_cog_offset=fields.optional_number('MaxCogOffset', allow_minimum=True),
+        cog_min_weight=fields.optional_number('CogMinWeight', allow_minimum=True),
+        floor_cell_size=fields.optional_number('FloorCellSize'),
+        max_floor_load=fields.optional_number('MaxFloorLoad'),
+        front_axle=fields.optional_number('FrontAxle', allow_minimum=True),
+        rear_axle=fields.optional_number('RearAxle', allow_minimum=True),
+        max_axle_load=fields.optional_number('MaxAxleLoad')
+    )
+
+
+def _delimiter(path: str) -> str:
+    """Pick the column delimiter from a file extension (TSV unless .csv)."""
+    return ',' if path.lower().endswith('.csv') else '\t'
+
+
+def iter_rows(source: ManifestSource) -> Iterator[Tuple[Mapping[str, Any], str, int]]:
+    """
+    Stream the raw rows of a manifest source without reading it all into memory.
+
+    Args:
+        source: File path, text stream or in-memory rows
+
+    Yields:
+        Tuple[Mapping[str, Any], str, int]: (row, source name, line or row number)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if path.lower().endswith('.parquet'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError(f"Reading {path} requires pyarrow (pip install pyarrow)") from None
+            number = 0
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_SIZE):
+                for row in batch.to_pylist():
+                    number += 1
+                    yield row, path, number
+            return
+        try:
+            with open(path, 'r', newline='') as file:
+                reader = csv.DictReader(file, delimiter=_delimiter(path))
+                for row in reader:
+                    yield row, path, reader.line_num
+        except FileNotFoundError:
+            logger.error(f"File not found: {path}")
+            raise
+        return
+
+    if hasattr(source, 'readline'):
+        # Sniff the delimiter from the header line: TSV unless it only has commas
+        first = source.readline()
+        delimiter = ',' if ',' in first and '\t' not in first else '\t'
+        reader = csv.DictReader(_chain_line(first, source), delimiter=delimiter)
+        name = str(getattr(source, 'name', '<stream>'))
+        for row in reader:
+            yield row, name, reader.line_num
+        return
+
+    for number, row in enumerate(source, start=1):
+        yield row, '<rows>', number
+
+
+def _chain_line(first: str, rest: IO[str]) -> Iterator[str]:
+    """Yield an already read first line followed by the rest of a stream."""
+    yield first
+    yield from rest
+
+
+def iter_bin_records(source: ManifestSource = 'Bins.tsv') -> Iterator[BinRecord]:
+    """
+    Stream typed Bins.tsv records (no caching; for very large manifests).
+
+    Args:
+        source: File path, text stream or in-memory rows
+
+    Yields:
+        BinRecord: One record per row
+    """
+    for row, name, line in iter_rows(source):
+        yield parse_bin_row(row, name, line)
+
+
+def iter_container_records(source: ManifestSource = 'Container.tsv') -> Iterator[ContainerRecord]:
+    """
+    Stream typed Container.tsv records (no caching).
+
+    Args:
+        source: File path, text stream or in-memory rows
+
+    Yields:
+        ContainerRecord: One record per row
+    """
+    for row, name, line in iter_rows(source):
+        yield parse_container_row(row, name, line)
+
+
+# Parsed files keyed by (kind, absolute path): (mtime_ns, size, records), least recently used first
+_cache: 'OrderedDict[Tuple[str, str], Tuple[int, int, Tuple[Any, ...]]]' = OrderedDict()
+_cached_records = 0
+
+
+def _load_cached(
+    kind: str,
+    source: ManifestSource,
+    parse: Callable[[ManifestSource], Iterator[Record]]
+) -> Tuple[Record, ...]:
+    """
+    Parse a source once, reusing the records while the file is unchanged.
+
+    Files are cached by absolute path, modification time and size, up to
+    CACHE_MAX_FILES files and CACHE_MAX_RECORDS records (batch workers and the
+    server see a new path on every job); streams and in-memory rows are parsed
+    on every call.
+    """
+    global _cached_records
+    if not isinstance(source, (str, os.PathLike)):
+        return tuple(parse(source))
+
+    path = os.path.abspath(os.fspath(source))
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        logger.error(f"File not found: {path}")
+        raise
+    key = (kind, path)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        _cache.move_to_end(key)
+        return cached[2]
+
+    records = tuple(parse(path))
+    if cached is not None:
+        _cached_records -= len(_cache.pop(key)[2])
+    _cache[key] = (stat.st_mtime_ns, stat.st_size, records)
+    _cached_records += len(records)
+    # The newest file is kept even when it alone exceeds the record bound
+    while len(_cache) > 1 and (len(_cache) > CACHE_MAX_FILES or _cached_records > CACHE_MAX_RECORDS):
+        _cached_records -= len(_cache.popitem(last=False)[1][2])
+    logger.debug(f"Loaded {len(records)} {kind} records from {path}")
+    return records
+
+
+def load_bin_records(source: ManifestSource = 'Bins.tsv') -> Tuple[BinRecord, ...]:
+    """
+    Load typed Bins.tsv records, parsing each file only once while it is unchanged.
+
+    Args:
+        source: File path, text stream or in-memory rows
+
+    Returns:
+        Tuple[BinRecord, ...]: One record per row
+    """
+    return _load_cached('bin', source, iter_bin_records)
+
+
+def load_container_records(source: ManifestSource = 'Container.tsv') -> Tuple[ContainerRecord, ...]:
+    """
+    Load typed Container.tsv records, parsing each file only once while it is unchanged.
+
+    Args:
+        source: File path, text stream or in-memory rows
+
+    Returns:
+        Tuple[ContainerRecord, ...]: One record per row
+    """
+    records = _load_cached('container', source, iter_container_records)
+    if not records:
+        name = os.fspath(source) if isinstance(source, (str, os.PathLike)) else '<rows>'
+        raise ManifestError(name, 0, 'no container rows')
+    return records
+
+
+def clear_cache() -> None:
+    """Forget every parsed file."""
+    global _cached_records
+    _cache.clear()
+    _cached_records = 0
@@ -0,0 +1,235 @@
+import cProfile
+import io
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class PhaseTiming:
+    """
+    Accumulated wall and CPU time of one phase.
+    """
+    __slots__ = ('wall', 'cpu', 'calls', 'items')
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.calls = 0
+        self.items = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'wall_seconds': round(self.wall, 6),
+            'cpu_seconds': round(self.cpu, 6),
+            'calls': self.calls,
+            'items': self.items,
+        }
+
+
+def get_peak_rss() -> Optional[int]:
+    """
+    Get the peak resident memory of this process.
+
+    Returns:
+        Optional[int]: Peak RSS in bytes, or None where unavailable
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Metrics:
+    """
+    Instrumentation of a packing run: per-phase timers, counters, gauges and memory.
+
+    Services record into the Metrics object they were given (or a fresh one
+    per result), and the object travels with the result as container.metrics.
+    """
+    def __init__(self):
+        self.phases: Dict[str, PhaseTiming] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.traced_peak_memory: Optional[int] = None
+        self.top_allocations: List[str] = []
+        self.profile_stats: Optional[pstats.Stats] = None
+
+    @contextmanager
+    def phase(self, name: str, items: int = 0) -> Iterator[PhaseTiming]:
+        """
+        Time a block as a named phase (wall and CPU time accumulate over calls).
+
+        Args:
+            name: Phase name
+            items: Number of items the phase processed
+
+        Yields:
+            PhaseTiming: The phase's timing; a block that only learns its item
+                count inside (e.g. loading) adds to its items
+        """
+        # Registered on entry, so nested phases are listed after their parent
+        timing = self.phases.get(name)
+        if timing is None:
+            timing = self.phases[name] = PhaseTiming()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield timing
+        finally:
+            timing.wall += time.perf_counter() - wall_started
+            timing.cpu += time.process_time() - cpu_started
+            timing.calls += 1
+            timing.items += items
+
+    def count(self, name: str, value: float = 1) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name: Counter name
+            value: Amount to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Set a gauge: a value that describes the last run, unlike counters, which are summed.
+
+        Args:
+            name: Gauge name
+            value: Current value
+        """
+        self.gauges[name] = value
+
+    @contextmanager
+    def profiling(self, profile_path: Optional[str] = None, trace_memory: bool = False) -> Iterator[None]:
+        """
+        Opt-in cProfile and tracemalloc around a block.
+
+        Args:
+            profile_path: Write cProfile statistics here (None to disable profiling)
+            trace_memory: Record peak traced memory and the top allocation sites
+        """
+        profiler = cProfile.Profile() if profile_path else None
+        if trace_memory:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(profile_path)
+                self.profile_stats = pstats.Stats(profiler)
+            if trace_memory:
+                self.traced_peak_memory = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot()
+                self.top_allocations = [str(stat) for stat in snapshot.statistics('lineno')[:10]]
+                tracemalloc.stop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the metrics as a JSON-serializable dict.
+
+        Returns:
+            Dict[str, Any]: Phases, counters, gauges and memory
+        """
+        data: Dict[str, Any] = {
+            'phases': {name: timing.to_dict() for name, timing in self.phases.items()},
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'peak_rss_bytes': get_peak_rss(),
+        }
+        if self.traced_peak_memory is not None:
+            data['traced_peak_bytes'] = self.traced_peak_memory
+            data['top_allocations'] = self.top_allocations
+        return data
+
+    def to_prometheus(self, prefix: str = 'space2') -> str:
+        """
+        Get the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            str: Text dump
+        """
+        lines = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+
+        phase_fields = [
+            ('phase_wall_seconds_total', 'wall', 'Wall time spent per phase'),
+            ('phase_cpu_seconds_total', 'cpu', 'CPU time spent per phase'),
+            ('phase_calls_total', 'calls', 'Number of times each phase ran'),
+            ('phase_items_total', 'items', 'Items processed per phase'),
+        ]
+        for name, field, help_text in phase_fields:
+            if not self.phases:
+                break
+            family(name, 'counter', help_text)
+            for phase, timing in self.phases.items():
+                lines.append(f'{prefix}_{name}{{phase="{phase}"}} {getattr(timing, field):g}')
+
+        for counter, value in self.counters.items():
+            name = re.sub(r'[^a-zA-Z0-9_]', '_', counter) + '_total'
+            family(name, 'counter', counter.replace('_', ' ').capitalize())
+            lines.append(f'{prefix}_{name} {value:g}')
+
+        for gauge, value in self.gauges.items():
+            name = re.sub(r'[^a-zA-Z0-9_]', '_', gauge)
+            family(name, 'gauge', gauge.replace('_', ' ').capitalize())
+            lines.append(f'{prefix}_{name} {value:g}')
+
+        peak_rss = get_peak_rss()
+        if peak_rss is not None:
+            family('peak_rss_bytes', 'gauge', 'Peak resident memory of the process')
+            lines.append(f'{prefix}_peak_rss_bytes {peak_rss}')
+        if self.traced_peak_memory is not None:
+            family('traced_peak_bytes', 'gauge', 'Peak memory allocated by Python while tracing')
+            lines.append(f'{prefix}_traced_peak_bytes {self.traced_peak_memory}')
+        return '\n'.join(lines) + '\n'
+
+    def format_summary(self, top_functions: int = 10) -> str:
+        """
+        Get a human-readable summary.
+
+        Args:
+            top_functions: Number of profiled functions to list, if profiling ran
+
+        Returns:
+            str: Phase table, counters, gauges and memory
+        """
+        lines = ['\nMetrics:', f"{'Phase':<24}{'Wall (s)':>10}{'CPU (s)':>10}{'Calls':>7}{'Items':>9}"]
+        for phase, timing in self.phases.items():
+            lines.append(f'{phase:<24}{timing.wall:>10.4f}{timing.cpu:>10.4f}{timing.calls:>7}{timing.items:>9}')
+        for counter, value in self.counters.items():
+            lines.append(f'{counter}: {value:g}')
+        for gauge, value in self.gauges.items():
+            lines.append(f'{gauge}: {value:g}')
+        peak_rss = get_peak_rss()
+        if peak_rss is not None:
+            lines.append(f'Peak RSS: {peak_rss / 2**20:.1f} MiB')
+        if self.traced_peak_memory is not None:
+            lines.append(f'Peak traced memory: {self.traced_peak_memory / 2**20:.1f} MiB')
+            lines.extend(f'  {allocation}' for allocation in self.top_allocations)
+        if self.profile_stats is not None:
+            stream = io.StringIO()
+            self.profile_stats.stream = stream
+            self.profile_stats.sort_stats('cumulative').print_stats(top_functions)
+            lines.append(stream.getvalue().rstrip())
+        return '\n'.join(lines)